@@ -1,13 +1,12 @@
-from fastapi import FastAPI, UploadFile
-from stt_module.stt_service import STTService
+"""
+Eski dosya-yükleme örneği.
 
-app = FastAPI()
-stt = STTService()
+Buradaki '/transcribe' yüklemeyi 'data/' altına yazıp 'STTService'te olmayan bir
+'transcribe(path)' metodunu çağırıyordu. Dosya transkripsiyonu artık ana uygulamadaki
+'POST /api/transcribe' endpoint'idir (src/main.py): yükleme diske yazılmadan akış halinde
+çözümlenir, birden fazla dosya veya zip kabul edilir. Bu modül geriye dönük uyumluluk için
+yalnızca uygulamayı dışa aktarır ('uvicorn api.stt_api:app').
+"""
+from src.main import app
 
-@app.post("/transcribe")
-async def transcribe_audio(file: UploadFile):
-    path = f"data/{file.filename}"
-    with open(path, "wb") as f:
-        f.write(await file.read())
-    result = stt.transcribe(path)
-    return {"text": result.get("text", "")}
+__all__ = ["app"]
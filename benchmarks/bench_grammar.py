@@ -0,0 +1,162 @@
+"""
+Tam dil modeli ile kısıtlı kelime dağarcıklı (dilbilgisi) çözümlemenin kıyaslaması.
+
+'data/samples' altındaki her WAV dosyası her mod için ('full' ve ayarlardaki her dilbilgisi)
+WebSocket parçası boyutunda (varsayılan 250 ms) bloklarla çözümlenir. Raporlanan değerler:
+- rtf: çözümleme CPU süresi / ses süresi (1'den küçük = gerçek zamandan hızlı),
+- setup_ms: tanıyıcı kurulum süresi (dilbilgisi grafı bu sırada derlenir),
+- wer: kelime hata oranı. '--references' ile {dosya adı: doğru metin} JSON'u verilirse ona göre,
+  verilmezse tam modelin çıktısına göre hesaplanır (o durumda 'full' için 0'dır).
+
+Kullanım (proje kökünden):
+    python -m benchmarks.bench_grammar --grammars yes_no complaint --references refs.json
+"""
+import os
+import sys
+import json
+import time
+import wave
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.settings import get_section, resolve_path
+from src.intent_cache import normalize_transcript
+from src.stt_module.model_registry import model_registry, DEFAULT_MODEL_PATH
+from src.stt_module.stt_service import STTService, load_grammars
+
+FULL = "full"
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Kelime düzeyinde Levenshtein uzaklığı / referans kelime sayısı (metinler normalize edilir).
+    """
+    ref = normalize_transcript(reference).split()
+    hyp = normalize_transcript(hypothesis).split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,                           # silme
+                current[j - 1] + 1,                        # ekleme
+                previous[j - 1] + (ref_word != hyp_word),  # değiştirme
+            ))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def read_wav(path: str):
+    """
+    Mono 16-bit PCM WAV okur; (pcm, örnekleme hızı, süre) döndürür.
+    """
+    with wave.open(path, "rb") as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: mono 16-bit PCM bekleniyordu.")
+        rate = wf.getframerate()
+        pcm = wf.readframes(wf.getnframes())
+    return pcm, rate, len(pcm) / 2 / rate
+
+
+def decode(pcm: bytes, rate: int, model_path: str, grammar=None, chunk_ms: int = 250) -> dict:
+    started = time.perf_counter()
+    service = STTService(sample_rate=rate, model_path=model_path, grammar=grammar)
+    setup_s = time.perf_counter() - started
+
+    chunk_bytes = int(rate * chunk_ms / 1000) * 2
+    texts = []
+    cpu_started = time.process_time()
+    for start in range(0, len(pcm), chunk_bytes):
+        result = service.transcribe_chunk(pcm[start:start + chunk_bytes])
+        if result["type"] == "final" and result["text"]:
+            texts.append(result["text"])
+    final = service.get_final_result()
+    if final["text"]:
+        texts.append(final["text"])
+    cpu_s = time.process_time() - cpu_started
+    return {"text": " ".join(texts), "setup_ms": round(setup_s * 1000, 2), "cpu_s": cpu_s}
+
+
+def run(samples_dir: str, model_path: str, grammars: dict, references=None, chunk_ms: int = 250) -> dict:
+    """
+    'grammars' {mod adı: ifade listesi}; 'full' (tam model) her zaman eklenir ve ilk çalışır.
+    """
+    modes = {FULL: None, **{name: phrases for name, phrases in grammars.items() if name != FULL}}
+    files = sorted(name for name in os.listdir(samples_dir) if name.lower().endswith(".wav"))
+    model_registry.get(model_path)  # model yükleme süresi ölçüme katılmaz
+
+    rows = []
+    for name in files:
+        pcm, rate, seconds = read_wav(os.path.join(samples_dir, name))
+        full_text = None
+        for mode, phrases in modes.items():
+            result = decode(pcm, rate, model_path, phrases, chunk_ms)
+            if mode == FULL:
+                full_text = result["text"]
+            reference = references.get(name) if references else full_text
+            rows.append({
+                "file": name,
+                "mode": mode,
+                "audio_seconds": round(seconds, 3),
+                "text": result["text"],
+                "setup_ms": result["setup_ms"],
+                "rtf": round(result["cpu_s"] / seconds, 4) if seconds else None,
+                "wer": round(word_error_rate(reference, result["text"]), 4) if reference is not None else None,
+            })
+
+    summary = {}
+    for mode in modes:
+        mode_rows = [row for row in rows if row["mode"] == mode]
+        audio = sum(row["audio_seconds"] for row in mode_rows)
+        wers = [row["wer"] for row in mode_rows if row["wer"] is not None]
+        summary[mode] = {
+            "files": len(mode_rows),
+            "audio_seconds": round(audio, 3),
+            "rtf": round(sum(row["rtf"] * row["audio_seconds"] for row in mode_rows) / audio, 4) if audio else None,
+            "mean_setup_ms": round(sum(row["setup_ms"] for row in mode_rows) / len(mode_rows), 2) if mode_rows else None,
+            "mean_wer": round(sum(wers) / len(wers), 4) if wers else None,
+        }
+    full_rtf = summary[FULL]["rtf"]
+    for mode, item in summary.items():
+        item["speedup_vs_full"] = round(full_rtf / item["rtf"], 2) if full_rtf and item["rtf"] else None
+
+    return {
+        "model": model_path,
+        "chunk_ms": chunk_ms,
+        "wer_reference": "transcripts" if references else FULL,
+        "summary": summary,
+        "files": rows,
+    }
+
+
+def main():
+    settings = get_section("stt")
+    grammars = load_grammars(settings.get("grammars"))
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", default=resolve_path("data/samples"))
+    parser.add_argument("--model", default=resolve_path(settings.get("model_path") or DEFAULT_MODEL_PATH))
+    parser.add_argument("--grammars", nargs="+", default=list(grammars), choices=list(grammars))
+    parser.add_argument("--references", help="{dosya adı: doğru metin} biçiminde JSON dosyası")
+    parser.add_argument("--chunk-ms", type=int, default=250)
+    parser.add_argument("--output", help="Raporun yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    references = None
+    if args.references:
+        with open(args.references, "r", encoding="utf-8") as f:
+            references = json.load(f)
+
+    report = run(args.samples, args.model, {name: grammars[name] for name in args.grammars}, references, args.chunk_ms)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
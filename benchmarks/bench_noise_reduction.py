@@ -0,0 +1,72 @@
+"""
+Ses ön işleme (yeniden örnekleme / DC giderme / gürültü bastırma) mikro kıyaslaması.
+
+Her yapılandırma için sentetik konuşma benzeri sinyal, WebSocket parçası boyutunda
+(varsayılan 125 ms) bloklarla işlenir ve işlem hızı "ses saniyesi / CPU saniyesi" olarak
+raporlanır (1'den büyük = gerçek zamandan hızlı).
+
+Kullanım (proje kökünden):
+    python -m benchmarks.bench_noise_reduction --seconds 30
+"""
+import sys
+import json
+import time
+import argparse
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.stt_module.noise_reduction import AudioFrontEnd
+
+
+def synthetic_audio(rate: int, seconds: float) -> bytes:
+    rng = np.random.RandomState(0)
+    t = np.arange(int(rate * seconds)) / rate
+    # Hece hızında genlik modülasyonlu birkaç harmonik + arka plan gürültüsü
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    voiced = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((150, 300, 450, 900)))
+    signal = 0.2 * envelope * voiced + 0.01 * rng.randn(t.size)
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16).tobytes()
+
+
+def run(in_rate: int, noise_suppression: bool, seconds: float, chunk_ms: int) -> dict:
+    audio = synthetic_audio(in_rate, seconds)
+    chunk_bytes = int(in_rate * chunk_ms / 1000) * 2
+    front_end = AudioFrontEnd(in_rate, 16000, noise_suppression=noise_suppression)
+
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    for start in range(0, len(audio), chunk_bytes):
+        front_end.process(audio[start:start + chunk_bytes])
+    cpu = time.process_time() - cpu_started
+    wall = time.perf_counter() - wall_started
+
+    return {
+        "in_rate": in_rate,
+        "noise_suppression": noise_suppression,
+        "audio_seconds": seconds,
+        "cpu_seconds": round(cpu, 4),
+        "audio_seconds_per_cpu_second": round(seconds / cpu, 1) if cpu else None,
+        "per_chunk_ms": round(wall * 1000 / (len(audio) / chunk_bytes), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--chunk-ms", type=int, default=125)
+    parser.add_argument("--rates", type=int, nargs="+", default=[16000, 44100, 48000])
+    args = parser.parse_args()
+
+    results = [
+        run(rate, suppression, args.seconds, args.chunk_ms)
+        for rate in args.rates
+        for suppression in (False, True)
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Tekrarlanabilir yük testi ve gecikme kıyaslaması.
+
+Senaryolar:
+- stt: 'data/samples/*.wav' dosyaları K eşzamanlı '/ws/stream_stt' bağlantısı üzerinden
+  gerçek zamanlı (--speed 1) veya hızlandırılmış (--speed 4, --speed 0 = beklemesiz) oynatılır.
+  İlk kısmi sonuca ve (ses bittikten sonra) nihai sonuca kadar geçen süre ölçülür.
+- intent / synthesize: '/api/get_intent' ve '/api/synthesize' uç noktalarına C eşzamanlılıkla
+  N istek gönderilir.
+
+Varsayılan olarak sunucu bu betik tarafından ayrı bir süreçte (uvicorn) ve gecikmesi
+ayarlanabilen yerel bir stand-in Gemini sunucusuyla başlatılır; '--url' verilirse çalışan bir
+sunucu kullanılır (o durumda CPU ölçümü yapılamaz). Sonuçlar commit'ler arasında
+karşılaştırılabilmesi için JSON olarak yazılır (p50/p95/p99, saniyedeki istek, akış başına CPU).
+
+Kullanım (proje kökünden):
+    python -m benchmarks.load_test --streams 8 --speed 1 --requests 200 --concurrency 16 \\
+        --gemini-latency-ms 300 --output results/bench.json
+"""
+import os
+import sys
+import json
+import time
+import glob
+import wave
+import shutil
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+import httpx
+import numpy as np
+import websockets
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stand_in_gemini import StandInGemini
+from src.settings import write_isolated_settings
+
+COMPLAINTS = [
+    "boğazım çok ağrıyor yutkunamıyorum",
+    "dişim zonkluyor",
+    "göğsümde baskı var nefes alamıyorum",
+    "başım dönüyor ve midem bulanıyor",
+    "dizim şişti yürürken ağrıyor",
+    "gözlerim kaşınıyor ve sulanıyor",
+]
+
+
+def summarize_latencies(values_ms: list) -> dict:
+    """
+    Milisaniye cinsinden gecikme listesinin özetini döndürür.
+    """
+    if not values_ms:
+        return {"count": 0}
+    data = np.asarray(values_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(data, [50, 95, 99])
+    return {
+        "count": int(data.size),
+        "mean_ms": round(float(data.mean()), 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(data.max()), 2),
+    }
+
+
+def process_cpu_seconds(pid: int):
+    """
+    Verilen sürecin kullanıcı + sistem CPU süresi (Linux /proc); okunamazsa None.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def load_samples(pattern: str) -> list:
+    """
+    (dosya adı, örnekleme hızı, PCM16 baytları) listesi döndürür; yalnızca mono 16-bit WAV.
+    """
+    samples = []
+    for path in sorted(glob.glob(pattern)):
+        with wave.open(path, "rb") as wf:
+            if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+                print(f"Atlandı (16-bit mono değil): {path}", file=sys.stderr)
+                continue
+            samples.append((os.path.basename(path), wf.getframerate(), wf.readframes(wf.getnframes())))
+    if not samples:
+        raise SystemExit(f"Ses örneği bulunamadı: {pattern}")
+    return samples
+
+
+class LocalServer:
+    """
+    Uygulamayı stand-in Gemini'ye yönlendirilmiş olarak ayrı bir uvicorn sürecinde çalıştırır.
+    """
+    def __init__(self, gemini_url: str, extra_env=None):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        # Stand-in cevapları (sahte intent'ler, sessiz TTS) gerçek önbelleklere yazılmasın;
+        # her koşu boş önbelleklerle başlar ve tekrarlanabilir
+        self.workdir = tempfile.mkdtemp(prefix="load_test_")
+        env = dict(
+            os.environ, GEMINI_BASE_URL=gemini_url, GEMINI_API_KEY="bench-key",
+            APP_SETTINGS_PATH=write_isolated_settings(self.workdir), **(extra_env or {})
+        )
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1",
+             "--port", str(self.port), "--log-level", "warning"],
+            cwd=ROOT, env=env,
+        )
+
+    async def wait_ready(self, timeout: float = 60.0):
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient() as client:
+            while time.monotonic() < deadline:
+                if self.process.poll() is not None:
+                    raise SystemExit(f"Sunucu başlatılamadı (çıkış kodu {self.process.returncode}).")
+                try:
+                    response = await client.get(f"{self.url}/ready")
+                except httpx.TransportError:
+                    response = None
+                if response is not None:
+                    # Kritik açılış adımı başarısızsa (örn. model yok) beklemek boşuna; STT senaryoları hata verir
+                    if response.status_code == 200 or response.json().get("failed"):
+                        return
+                await asyncio.sleep(0.2)
+        raise SystemExit("Sunucu zamanında hazır olmadı.")
+
+    def cpu_seconds(self):
+        return process_cpu_seconds(self.process.pid)
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+async def stream_one(ws_url: str, name: str, rate: int, pcm: bytes, chunk_ms: int, speed: float,
+                     tail_silence_ms: int, final_timeout: float) -> dict:
+    """
+    Tek bir WAV dosyasını WebSocket üzerinden oynatır ve zamanlamaları döndürür.
+    """
+    chunk_bytes = int(rate * chunk_ms / 1000) * 2
+    # Konuşma sonunun algılanması (VAD endpoint) için sona sessizlik eklenir
+    audio = pcm + b"\x00\x00" * int(rate * tail_silence_ms / 1000)
+    result = {"file": name, "audio_seconds": len(pcm) / 2 / rate, "first_partial_ms": None,
+              "final_ms": None, "messages": 0, "error": None}
+    audio_done = asyncio.Event()
+    timings = {}
+
+    async def reader(ws):
+        async for message in ws:
+            data = json.loads(message)
+            result["messages"] += 1
+            now = time.perf_counter()
+            if data.get("type") == "partial" and result["first_partial_ms"] is None:
+                result["first_partial_ms"] = (now - timings["start"]) * 1000
+            if data.get("type") == "final" and audio_done.is_set():
+                result["final_ms"] = (now - timings["audio_end"]) * 1000
+                return
+
+    try:
+        async with websockets.connect(f"{ws_url}/ws/stream_stt?sample_rate={rate}", max_size=None) as ws:
+            timings["start"] = time.perf_counter()
+            reader_task = asyncio.create_task(reader(ws))
+            for index, start in enumerate(range(0, len(audio), chunk_bytes)):
+                await ws.send(audio[start:start + chunk_bytes])
+                if start + chunk_bytes >= len(pcm) and not audio_done.is_set():
+                    timings["audio_end"] = time.perf_counter()
+                    audio_done.set()
+                if speed > 0:
+                    # Gerçek zamana göre hizalı gönderim (birikmiş kaymayı telafi eder)
+                    target = timings["start"] + (index + 1) * chunk_ms / 1000 / speed
+                    await asyncio.sleep(max(0.0, target - time.perf_counter()))
+            if not audio_done.is_set():
+                timings["audio_end"] = time.perf_counter()
+                audio_done.set()
+            try:
+                await asyncio.wait_for(reader_task, timeout=final_timeout)
+            except asyncio.TimeoutError:
+                result["error"] = "final_timeout"
+    except (OSError, websockets.WebSocketException) as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+async def run_stt(ws_url: str, samples: list, streams: int, args, server=None) -> dict:
+    cpu_before = server.cpu_seconds() if server else None
+    started = time.perf_counter()
+    jobs = [
+        stream_one(ws_url, *samples[i % len(samples)], args.chunk_ms, args.speed,
+                   args.tail_silence_ms, args.final_timeout)
+        for i in range(streams)
+    ]
+    results = await asyncio.gather(*jobs)
+    wall = time.perf_counter() - started
+    cpu_after = server.cpu_seconds() if server else None
+
+    audio_seconds = sum(r["audio_seconds"] for r in results)
+    summary = {
+        "streams": streams,
+        "speed": args.speed,
+        "chunk_ms": args.chunk_ms,
+        "wall_s": round(wall, 3),
+        "audio_seconds": round(audio_seconds, 3),
+        "first_partial": summarize_latencies([r["first_partial_ms"] for r in results if r["first_partial_ms"] is not None]),
+        "final_after_audio_end": summarize_latencies([r["final_ms"] for r in results if r["final_ms"] is not None]),
+        "messages_per_audio_second": round(sum(r["messages"] for r in results) / audio_seconds, 2) if audio_seconds else None,
+        "errors": [r for r in results if r["error"]],
+    }
+    if cpu_before is not None and cpu_after is not None:
+        cpu = cpu_after - cpu_before
+        summary["server_cpu_s"] = round(cpu, 3)
+        summary["cpu_s_per_stream"] = round(cpu / streams, 4)
+        summary["cpu_s_per_audio_second"] = round(cpu / audio_seconds, 4) if audio_seconds else None
+    return summary
+
+
+async def run_http(base_url: str, path: str, make_body, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = {}
+    counter = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        async def worker():
+            for index in counter:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(path, json=make_body(index))
+                    key = None if response.status_code == 200 else str(response.status_code)
+                except httpx.HTTPError as e:
+                    key = type(e).__name__
+                if key is None:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors[key] = errors.get(key, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "requests_per_s": round(len(latencies) / wall, 2) if wall else None,
+        "latency": summarize_latencies(latencies),
+        "errors": errors,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    report = {
+        "meta": {"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "args": vars(args)},
+    }
+    gemini = server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        gemini = StandInGemini(latency_ms=args.gemini_latency_ms, jitter_ms=args.gemini_jitter_ms,
+                               error_rate=args.gemini_error_rate, seed=0).start()
+        server = LocalServer(gemini.url)
+        base_url = server.url
+    ws_url = base_url.replace("http://", "ws://").replace("https://", "wss://")
+
+    try:
+        if server:
+            await server.wait_ready()
+        scenarios = set(args.scenarios)
+        if "stt" in scenarios:
+            samples = load_samples(args.samples)
+            report["stt"] = await run_stt(ws_url, samples, args.streams, args, server)
+        if "intent" in scenarios:
+            def intent_body(i):
+                text = COMPLAINTS[i % len(COMPLAINTS)]
+                # '--unique-texts' intent önbelleğini devre dışı bırakıp LLM yolunu ölçer
+                return {"text": f"{text} istek {i}" if args.unique_texts else text}
+            report["intent"] = await run_http(base_url, "/api/get_intent", intent_body, args.requests, args.concurrency)
+        if "synthesize" in scenarios:
+            def tts_body(i):
+                text = "Anladım. Sizi KBB polikliniğine yönlendiriyorum."
+                return {"text": f"{text} Sıra numaranız {i}." if args.unique_texts else text, "voice": "Kore"}
+            report["synthesize"] = await run_http(base_url, "/api/synthesize", tts_body, args.requests, args.concurrency)
+        if gemini:
+            report["stand_in_gemini"] = {"requests": gemini.requests, "injected_errors": gemini.errors}
+    finally:
+        if server:
+            server.stop()
+        if gemini:
+            gemini.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Çalışan sunucu (örn. http://127.0.0.1:8000); verilmezse yerel sunucu başlatılır")
+    parser.add_argument("--scenarios", nargs="+", default=["stt", "intent", "synthesize"],
+                        choices=["stt", "intent", "synthesize"])
+    parser.add_argument("--samples", default=os.path.join(ROOT, "data", "samples", "*.wav"))
+    parser.add_argument("--streams", type=int, default=4, help="Eşzamanlı WebSocket akışı (K)")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = gerçek zamanlı, 0 = beklemesiz")
+    parser.add_argument("--chunk-ms", type=int, default=125)
+    parser.add_argument("--tail-silence-ms", type=int, default=1000)
+    parser.add_argument("--final-timeout", type=float, default=30.0)
+    parser.add_argument("--requests", type=int, default=100, help="HTTP senaryosu başına istek (N)")
+    parser.add_argument("--concurrency", type=int, default=8, help="HTTP eşzamanlılığı (C)")
+    parser.add_argument("--unique-texts", action="store_true", help="Önbellek isabetlerini önlemek için metinleri benzersizleştir")
+    parser.add_argument("--gemini-latency-ms", type=float, default=300.0)
+    parser.add_argument("--gemini-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="JSON sonuç dosyası (verilmezse standart çıktıya yazılır)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Sonuçlar yazıldı: {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Gemini LLM/TTS uç noktalarının yerine geçen, gecikme ve hata enjekte edilebilen yerel HTTP sunucusu.
+
+Yük testlerinde gerçek API'ye (kota, maliyet, ağ dalgalanması) gitmeden sunucunun kendi
+gecikmesini ölçmek için kullanılır. Uygulama 'GEMINI_BASE_URL' ile bu sunucuya yönlendirilir.
+
+Kullanım (proje kökünden):
+    python -m benchmarks.stand_in_gemini --port 8765 --latency-ms 300 --jitter-ms 100
+"""
+import json
+import time
+import base64
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInGemini:
+    """
+    - Intent isteklerine sabit bir ClinicIntentResponse JSON'u döner (toplu isteklerde her metin için bir tane).
+    - TTS isteklerine metin uzunluğuyla orantılı sessiz PCM (audio/L16) döner.
+    - Her yanıt 'latency_ms' ± 'jitter_ms' bekletilir; 'error_rate' oranında 503 döner.
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 tts_ms_per_char=60.0, sample_rate=24000, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.tts_ms_per_char = tts_ms_per_char
+        self.sample_rate = sample_rate
+        self.intent = {"poliklinik": "KBB", "aciliyet": "normal", "sebep_ozeti": "Boğaz ağrısı"}
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                delay, fail = server._next_outcome()
+                time.sleep(delay)
+                if fail:
+                    self._send(503, {"error": {"code": 503, "message": "stand-in: injected error"}})
+                    return
+                text = body["contents"][0]["parts"][0]["text"]
+                if "tts" in self.path:
+                    samples = int(server.sample_rate * len(text) * server.tts_ms_per_char / 1000)
+                    part = {"inlineData": {
+                        "mimeType": f"audio/L16;rate={server.sample_rate}",
+                        "data": base64.b64encode(b"\x00\x00" * samples).decode("ascii"),
+                    }}
+                elif body["generationConfig"]["responseSchema"].get("type") == "array":
+                    intents = [server.intent] * len(json.loads(text))
+                    part = {"text": json.dumps(intents, ensure_ascii=False)}
+                else:
+                    part = {"text": json.dumps(server.intent, ensure_ascii=False)}
+                self._send(200, {"candidates": [{"content": {"parts": [part]}}]})
+
+            def _send(self, status, data):
+                payload = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://{host}:{self._httpd.server_address[1]}"
+        self._thread = None
+
+    def _next_outcome(self):
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    def start(self) -> "StandInGemini":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StandInGemini(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"Stand-in Gemini: {server.url} (gecikme {args.latency_ms}±{args.jitter_ms} ms, hata oranı {args.error_rate})")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
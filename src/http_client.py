@@ -0,0 +1,178 @@
+import time
+import weakref
+import logging
+import importlib.util
+import httpx
+
+from .upstream_policy import UpstreamPolicy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+
+# Uç nokta bazlı varsayılan toplam zaman aşımları (saniye)
+DEFAULT_TIMEOUTS = {
+    "intent": 30.0,
+    "tts": 20.0,
+}
+
+
+def http2_available() -> bool:
+    """
+    httpx'in HTTP/2 desteği için gereken 'h2' paketi kurulu mu?
+    """
+    return importlib.util.find_spec("h2") is not None
+
+
+class UpstreamHTTPClient:
+    """
+    Gemini LLM ve TTS çağrıları için uygulama ömrü boyunca yaşayan, bağlantı havuzlu
+    (keep-alive) tek httpx istemcisi.
+
+    İstemci FastAPI 'lifespan' kancasında açılır ve kapanır; her istek DNS/TCP/TLS
+    kurulumunu yeniden ödemek yerine havuzdaki bağlantıları kullanır.
+    Her istekten sonra 'stats_hooks' içindeki fonksiyonlar istek istatistiğiyle çağrılır.
+    'policy' (UpstreamPolicy) verilirse istekler eşzamanlılık sınırı, süre bütçeli yeniden
+    deneme, hedge ve devre kesici üzerinden gönderilir; 'timeouts' deneme başına üst sınırdır.
+    """
+    def __init__(self, base_url=DEFAULT_BASE_URL, http2=True, max_connections=20,
+                 max_keepalive_connections=10, keepalive_expiry=60.0,
+                 connect_timeout=5.0, timeouts=None, policy=None):
+        self.base_url = base_url.rstrip("/")
+        self.http2 = bool(http2) and http2_available()
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.connect_timeout = connect_timeout
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.stats_hooks = []
+        self.policy = policy
+        self._client = None
+        # Bağlantı kapandığında akış nesnesi de bırakılır; id() çakışması yaşanmaz
+        self._seen_streams = weakref.WeakSet()
+        self._stats = {}
+
+    @classmethod
+    def from_settings(cls, section: dict) -> "UpstreamHTTPClient":
+        """
+        config/settings.yaml içindeki 'gemini' bölümünden istemci oluşturur.
+        """
+        return cls(
+            base_url=section.get("base_url") or DEFAULT_BASE_URL,
+            http2=section.get("http2", True),
+            max_connections=section.get("max_connections", 20),
+            max_keepalive_connections=section.get("max_keepalive_connections", 10),
+            keepalive_expiry=section.get("keepalive_expiry_s", 60.0),
+            connect_timeout=section.get("connect_timeout_s", 5.0),
+            timeouts=section.get("timeouts"),
+            policy=UpstreamPolicy.from_settings(section["resilience"]) if section.get("resilience") else None,
+        )
+
+    @property
+    def started(self) -> bool:
+        return self._client is not None
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                limits=self.limits,
+                timeout=httpx.Timeout(max(self.timeouts.values()), connect=self.connect_timeout),
+            )
+            if self.policy is not None:
+                self.policy.start()
+            logger.info(f"Upstream HTTP istemcisi açıldı ({self.base_url}, HTTP/2: {self.http2}).")
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._seen_streams.clear()
+            if self.policy is not None:
+                self.policy.stop()
+
+    def timeout_for(self, endpoint: str, budget=None) -> httpx.Timeout:
+        """
+        Uç noktanın zaman aşımı; 'budget' verilirse (kalan süre bütçesi) onunla sınırlanır.
+        """
+        total = self.timeouts.get(endpoint, max(self.timeouts.values()))
+        if budget is not None:
+            total = min(total, budget)
+        return httpx.Timeout(total, connect=min(self.connect_timeout, total))
+
+    async def post(self, endpoint: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Havuzdaki bir bağlantı üzerinden POST isteği gönderir.
+        'endpoint' adı ('intent', 'tts') zaman aşımını ve istatistik anahtarını belirler.
+        Politika varsa devre açıkken veya süre bütçesi dolduğunda UpstreamUnavailable fırlatılır.
+        """
+        if self._client is None:
+            await self.start()
+        if self.policy is None:
+            kwargs.setdefault("timeout", self.timeout_for(endpoint))
+            return await self._send(endpoint, path, **kwargs)
+
+        async def send(budget: float) -> httpx.Response:
+            return await self._send(endpoint, path, timeout=self.timeout_for(endpoint, budget), **kwargs)
+
+        return await self.policy.call(endpoint, send)
+
+    async def _send(self, endpoint: str, path: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self._client.post(path, **kwargs)
+        except httpx.HTTPError as e:
+            # Zaman aşımı / bağlantı hataları da istatistiklere ve kancalara yansır
+            self._record(endpoint, None, time.perf_counter() - started, error=e)
+            raise
+        self._record(endpoint, response, time.perf_counter() - started)
+        return response
+
+    def _record(self, endpoint: str, response, elapsed: float, error=None):
+        reused = False
+        if response is not None:
+            # Aynı ağ akışı (network stream) daha önce görüldüyse bağlantı yeniden kullanılmıştır
+            stream = response.extensions.get("network_stream")
+            reused = stream is not None and stream in self._seen_streams
+            if stream is not None:
+                self._seen_streams.add(stream)
+
+        stats = self._stats.setdefault(endpoint, {
+            "requests": 0,
+            "errors": 0,
+            "reused_connections": 0,
+            "new_connections": 0,
+            "total_time_s": 0.0,
+        })
+        stats["requests"] += 1
+        stats["total_time_s"] += elapsed
+        if error is not None:
+            stats["errors"] += 1
+        else:
+            stats["reused_connections" if reused else "new_connections"] += 1
+
+        request_stats = {
+            "endpoint": endpoint,
+            "status_code": response.status_code if response is not None else None,
+            "http_version": response.http_version if response is not None else None,
+            "connection_reused": reused,
+            "elapsed_s": elapsed,
+            "error": type(error).__name__ if error is not None else None,
+        }
+        for hook in self.stats_hooks:
+            try:
+                hook(request_stats)
+            except Exception as e:
+                logger.error(f"HTTP istatistik kancası hatası: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "http2": self.http2,
+            "endpoints": {name: dict(info) for name, info in self._stats.items()},
+            "resilience": self.policy.stats() if self.policy is not None else None,
+        }
@@ -0,0 +1,87 @@
+import asyncio
+
+
+class MicroBatcher:
+    """
+    Kısa bir zaman penceresinde gelen tekil istekleri tek bir toplu çağrıda birleştirir.
+
+    İlk istek geldiğinde 'max_wait_ms' sonra boşaltma (flush) planlanır; bekleyen istek sayısı
+    'max_batch_size'a ulaşırsa beklemeden boşaltılır. 'process_batch(items)' aynı sırayla bir
+    sonuç listesi döndürmelidir; listedeki bir öğe Exception ise yalnızca o çağırana iletilir.
+    Toplu çağrının kendisi hata verirse partideki tüm çağıranlar aynı hatayı alır.
+    """
+    def __init__(self, process_batch, max_batch_size: int = 16, max_wait_ms: float = 10.0):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max_wait_ms / 1000.0
+        self._pending = []  # (öğe, future)
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+        self.max_seen = 0
+        self.size_counts = {}  # parti boyutu -> kaç kez
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_s, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        # İptal edilmiş çağıranlar partiye girmez
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+        self._record(len(batch))
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Toplu sonuç sayısı ({len(results)}) istek sayısından ({len(batch)}) farklı.")
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _record(self, size: int):
+        self.batches += 1
+        self.items += size
+        self.max_seen = max(self.max_seen, size)
+        self.size_counts[size] = self.size_counts.get(size, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_seen_batch_size": self.max_seen,
+            "batch_size_counts": {str(size): count for size, count in sorted(self.size_counts.items())},
+            "pending": len(self._pending),
+        }
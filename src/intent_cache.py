@@ -0,0 +1,156 @@
+import os
+import re
+import json
+import time
+import tempfile
+import unicodedata
+from collections import OrderedDict
+
+# Anlamı değiştirmeyen dolgu (filler) kelimeleri
+FILLER_WORDS = {"şey", "yani", "işte", "hani", "eh", "ah", "aa", "hmm", "hım", "ıı", "ee"}
+# Uzatılmış dolgu sesleri: "eee", "ııı", "hmmm", "mmm"
+FILLER_PATTERN = re.compile(r"^(e+|ı+|a+|ö+|m+|h+m+|hı+m+)$")
+
+# Türkçe'ye özgü büyük/küçük harf dönüşümü (str.lower() 'I' -> 'i' yapar, doğrusu 'ı')
+TURKISH_UPPER_MAP = str.maketrans({"I": "ı", "İ": "i"})
+
+
+def turkish_lower(text: str) -> str:
+    return text.translate(TURKISH_UPPER_MAP).lower()
+
+
+def normalize_transcript(text: str) -> str:
+    """
+    Transkripti önbellek anahtarına çevirir:
+    Türkçe kurallarıyla küçük harfe çevirir, noktalama işaretlerini boşluğa
+    dönüştürür, boşlukları tekilleştirir ve dolgu kelimelerini atar.
+
+    "Şey... Boğazım AĞRIYOR!" -> "boğazım ağrıyor"
+    """
+    text = unicodedata.normalize("NFC", turkish_lower(text))
+    cleaned = "".join(
+        " " if unicodedata.category(ch)[0] in ("P", "S") else ch
+        for ch in text
+    )
+    words = [
+        w for w in cleaned.split()
+        if w not in FILLER_WORDS and not FILLER_PATTERN.match(w)
+    ]
+    return " ".join(words)
+
+
+class IntentCache:
+    """
+    Normalize edilmiş transkripte göre anahtarlanan LRU + TTL intent önbelleği.
+    Değerler doğrudan 'response_model' (ClinicIntentResponse) nesneleri olarak tutulur.
+    İsteğe bağlı olarak diske JSON anlık görüntüsü (snapshot) yazılır; böylece
+    yeniden başlatmalardan sonra önbellek sıcak kalır.
+    """
+    def __init__(self, response_model, max_size=1024, ttl_s=86400.0, snapshot_path=None, clock=time.time):
+        self.response_model = response_model
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self.snapshot_path = snapshot_path
+        self._clock = clock
+        self._entries = OrderedDict()  # anahtar -> (son geçerlilik zamanı, değer)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, text: str):
+        key = normalize_transcript(text)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, text: str, value, expires_at=None):
+        key = normalize_transcript(text)
+        if not key:
+            return
+        if expires_at is None:
+            expires_at = self._clock() + self.ttl_s
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _dump_value(self, value) -> dict:
+        # Pydantic v1/v2 uyumlu serileştirme
+        return value.model_dump() if hasattr(value, "model_dump") else value.dict()
+
+    def save_snapshot(self, path=None):
+        """
+        Süresi dolmamış kayıtları LRU sırasıyla JSON dosyasına atomik olarak yazar
+        (her yazıcı kendi geçici dosyasını kullanır; eşzamanlı yazımlar birbirini bozmaz).
+        """
+        path = path or self.snapshot_path
+        if not path:
+            return
+        now = self._clock()
+        records = [
+            {"key": key, "expires_at": expires_at, "value": self._dump_value(value)}
+            for key, (expires_at, value) in self._entries.items()
+            if expires_at > now
+        ]
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".intent_cache.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load_snapshot(self, path=None) -> int:
+        """
+        Disk görüntüsünden süresi dolmamış kayıtları yükler ve yüklenen kayıt sayısını döndürür.
+        """
+        path = path or self.snapshot_path
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        now = self._clock()
+        loaded = 0
+        for record in records:
+            if record["expires_at"] <= now:
+                continue
+            self.put(record["key"], self.response_model(**record["value"]), expires_at=record["expires_at"])
+            loaded += 1
+        return loaded
@@ -0,0 +1,188 @@
+import time
+from collections import deque
+from .intent_cache import normalize_transcript
+
+# Aynı poliklinikte birden fazla kural eşleşirse en yüksek aciliyet kullanılır
+URGENCY_RANK = {"acil değil": 0, "normal": 1, "acil": 2}
+
+
+class AhoCorasick:
+    """
+    Çok desenli (multi-pattern) metin arama otomatı.
+    Tüm desenler tek geçişte, metin uzunluğuyla doğrusal sürede bulunur.
+    """
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append(index)
+
+        # Başarısızlık bağlantıları genişlik öncelikli (BFS) kurulur
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def finditer(self, text: str):
+        """
+        (başlangıç, bitiş, desen_no) üçlüleri üretir; 'bitiş' dahil değildir.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                yield position + 1 - len(self.patterns[index]), position + 1, index
+
+
+class FastIntentRouter:
+    """
+    LLM'den önce çalışan yerel poliklinik yönlendiricisi.
+
+    Kurallar (ayar dosyasındaki 'fast_router.rules') normalize edilmiş Türkçe kök/ifadelerden
+    oluşur ve tek bir Aho-Corasick otomatına derlenir. Desenler kelime başında eşleşir ve
+    kelimenin devamına izin verir: 'diş' -> 'dişim', 'dişlerim'; 'göğsümde ağrı' -> 'göğsümde ağrıyor'.
+    Çakışan eşleşmelerde uzun olan seçilir; her ifade kelime sayısı kadar puan getirir.
+
+    Yalnızca emin olunduğunda cevap verilir; aksi halde None döner ve çağıran LLM'e gider:
+    - hiç eşleşme yoksa veya en yüksek puan 'min_score'un altındaysa,
+    - en iyi iki poliklinik arasındaki fark 'min_margin'dan küçükse (çok şikayetli/belirsiz metin),
+    - metin 'max_words'ten uzunsa veya olumsuzluk/bağlaç kelimesi içeriyorsa ('ağrım yok'),
+    - metin bir alarm kelimesiyle başlayan kelime içeriyor ('aniden', 'sıkış', 'kayb') ama
+      seçilen kural 'acil' değilse. Yerel yol acil bir şikayeti asla normal diye cevaplamaz.
+    """
+    def __init__(self, rules, response_model, min_score=1.0, min_margin=1.0, max_words=12, ambiguous_words=(),
+                 red_flag_words=()):
+        self.response_model = response_model
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.max_words = max_words
+        self.ambiguous_words = {normalize_transcript(w) for w in ambiguous_words}
+        self.red_flag_words = tuple(filter(None, (normalize_transcript(w) for w in red_flag_words)))
+
+        patterns = []
+        self._pattern_rules = []  # desen_no -> (kural_no, puan)
+        self._rules = []
+        for rule in rules:
+            rule_index = len(self._rules)
+            self._rules.append({
+                "poliklinik": rule["poliklinik"],
+                "aciliyet": rule.get("aciliyet", "normal"),
+                "sebep_ozeti": rule.get("sebep_ozeti") or rule["poliklinik"],
+            })
+            for phrase in rule["phrases"]:
+                pattern = normalize_transcript(phrase)
+                if not pattern:
+                    continue
+                patterns.append(pattern)
+                self._pattern_rules.append((rule_index, float(len(pattern.split()))))
+        self._automaton = AhoCorasick(patterns)
+
+        self.routed = 0
+        self.fallbacks = {"no_match": 0, "ambiguous": 0, "negation": 0, "too_long": 0, "red_flag": 0}
+        self.total_route_s = 0.0
+
+    @classmethod
+    def from_settings(cls, section: dict, response_model) -> "FastIntentRouter":
+        return cls(
+            section.get("rules") or [],
+            response_model,
+            min_score=section.get("min_score", 1.0),
+            min_margin=section.get("min_margin", 1.0),
+            max_words=section.get("max_words", 12),
+            ambiguous_words=section.get("ambiguous_words") or (),
+            red_flag_words=section.get("red_flag_words") or (),
+        )
+
+    def _matches(self, text: str) -> list:
+        # Kelime başında başlayan eşleşmeler; çakışanlar arasından uzun olan tercih edilir
+        candidates = [
+            (start, end, index) for start, end, index in self._automaton.finditer(text)
+            if start == 0 or text[start - 1] == " "
+        ]
+        candidates.sort(key=lambda m: (-(m[1] - m[0]), m[0]))
+        taken = []
+        for start, end, index in candidates:
+            if all(end <= s or start >= e for s, e, _ in taken):
+                taken.append((start, end, index))
+        return taken
+
+    def _decide(self, text: str):
+        words = text.split()
+        if len(words) > self.max_words:
+            return None, "too_long"
+        if self.ambiguous_words.intersection(words):
+            return None, "negation"
+
+        scores = {}
+        best_rule = {}
+        seen = set()
+        for _, _, index in self._matches(text):
+            if index in seen:
+                continue
+            seen.add(index)
+            rule_index, weight = self._pattern_rules[index]
+            rule = self._rules[rule_index]
+            clinic = rule["poliklinik"]
+            scores[clinic] = scores.get(clinic, 0.0) + weight
+            current = best_rule.get(clinic)
+            if current is None or URGENCY_RANK.get(rule["aciliyet"], 1) > URGENCY_RANK.get(current["aciliyet"], 1):
+                best_rule[clinic] = rule
+
+        if not scores:
+            return None, "no_match"
+        ranked = sorted(scores.values(), reverse=True)
+        top = ranked[0]
+        runner_up = ranked[1] if len(ranked) > 1 else 0.0
+        if top < self.min_score or top - runner_up < self.min_margin:
+            return None, "ambiguous"
+        clinic = max(scores, key=scores.get)
+        rule = best_rule[clinic]
+        if rule["aciliyet"] != "acil" and any(word.startswith(self.red_flag_words) for word in words):
+            return None, "red_flag"
+        return rule, None
+
+    def route(self, text: str):
+        """
+        Metin için yerel bir intent sonucu döndürür; emin değilse None.
+        """
+        started = time.perf_counter()
+        rule, reason = self._decide(normalize_transcript(text))
+        self.total_route_s += time.perf_counter() - started
+        if rule is None:
+            self.fallbacks[reason] += 1
+            return None
+        self.routed += 1
+        return self.response_model(**rule)
+
+    def stats(self) -> dict:
+        total = self.routed + sum(self.fallbacks.values())
+        return {
+            "rules": len(self._rules),
+            "patterns": len(self._pattern_rules),
+            "routed": self.routed,
+            "fallbacks": dict(self.fallbacks),
+            "fast_path_ratio": round(self.routed / total, 4) if total else 0.0,
+            "avg_route_us": round(self.total_route_s / total * 1e6, 2) if total else 0.0,
+        }
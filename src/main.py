@@ -1,27 +1,56 @@
+import io
 import os
 import json
+import time
+import zlib
+import asyncio
+import zipfile
 import httpx
 import logging
 import base64
-import wave
-import io
 import pydantic
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
-from fastapi.responses import Response, StreamingResponse
-from typing import Literal
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import Response, StreamingResponse, FileResponse, JSONResponse
+from typing import Literal, Optional
+from collections import deque
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # Kendi modüllerimizi 'src' dizininden import ediyoruz
-from .stt_module.stt_service import STTService
+from .stt_module.stt_service import STTService, load_grammars, warm_up_recognizer
+from .stt_module.model_registry import model_registry, DEFAULT_MODEL_PATH
+from .stt_module.decode_pool import DecodePool, DecodeQueueFull
+from .stt_module.recognizer_pool import RecognizerPool, RecognizerPoolExhausted
+from .stt_module.audio_recorder import VADEndpointer
+from .stt_module.noise_reduction import AudioFrontEnd
+from .stt_module.stream_shaping import PartialThrottle, ChunkCoalescer
+from .stt_module.wire_encoding import WireDecoder, WireEncodingError
+from .settings import settings, get_section, resolve_path
+from .http_client import UpstreamHTTPClient
+from .upstream_policy import UpstreamUnavailable
+from .intent_cache import IntentCache, normalize_transcript
+from .intent_router import FastIntentRouter
+from .intent_batcher import MicroBatcher
+from .tts_cache import TTSCache, tts_cache_key
+from .replies import build_reply_text, fixed_reply_phrases
+from .pipeline import StageClock, SpeculativeIntent
+from .server import stream_opened, stream_closed, workers_stats, is_primary_worker
+from .startup import StartupTracker, load_warmup_audio
+from .metrics import (
+    metrics, observe_upstream_request, observe_upstream_event, STT_STAGE_SECONDS, STT_AUDIO_BYTES, STT_RESULTS, STT_RECOGNIZER_ACQUIRE_SECONDS,
+    STT_PARTIALS_SUPPRESSED, STT_COALESCED_CHUNKS, ACTIVE_STREAMS, TTS_STAGE_SECONDS, REQUEST_SECONDS, INTENT_RESULTS, INTENT_BATCH_SIZE
+)
+from .upload_stream import (
+    WavStreamParser, WavFormatError, MultipartStreamParser, MultipartError, parse_header_params, part_filename
+)
+from .tts_stream import split_sentences, wav_header, iter_pcm_from_base64, iter_segments_in_order
+from utils.logger import setup_logging, logging_stats, LogContextMiddleware
 
 # --- Loglama Ayarları ---
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[logging.StreamHandler()]
-)
+# Kayıtlar kuyruğa bırakılır; JSON biçimlendirme ve yazma ayrı bir thread'de yapılır (utils/logger.py)
+setup_logging(get_section("logging"))
 logger = logging.getLogger(__name__)
 
 # --- API Anahtarı ---
@@ -34,15 +63,169 @@ if GEMINI_API_KEY == "YOUR_API_KEY_HERE":
 
 IS_PYDANTIC_V2 = pydantic.VERSION.startswith("2.")
 
+# --- Gemini Model Yolları ---
+LLM_MODEL_PATH = "/v1beta/models/gemini-2.5-flash-preview-09-2025:generateContent"
+TTS_MODEL_PATH = "/v1beta/models/gemini-2.5-flash-preview-tts:generateContent"
+
+# Tüm LLM ve TTS çağrıları bu tek, bağlantı havuzlu istemciyi paylaşır.
+# Testlerde 'gemini.base_url' (veya GEMINI_BASE_URL) yerel bir sahte sunucuyu gösterebilir.
+GEMINI_SETTINGS = dict(get_section("gemini"))
+if os.environ.get("GEMINI_BASE_URL"):
+    GEMINI_SETTINGS["base_url"] = os.environ["GEMINI_BASE_URL"]
+gemini_client = UpstreamHTTPClient.from_settings(GEMINI_SETTINGS)
+
+# --- Pipeline Ayarları ---
+PIPELINE_SETTINGS = get_section("pipeline")
+
+# --- TTS Önbelleği ---
+# Seslendirilen cümlelerin çoğu sabittir; (metin, ses, örnekleme hızı) anahtarıyla hazır WAV saklanır
+TTS_SETTINGS = get_section("tts")
+TTS_SAMPLE_RATE = TTS_SETTINGS.get("sample_rate", 24000)
+TTS_CACHE_SETTINGS = get_section("tts_cache")
+CLINICS = settings.get("clinics") or []
+tts_cache = None
+if TTS_CACHE_SETTINGS.get("enabled", True):
+    cache_dir = TTS_CACHE_SETTINGS.get("cache_dir")
+    tts_cache = TTSCache(
+        cache_dir=resolve_path(cache_dir) if cache_dir else None,
+        max_memory_bytes=TTS_CACHE_SETTINGS.get("max_memory_mb", 64) * 1024 * 1024,
+        max_disk_bytes=TTS_CACHE_SETTINGS.get("max_disk_mb", 512) * 1024 * 1024
+    )
+
+# --- STT Ayarları ---
+STT_SETTINGS = get_section("stt")
+STT_MODEL_PATH = resolve_path(STT_SETTINGS.get("model_path") or DEFAULT_MODEL_PATH)
+
+# Sessiz çerçeveleri tanıyıcıdan önce ayıklayan VAD/endpointer ayarları
+VAD_SETTINGS = get_section("vad")
+
+# Yeniden örnekleme / DC giderme / gürültü bastırma ön işleme ayarları
+FRONTEND_SETTINGS = get_section("audio_frontend")
+
+# Vosk çözümlemesi olay döngüsünü bloklamasın diye sınırlı işçi havuzunda çalışır
+decode_pool = DecodePool(
+    max_workers=STT_SETTINGS.get("decode_workers"),
+    max_queue=STT_SETTINGS.get("decode_max_queue"),
+    queue_timeout=STT_SETTINGS.get("decode_queue_timeout_s", 5.0)
+)
+# Kısıtlı kelime dağarcıklı çözümleme için adlandırılmış dilbilgileri ('full' tam dil modeli demektir)
+FULL_GRAMMAR = "full"
+STT_GRAMMARS = load_grammars(STT_SETTINGS.get("grammars"))
+DEFAULT_GRAMMAR = STT_SETTINGS.get("default_grammar")
+
+# Bağlantı başına yeni KaldiRecognizer yerine sıfırlanıp yeniden kullanılan tanıyıcılar
+recognizer_pool = RecognizerPool(
+    max_per_key=STT_SETTINGS.get("recognizer_pool_max", 32),
+    acquire_timeout=STT_SETTINGS.get("recognizer_pool_acquire_timeout_s", 5.0),
+    grammars=STT_GRAMMARS
+)
+
+metrics.gauge("decode_queue_depth", "Çözümleme havuzunda bekleyen/işlenen parça sayısı.",
+              callback=lambda: decode_pool.stats()["queue_depth"])
+metrics.gauge("decode_in_flight", "Şu anda işçi thread'lerinde çözümlenen parça sayısı.",
+              callback=lambda: decode_pool.stats()["in_flight"])
+
+# --- Açılış / Hazır Olma ---
+# 'GET /ready' açılış adımları (model, ısıtılmış tanıyıcılar, HTTP istemcisi, önbellekler) bitene kadar 503 döner
+STARTUP_SETTINGS = get_section("startup")
+startup = StartupTracker()
+metrics.gauge("ready", "İşçi trafik almaya hazır mı (1: hazır).", callback=lambda: int(startup.ready))
+
+
+def warm_up_stt():
+    """
+    Vosk modelini yükler ve tanıyıcı havuzunu örnek sesle ısıtılmış tanıyıcılarla doldurur.
+    Bloklayıcıdır; işçi thread'inde çalıştırılır.
+    """
+    with startup.step("model_load", critical=True):
+        model_registry.get(STT_MODEL_PATH)
+    if not model_registry.is_loaded(STT_MODEL_PATH):
+        return
+    sample_rate = FRONTEND_SETTINGS.get("target_sample_rate", 16000)
+    count = STT_SETTINGS.get("recognizer_pool_prewarm", 0)
+    warm = None
+    if STARTUP_SETTINGS.get("warmup_sample"):
+        # Örnek okunamazsa tanıyıcılar yine oluşturulur, yalnızca ısıtılmaz
+        with startup.step("warmup_sample"):
+            audio = load_warmup_audio(
+                resolve_path(STARTUP_SETTINGS["warmup_sample"]), sample_rate, STARTUP_SETTINGS.get("warmup_seconds", 1.0)
+            )
+
+            def warm(recognizer):
+                warm_up_recognizer(recognizer, audio)
+            # Havuz boyutu ayarlanmamış olsa da ilk bağlantı için en az bir tanıyıcı ısıtılır
+            count = max(count, 1)
+    if count:
+        with startup.step("recognizer_warmup", critical=True) as info:
+            info["recognizers"] = recognizer_pool.prewarm(STT_MODEL_PATH, sample_rate, count, warm=warm)
+
+
+async def warm_up_and_mark_ready():
+    if STT_SETTINGS.get("preload_model", True):
+        await asyncio.to_thread(warm_up_stt)
+    startup.mark_ready()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Uygulama açılış/kapanış kancaları.
+    HTTP istemcisi ve önbellek katmanları kurulur; Vosk modeli yüklenir ve havuzdaki tanıyıcılar
+    örnek sesle ısıtılır. Böylece ilk kiosk bağlantısı model yükleme ve ilk çözümleme maliyetini
+    ödemez. 'startup.warmup_in_background' açıksa STT ısıtması arka planda sürer; sunucu hemen
+    dinlemeye başlar ve '/ready' ısıtma bitene kadar 503 döner.
+    """
+    startup.begin()
+    decode_pool.start()
+    if observe_upstream_request not in gemini_client.stats_hooks:
+        gemini_client.stats_hooks.append(observe_upstream_request)
+    if gemini_client.policy is not None and observe_upstream_event not in gemini_client.policy.event_hooks:
+        gemini_client.policy.event_hooks.append(observe_upstream_event)
+    with startup.step("http_client", critical=True):
+        await gemini_client.start()
+    if intent_cache is not None:
+        with startup.step("intent_cache", errors=(OSError, ValueError, KeyError, pydantic.ValidationError)) as info:
+            info["entries"] = intent_cache.load_snapshot()
+    if tts_cache is not None:
+        with startup.step("tts_cache", errors=(OSError,)) as info:
+            info["disk_entries"] = await asyncio.to_thread(tts_cache.load_index)
+    ready_task = asyncio.create_task(warm_up_and_mark_ready())
+    if not STARTUP_SETTINGS.get("warmup_in_background", False):
+        await ready_task
+    warmup_task = None
+    if (tts_cache is not None and TTS_CACHE_SETTINGS.get("warmup", True) and GEMINI_API_KEY != "YOUR_API_KEY_HERE"
+            and is_primary_worker()):
+        # Ön-seslendirme arka planda yapılır; açılışı ve ilk istekleri bekletmez. Ön-çatallanmış
+        # sunucuda aynı ifadeleri her işçi ayrı ayrı seslendirip aynı dosyalara yazmasın diye yalnızca 0. işçi
+        warmup_task = asyncio.create_task(warm_up_tts_cache())
+    yield
+    for task in (ready_task, warmup_task):
+        if task is not None and not task.done():
+            task.cancel()
+    # Anlık görüntüyü tek işçi yazar; N işçinin kapanışta aynı dosyayı üst üste yazması önlenir
+    if intent_cache is not None and is_primary_worker():
+        try:
+            intent_cache.save_snapshot()
+        except OSError as e:
+            logger.error(f"Intent önbelleği diske yazılamadı: {e}")
+    await gemini_client.aclose()
+    decode_pool.shutdown()
+
 app = FastAPI(
     title="Holographic AI Assistant API",
-    description="Gerçek zamanlı STT, LLM Intent ve TTS servisleri."
+    description="Gerçek zamanlı STT, LLM Intent ve TTS servisleri.",
+    lifespan=lifespan
 )
+# Her HTTP isteği ve WebSocket bağlantısının logları request_id/session_id taşır
+app.add_middleware(LogContextMiddleware)
 
 # --- Veri Modelleri (Pydantic) ---
 class IntentRequest(pydantic.BaseModel):
     text: str
 
+class BatchIntentRequest(pydantic.BaseModel):
+    texts: list[str]
+
 class SynthesisRequest(pydantic.BaseModel):
     text: str
     voice: str = "Kore" # Varsayılan ses
@@ -52,7 +235,74 @@ class ClinicIntentResponse(pydantic.BaseModel):
     aciliyet: Literal["acil", "normal", "acil değil"]
     sebep_ozeti: str
 
+class BatchIntentItem(pydantic.BaseModel):
+    text: str
+    source: Optional[Literal["cache", "fast_path", "llm"]] = None
+    result: Optional[ClinicIntentResponse] = None
+    error: Optional[str] = None
+
+class BatchIntentResponse(pydantic.BaseModel):
+    results: list[BatchIntentItem]
+
+# --- Intent Önbelleği ---
+# Kiosklarda aynı şikayetler sık tekrarlanır; normalize edilmiş transkripte göre LLM sonucu saklanır
+INTENT_CACHE_SETTINGS = get_section("intent_cache")
+intent_cache = None
+if INTENT_CACHE_SETTINGS.get("enabled", True):
+    snapshot_path = INTENT_CACHE_SETTINGS.get("snapshot_path")
+    intent_cache = IntentCache(
+        ClinicIntentResponse,
+        max_size=INTENT_CACHE_SETTINGS.get("max_size", 1024),
+        ttl_s=INTENT_CACHE_SETTINGS.get("ttl_s", 86400.0),
+        snapshot_path=resolve_path(snapshot_path) if snapshot_path else None
+    )
+
+# --- Yerel Hızlı Yönlendirici ---
+# "dişim ağrıyor" gibi açık şikayetler LLM'e gitmeden ayar dosyasındaki tabloyla yönlendirilir
+FAST_ROUTER_SETTINGS = get_section("fast_router")
+intent_router = None
+if FAST_ROUTER_SETTINGS.get("enabled", True):
+    intent_router = FastIntentRouter.from_settings(FAST_ROUTER_SETTINGS, ClinicIntentResponse)
+
 # --- LLM API Fonksiyonu ---
+# Hastane asistanı rolü ve JSON zorlaması
+INTENT_SYSTEM_PROMPT = (
+    "Sen bir hastane karşılama asistanısın. Görevin, hastanın şikayetini analiz edip "
+    "onu *sadece* doğru polikliniğe yönlendirmektir. Tıbbi tavsiye verme, 'geçmiş olsun' deme. "
+    "Cevabını *sadece* istenen JSON formatında ver. "
+    "Eğer şikayet belirsizse 'poliklinik' alanını 'Belirsiz' olarak ayarla."
+)
+# Toplu analizde giriş, şikayetlerden oluşan bir JSON dizisidir
+BATCH_INTENT_INSTRUCTION = (
+    " Sana birden fazla hastanın şikayeti bir JSON dizisi olarak verilecek. Her şikayeti ayrı "
+    "değerlendir ve girişle aynı uzunlukta, aynı sırada bir JSON dizisi döndür."
+)
+
+UPSTREAM_RESILIENCE_SETTINGS = GEMINI_SETTINGS.get("resilience") or {}
+
+
+def upstream_unavailable_error(service: str, e: Exception) -> HTTPException:
+    """
+    Süre bütçesi dolan veya devre kesicinin reddettiği çağrı için 503 (Retry-After ile) hatası.
+    """
+    logger.error(f"{service} servisi şu anda kullanılamıyor: {e}")
+    retry_after = max(1, int(getattr(e, "retry_after", 0) or 1))
+    return HTTPException(
+        status_code=503, detail=f"{service} servisi şu anda yanıt vermiyor: {e}",
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+def degraded_intent() -> ClinicIntentResponse:
+    """
+    LLM'e ulaşılamadığında kullanılan yerel cevap: 'Belirsiz' poliklinik, hastaya önceden
+    seslendirilmiş geri dönüş cümlesini çaldırır. Önbelleğe yazılmaz.
+    """
+    return ClinicIntentResponse(
+        poliklinik="Belirsiz", aciliyet="normal", sebep_ozeti="Analiz servisi geçici olarak kullanılamıyor."
+    )
+
+
 async def fetch_llm_intent(text: str) -> ClinicIntentResponse:
     """
     Verilen metni analiz etmesi için Gemini LLM'e gönderir.
@@ -62,16 +312,8 @@ async def fetch_llm_intent(text: str) -> ClinicIntentResponse:
         logger.error("LLM İsteği Başarısız: GEMINI_API_KEY eksik.")
         raise HTTPException(status_code=500, detail="Sunucuda API anahtarı yapılandırılmamış.")
 
-    API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-preview-09-2025:generateContent?key={GEMINI_API_KEY}"
-    
-    # Hastane asistanı rolü ve JSON zorlaması
-    system_prompt = (
-        "Sen bir hastane karşılama asistanısın. Görevin, hastanın şikayetini analiz edip "
-        "onu *sadece* doğru polikliniğe yönlendirmektir. Tıbbi tavsiye verme, 'geçmiş olsun' deme. "
-        "Cevabını *sadece* istenen JSON formatında ver. "
-        "Eğer şikayet belirsizse 'poliklinik' alanını 'Belirsiz' olarak ayarla."
-    )
-    
+    system_prompt = INTENT_SYSTEM_PROMPT
+
     payload = {
         "contents": [{"parts": [{"text": text}]}],
         "systemInstruction": {"parts": [{"text": system_prompt}]},
@@ -82,35 +324,139 @@ async def fetch_llm_intent(text: str) -> ClinicIntentResponse:
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            logger.info(f"LLM İsteği Gönderiliyor (URL: ...flash-preview...): {text}")
-            response = await client.post(url, json=payload)
-            logger.info(f"LLM Yanıt Durumu: {response.status_code}")
-            
-            # API'den gelen hatayı logla ve düzgün bir hata fırlat
-            if response.status_code != 200:
-                 logger.error(f"LLM API Hatası (HTTP {response.status_code}): {response.text}")
-                 response.raise_for_status() # HTTP 4xx/5xx hatası varsa exception fırlat
-            
-            # Gemini'den gelen yanıtın içindeki JSON metnini parse et
-            raw_response_data = response.json()
-            json_text = raw_response_data["candidates"][0]["content"]["parts"][0]["text"]
-            parsed_json = json.loads(json_text)
-            
-            # Pydantic v1/v2 uyumlu parse etme ve döndürme
-            if IS_PYDANTIC_V2:
-                return ClinicIntentResponse(**parsed_json)
-            else:
-                return ClinicIntentResponse.parse_obj(parsed_json)
-            
+        logger.info(f"LLM İsteği Gönderiliyor (URL: ...flash-preview...): {text}")
+        response = await gemini_client.post(
+            "intent", LLM_MODEL_PATH, params={"key": GEMINI_API_KEY}, json=payload
+        )
+        logger.info(f"LLM Yanıt Durumu: {response.status_code}")
+        
+        # API'den gelen hatayı logla ve düzgün bir hata fırlat
+        if response.status_code != 200:
+             logger.error(f"LLM API Hatası (HTTP {response.status_code}): {response.text}")
+             response.raise_for_status() # HTTP 4xx/5xx hatası varsa exception fırlat
+        
+        # Gemini'den gelen yanıtın içindeki JSON metnini parse et
+        raw_response_data = response.json()
+        json_text = raw_response_data["candidates"][0]["content"]["parts"][0]["text"]
+        parsed_json = json.loads(json_text)
+        
+        # Pydantic v1/v2 uyumlu parse etme ve döndürme
+        if IS_PYDANTIC_V2:
+            return ClinicIntentResponse(**parsed_json)
+        else:
+            return ClinicIntentResponse.parse_obj(parsed_json)
+        
     except httpx.HTTPStatusError as e:
         logger.error(f"LLM API Hatası (HTTP {e.response.status_code}): {e.response.text}")
         raise HTTPException(status_code=500, detail=f"LLM servisi hatası: {e.response.text}")
+    except (UpstreamUnavailable, httpx.TimeoutException) as e:
+        raise upstream_unavailable_error("LLM", e)
     except (httpx.RequestError, json.JSONDecodeError, KeyError, pydantic.ValidationError) as e:
         logger.error(f"LLM İsteği Başarısız: {e}")
         raise HTTPException(status_code=500, detail=f"LLM servisine ulaşılamadı veya yanıtı geçersiz: {e}")
 
 
+async def fetch_llm_intents(texts: list) -> list:
+    """
+    Birden fazla metni tek bir Gemini isteğinde analiz eder (dizi 'responseSchema' ile).
+    Sonuçları girişle aynı sırada ClinicIntentResponse listesi olarak döndürür.
+    Tek metin için normal (tekil) istem kullanılır.
+    """
+    if len(texts) == 1:
+        return [await fetch_llm_intent(texts[0])]
+    if not GEMINI_API_KEY or GEMINI_API_KEY == "YOUR_API_KEY_HERE":
+        logger.error("LLM Toplu İsteği Başarısız: GEMINI_API_KEY eksik.")
+        raise HTTPException(status_code=500, detail="Sunucuda API anahtarı yapılandırılmamış.")
+
+    payload = {
+        "contents": [{"parts": [{"text": json.dumps(texts, ensure_ascii=False)}]}],
+        "systemInstruction": {"parts": [{"text": INTENT_SYSTEM_PROMPT + BATCH_INTENT_INSTRUCTION}]},
+        "generationConfig": {
+            "responseMimeType": "application/json",
+            "responseSchema": {"type": "array", "items": ClinicIntentResponse.model_json_schema()}
+        }
+    }
+
+    try:
+        logger.info(f"LLM Toplu İsteği Gönderiliyor ({len(texts)} metin).")
+        response = await gemini_client.post(
+            "intent", LLM_MODEL_PATH, params={"key": GEMINI_API_KEY}, json=payload
+        )
+        if response.status_code != 200:
+            logger.error(f"LLM API Hatası (HTTP {response.status_code}): {response.text}")
+            response.raise_for_status()
+
+        json_text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
+        parsed = json.loads(json_text)
+        if not isinstance(parsed, list) or len(parsed) != len(texts):
+            raise ValueError(f"LLM {len(texts)} sonuç yerine {len(parsed) if isinstance(parsed, list) else 'dizi olmayan'} yanıt döndürdü.")
+        return [ClinicIntentResponse(**item) for item in parsed]
+
+    except httpx.HTTPStatusError as e:
+        logger.error(f"LLM API Hatası (HTTP {e.response.status_code}): {e.response.text}")
+        raise HTTPException(status_code=500, detail=f"LLM servisi hatası: {e.response.text}")
+    except (UpstreamUnavailable, httpx.TimeoutException) as e:
+        raise upstream_unavailable_error("LLM", e)
+    except (httpx.RequestError, ValueError, KeyError, TypeError, pydantic.ValidationError) as e:
+        logger.error(f"LLM Toplu İsteği Başarısız: {e}")
+        raise HTTPException(status_code=500, detail=f"LLM servisine ulaşılamadı veya yanıtı geçersiz: {e}")
+
+
+async def process_intent_batch(texts: list) -> list:
+    INTENT_BATCH_SIZE.observe(len(texts), path="micro")
+    return await fetch_llm_intents(texts)
+
+
+# --- Intent Mikro-Toplayıcı ---
+# Kısa bir pencerede gelen eşzamanlı tekil istekler tek bir LLM çağrısında birleştirilir
+INTENT_BATCH_SETTINGS = get_section("intent_batch")
+intent_batcher = None
+if INTENT_BATCH_SETTINGS.get("enabled", True):
+    intent_batcher = MicroBatcher(
+        process_intent_batch,
+        max_batch_size=INTENT_BATCH_SETTINGS.get("max_batch_size", 16),
+        max_wait_ms=INTENT_BATCH_SETTINGS.get("max_wait_ms", 10.0)
+    )
+
+
+async def get_intent(text: str) -> ClinicIntentResponse:
+    """
+    Önce intent önbelleğine, sonra yerel hızlı yönlendiriciye bakar; ikisi de cevap
+    veremezse LLM'e sorar ve sonucu önbelleğe yazar. LLM'e süre bütçesi içinde ulaşılamazsa
+    (503) önbelleğe yazılmayan yerel geri dönüş cevabı döner.
+    """
+    if intent_cache is not None:
+        cached = intent_cache.get(text)
+        if cached is not None:
+            logger.info("Intent önbellekten döndü.")
+            INTENT_RESULTS.inc(source="cache")
+            return cached
+
+    if intent_router is not None:
+        routed = intent_router.route(text)
+        if routed is not None:
+            logger.info(f"Intent yerel yönlendiriciden döndü ({routed.poliklinik}).")
+            INTENT_RESULTS.inc(source="fast_path")
+            return routed
+
+    try:
+        if intent_batcher is not None:
+            intent_data = await intent_batcher.submit(text)
+        else:
+            intent_data = await fetch_llm_intent(text)
+    except HTTPException as e:
+        # Üst servis yavaş/çökmüşse hasta, zaman aşımını beklemek yerine yerel bir cevap alır
+        if e.status_code != 503 or not UPSTREAM_RESILIENCE_SETTINGS.get("degraded_intent_fallback", True):
+            raise
+        logger.warning("LLM kullanılamıyor; intent için yerel geri dönüş cevabı verildi.")
+        INTENT_RESULTS.inc(source="fallback")
+        return degraded_intent()
+    INTENT_RESULTS.inc(source="llm")
+    if intent_cache is not None:
+        intent_cache.put(text, intent_data)
+    return intent_data
+
+
 # --- API Endpoint 1: Intent (LLM Analizi) ---
 
 @app.post("/api/get_intent", response_model=ClinicIntentResponse)
@@ -122,104 +468,489 @@ async def get_intent_endpoint(request: IntentRequest):
     if not request.text.strip():
         raise HTTPException(status_code=400, detail="Metin boş olamaz.")
         
-    intent_data = await fetch_llm_intent(request.text)
+    with REQUEST_SECONDS.time(endpoint="get_intent"):
+        intent_data = await get_intent(request.text)
     logger.info(f"Intent Sonucu: {intent_data.model_dump_json(ensure_ascii=False)}")
     return intent_data
 
-# --- API Endpoint 2: Synthesize (TTS) ---
+@app.post("/api/get_intent/batch", response_model=BatchIntentResponse)
+async def get_intent_batch_endpoint(request: BatchIntentRequest):
+    """
+    Çok sayıda metni (kuyruktaki transkriptlerin yeniden değerlendirilmesi, analitik) analiz eder.
+    Önbellek ve yerel yönlendiricinin cevaplayamadığı metinler tekilleştirilir ve
+    'intent_batch.max_batch_size'lık gruplar halinde, grup başına tek LLM çağrısıyla analiz edilir.
+    Sonuçlar giriş sırasıyla döner; başarısız olan grupların öğelerinde 'error' doludur.
+    """
+    max_texts = INTENT_BATCH_SETTINGS.get("max_request_texts", 1000)
+    if not request.texts:
+        raise HTTPException(status_code=400, detail="Metin listesi boş olamaz.")
+    if len(request.texts) > max_texts:
+        raise HTTPException(status_code=413, detail=f"Tek istekte en fazla {max_texts} metin gönderilebilir.")
+    logger.info(f"Toplu Intent İsteği Alındı ({len(request.texts)} metin).")
 
-@app.post("/api/synthesize")
-async def synthesize_endpoint(request: SynthesisRequest):
+    items = [BatchIntentItem(text=text) for text in request.texts]
+    pending = {}  # normalize edilmiş metin -> öğe indeksleri (aynı şikayet bir kez sorulur)
+    for index, text in enumerate(request.texts):
+        if not text.strip():
+            items[index].error = "Metin boş olamaz."
+            continue
+        cached = intent_cache.get(text) if intent_cache is not None else None
+        if cached is not None:
+            items[index].result, items[index].source = cached, "cache"
+            continue
+        routed = intent_router.route(text) if intent_router is not None else None
+        if routed is not None:
+            items[index].result, items[index].source = routed, "fast_path"
+            continue
+        pending.setdefault(normalize_transcript(text), []).append(index)
+
+    keys = list(pending)
+    batch_size = INTENT_BATCH_SETTINGS.get("max_batch_size", 16)
+    slots = asyncio.Semaphore(INTENT_BATCH_SETTINGS.get("concurrency", 4))
+
+    async def analyze_group(group: list):
+        texts = [request.texts[pending[key][0]] for key in group]
+        async with slots:
+            INTENT_BATCH_SIZE.observe(len(texts), path="api")
+            try:
+                results = await fetch_llm_intents(texts)
+            except HTTPException as e:
+                for key in group:
+                    for index in pending[key]:
+                        items[index].error = e.detail
+                return
+        for key, text, result in zip(group, texts, results):
+            if intent_cache is not None:
+                intent_cache.put(text, result)
+            for index in pending[key]:
+                items[index].result, items[index].source = result, "llm"
+
+    await asyncio.gather(*(analyze_group(keys[i:i + batch_size]) for i in range(0, len(keys), batch_size)))
+    return BatchIntentResponse(results=items)
+
+# --- TTS Fonksiyonu ---
+async def fetch_tts_audio(text: str, voice: str):
     """
-    Bir metin alır, Gemini TTS ile sese dönüştürür ve WAV dosyası olarak döndürür.
+    Metni Gemini TTS'e gönderir.
+    (base64 kodlu ham PCM, örnekleme hızı) döndürür; çözme işlemi çağırana bırakılır.
     """
-    logger.info(f"TTS İsteği Alındı: '{request.text}' (Ses: {request.voice})")
     if not GEMINI_API_KEY or GEMINI_API_KEY == "YOUR_API_KEY_HERE":
         logger.error("TTS İsteği Başarısız: GEMINI_API_KEY eksik.")
         raise HTTPException(status_code=500, detail="Sunucuda API anahtarı yapılandırılmamış.")
 
-    API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-preview-tts:generateContent?key={GEMINI_API_KEY}"
-    
     payload = {
-        "contents": [{"parts": [{"text": request.text}]}],
+        "contents": [{"parts": [{"text": text}]}],
         "generationConfig": {
             "responseModalities": ["AUDIO"],
             "speechConfig": {
-                "voiceConfig": {"prebuiltVoiceConfig": {"voiceName": request.voice}}
+                "voiceConfig": {"prebuiltVoiceConfig": {"voiceName": voice}}
             }
         },
         "model": "gemini-2.5-flash-preview-tts"
     }
 
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            response = await client.post(API_URL, json=payload, headers={"Content-Type": "application/json"})
-            response.raise_for_status()
+        response = await gemini_client.post(
+            "tts", TTS_MODEL_PATH, params={"key": GEMINI_API_KEY}, json=payload,
+            headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
 
-            res_json = response.json()
-            part = res_json["candidates"][0]["content"]["parts"][0]
-            audio_data_base64 = part["inlineData"]["data"]
-            mime_type = part["inlineData"]["mimeType"] # "audio/L16;rate=24000"
-            
-            sample_rate = int(mime_type.split("rate=")[1])
-            audio_data_pcm = base64.b64decode(audio_data_base64)
-
-            # Ham PCM verisini WAV formatına dönüştür
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wf:
-                wf.setnchannels(1)  # Mono
-                wf.setsampwidth(2)  # 16-bit PCM (L16)
-                wf.setframerate(sample_rate)
-                wf.writeframes(audio_data_pcm)
-            
-            wav_buffer.seek(0)
-            logger.info(f"TTS Başarılı: {len(wav_buffer.getvalue())} bytes WAV oluşturuldu.")
-            return Response(content=wav_buffer.getvalue(), media_type="audio/wav")
+        res_json = response.json()
+        part = res_json["candidates"][0]["content"]["parts"][0]
+        audio_data_base64 = part["inlineData"]["data"]
+        mime_type = part["inlineData"]["mimeType"] # "audio/L16;rate=24000"
+        
+        sample_rate = int(mime_type.split("rate=")[1])
+        return audio_data_base64, sample_rate
 
+    except (UpstreamUnavailable, httpx.TimeoutException) as e:
+        raise upstream_unavailable_error("TTS", e)
     except Exception as e:
         logger.error(f"TTS İsteği Başarısız: {e}")
         raise HTTPException(status_code=500, detail=f"TTS servisi hatası: {e}")
 
+
+async def synthesize_wav(text: str, voice: str) -> bytes:
+    """
+    Metni Gemini TTS ile sese dönüştürür ve WAV baytları olarak döndürür.
+    """
+    audio_data_base64, sample_rate = await fetch_tts_audio(text, voice)
+    with TTS_STAGE_SECONDS.time(stage="base64_decode"):
+        audio_data_pcm = base64.b64decode(audio_data_base64)
+
+    # Ham PCM verisinin önüne WAV başlığını ekle (16-bit mono L16)
+    with TTS_STAGE_SECONDS.time(stage="wav_package"):
+        wav_bytes = b"".join((wav_header(sample_rate, len(audio_data_pcm)), audio_data_pcm))
+    logger.info(f"TTS Başarılı: {len(wav_bytes)} bytes WAV oluşturuldu.")
+    return wav_bytes
+
+
+async def synthesize_cached(text: str, voice: str) -> bytes:
+    """
+    TTS önbelleğini atlayıp sentezler ve sonucu hem belleğe hem diske yazar.
+    Önceden seslendirme (warm-up) ve önbellek ıskalamaları bu yolu kullanır.
+    """
+    wav_bytes = await synthesize_wav(text, voice)
+    if tts_cache is not None:
+        key = tts_cache_key(text, voice, TTS_SAMPLE_RATE)
+        tts_cache.put_memory(key, wav_bytes)
+        try:
+            await asyncio.to_thread(tts_cache.write_disk, key, wav_bytes)
+        except OSError as e:
+            logger.error(f"TTS önbelleği diske yazılamadı: {e}")
+    return wav_bytes
+
+
+async def warm_up_tts_cache():
+    """
+    Sabit cevap cümlelerini (geri dönüş ve poliklinik yönlendirmeleri) önceden seslendirir.
+    Diskte zaten bulunan cümleler atlanır.
+    """
+    voice = TTS_CACHE_SETTINGS.get("warmup_voice", "Kore")
+    phrases = fixed_reply_phrases(CLINICS)
+    rendered = 0
+    for phrase in phrases:
+        key = tts_cache_key(phrase, voice, TTS_SAMPLE_RATE)
+        if tts_cache.contains(key):
+            continue
+        try:
+            await synthesize_cached(phrase, voice)
+            rendered += 1
+        except HTTPException as e:
+            logger.error(f"TTS ön-seslendirme başarısız ('{phrase}'): {e.detail}")
+    logger.info(f"TTS önbelleği ısıtıldı: {rendered} yeni, {len(phrases) - rendered} mevcut cümle.")
+
+
+# --- API Endpoint 2: Synthesize (TTS) ---
+
+@app.post("/api/synthesize")
+async def synthesize_endpoint(request: SynthesisRequest):
+    """
+    Bir metin alır, Gemini TTS ile sese dönüştürür ve WAV dosyası olarak döndürür.
+    Önbellekte hazır ses varsa yeniden kodlamadan doğrudan tampondan veya dosyadan döner.
+    """
+    logger.info(f"TTS İsteği Alındı: '{request.text}' (Ses: {request.voice})")
+    with REQUEST_SECONDS.time(endpoint="synthesize"):
+        if tts_cache is not None:
+            source, cached = tts_cache.lookup(tts_cache_key(request.text, request.voice, TTS_SAMPLE_RATE))
+            if source == "memory":
+                return Response(content=cached, media_type="audio/wav", headers={"X-TTS-Cache": "memory"})
+            if source == "disk":
+                return FileResponse(cached, media_type="audio/wav", headers={"X-TTS-Cache": "disk"})
+
+        wav_bytes = await synthesize_cached(request.text, request.voice)
+        return Response(content=wav_bytes, media_type="audio/wav", headers={"X-TTS-Cache": "miss"})
+
+
+@app.post("/api/synthesize/stream")
+async def synthesize_stream_endpoint(request: SynthesisRequest):
+    """
+    Uzun metinleri cümlelere bölüp eşzamanlı seslendirir ve sesi parçalı (chunked) akış olarak döndürür:
+    önce WAV başlığı, ardından her cümlenin PCM verisi sırasıyla, hazır oldukça gönderilir.
+    Hologramın ilk sesi çalma süresi, toplam sentez süresine değil ilk cümlenin süresine eşit olur.
+    """
+    logger.info(f"TTS Akış İsteği Alındı: '{request.text}' (Ses: {request.voice})")
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="Metin boş olamaz.")
+
+    # Metnin tamamı önbellekteyse akışa gerek yok
+    if tts_cache is not None:
+        source, cached = tts_cache.lookup(tts_cache_key(request.text, request.voice, TTS_SAMPLE_RATE))
+        if source == "memory":
+            return Response(content=cached, media_type="audio/wav", headers={"X-TTS-Cache": "memory"})
+        if source == "disk":
+            return FileResponse(cached, media_type="audio/wav", headers={"X-TTS-Cache": "disk"})
+
+    segments = split_sentences(request.text, TTS_SETTINGS.get("stream_min_segment_chars", 20))
+    segment_audio = iter_segments_in_order(
+        segments,
+        lambda segment: fetch_tts_audio(segment, request.voice),
+        concurrency=TTS_SETTINGS.get("stream_concurrency", 3)
+    )
+
+    # İlk parça başlıktan önce beklenir: hata olursa istemci hâlâ düzgün bir HTTP 500 alır
+    try:
+        first_base64, sample_rate = await segment_audio.__anext__()
+    except BaseException:
+        await segment_audio.aclose()
+        raise
+
+    async def audio_stream():
+        try:
+            yield wav_header(sample_rate)
+            for pcm in iter_pcm_from_base64(first_base64):
+                yield pcm
+            async for audio_base64, segment_rate in segment_audio:
+                if segment_rate != sample_rate:
+                    logger.warning(f"TTS parça örnekleme hızı farklı ({segment_rate} != {sample_rate}).")
+                for pcm in iter_pcm_from_base64(audio_base64):
+                    yield pcm
+        except HTTPException as e:
+            # Başlık gönderildikten sonra durum kodu değiştirilemez; akış kısa kesilir
+            logger.error(f"TTS akışı yarıda kesildi: {e.detail}")
+        finally:
+            await segment_audio.aclose()
+
+    return StreamingResponse(
+        audio_stream(), media_type="audio/wav",
+        headers={"X-TTS-Cache": "miss", "X-TTS-Segments": str(len(segments))}
+    )
+
 # --- API Endpoint 3: Gerçek Zamanlı STT (WebSocket) ---
 
+def create_vad(enabled, sample_rate: int):
+    """
+    Bağlantı için VAD/endpointer oluşturur. 'enabled' None ise ayar dosyasındaki varsayılan kullanılır.
+    """
+    if enabled is None:
+        enabled = VAD_SETTINGS.get("enabled", True)
+    return VADEndpointer.from_settings(VAD_SETTINGS, sample_rate) if enabled else None
+
+
+def create_front_end(sample_rate: int, denoise=None):
+    """
+    Bağlantı için ses ön işleme aşamasını oluşturur. İstemci hızı hedef hızdan farklıysa
+    veya gürültü bastırma açıksa bir 'AudioFrontEnd' döner; aksi halde None (ek maliyet yok).
+    'denoise' None ise ayar dosyasındaki varsayılan kullanılır.
+    """
+    target_rate = FRONTEND_SETTINGS.get("target_sample_rate", 16000)
+    if denoise is None:
+        denoise = FRONTEND_SETTINGS.get("noise_suppression", False)
+    if sample_rate == target_rate and not denoise:
+        return None
+    return AudioFrontEnd.from_settings(FRONTEND_SETTINGS, sample_rate, noise_suppression=denoise)
+
+
+def resolve_grammar(name: Optional[str]) -> Optional[str]:
+    """
+    İstenen dilbilgisi adını doğrular. Boş bırakılırsa 'stt.default_grammar' kullanılır;
+    'full' tam dil modelini seçer (None döner). Tanımsız ad için ValueError fırlatılır.
+    """
+    if name is None:
+        name = DEFAULT_GRAMMAR
+    if name in (None, "", FULL_GRAMMAR):
+        return None
+    if name not in STT_GRAMMARS:
+        raise ValueError(f"Tanımsız dilbilgisi: '{name}' (tanımlı olanlar: {', '.join([FULL_GRAMMAR, *STT_GRAMMARS])})")
+    return name
+
+
+async def open_stt_service(decode_rate: int, grammar: Optional[str] = None) -> STTService:
+    """
+    Tanıyıcı havuzundan sıfırlanmış bir tanıyıcı alıp bağlantıya özel STTService oluşturur.
+    Havuz doluysa 'acquire_timeout' kadar beklenir, sonra RecognizerPoolExhausted fırlatılır.
+    """
+    with STT_RECOGNIZER_ACQUIRE_SECONDS.time():
+        recognizer = await asyncio.to_thread(recognizer_pool.acquire, STT_MODEL_PATH, decode_rate, grammar)
+    return STTService(sample_rate=decode_rate, model_path=STT_MODEL_PATH, recognizer=recognizer)
+
+
+def close_stt_service(stt_service: Optional[STTService], decode_rate: int, grammar: Optional[str] = None,
+                      reuse: bool = True):
+    """
+    Bağlantının tanıyıcısını havuza geri verir. Bağlantı iptal edildiyse işçi thread'inde
+    hâlâ bir çözümleme sürüyor olabilir; bu durumda ('reuse=False') tanıyıcı atılır.
+    """
+    if stt_service is not None:
+        recognizer_pool.release(stt_service.recognizer, STT_MODEL_PATH, decode_rate, grammar, reuse=reuse)
+
+
+def transcribe_chunks(stt_service: STTService, vad, chunks: list, front_end=None, throttle=None,
+                      decoder=None) -> list:
+    """
+    Bir veya daha fazla ses parçasını (varsa ön işleme ve VAD'den geçirerek) çözümler ve
+    istemciye gidecek sonuçları döndürür. Sessiz çerçeveler tanıyıcıya hiç verilmez; konuşma
+    sonu algılanınca nihai sonuç zorlanır. Birden fazla parça geldiyse (çözümleme geride
+    kaldığında biriken parçalar) konuşma kısımları birleştirilip tek AcceptWaveform çağrısıyla
+    işlenir; VAD parça parça çalıştığı için konuşma sonları ve nihai sonuçlar gecikmez.
+    Kısmi sonuç yalnızca son çağrıda ve 'throttle' izin veriyorsa hesaplanır.
+    'decoder' (WireDecoder) verilirse μ-law/float32 parçalar önce PCM16'ya çevrilir.
+    İşçi havuzunda çalışır; ön işleme ve VAD durumu bağlantıya özel olduğundan DecodeStream sırası yeterlidir.
+    """
+    results = []
+    speech = []
+    if decoder is not None and not decoder.passthrough:
+        with STT_STAGE_SECONDS.time(stage="wire_decode"):
+            chunks = decoder.decode(chunks)
+    for chunk in chunks:
+        if front_end is not None:
+            with STT_STAGE_SECONDS.time(stage="front_end"):
+                chunk = front_end.process(chunk)
+            if not chunk:
+                continue
+        if vad is None:
+            speech.append(chunk)
+            continue
+
+        with STT_STAGE_SECONDS.time(stage="vad"):
+            vad_result = vad.process(chunk)
+        if vad_result.speech:
+            speech.append(vad_result.speech)
+        if vad_result.end_of_speech:
+            if speech:
+                # Hemen ardından nihai sonuç geleceği için kısmi sonuç hesaplanmaz
+                results.append(stt_service.transcribe_chunk(b"".join(speech), partial=False))
+                speech = []
+            results.append(stt_service.get_final_result())
+    if speech:
+        partial = throttle is None or throttle.due()
+        results.append(stt_service.transcribe_chunk(b"".join(speech), partial=partial))
+    return [result for result in results if result is not None]
+
+
+def transcribe_with_vad(stt_service: STTService, vad, chunk: bytes, front_end=None, throttle=None,
+                        decoder=None) -> list:
+    """
+    Tek bir ses parçası için 'transcribe_chunks'.
+    """
+    return transcribe_chunks(stt_service, vad, [chunk], front_end, throttle, decoder)
+
+
+def finish_utterance(stt_service: STTService, front_end=None) -> dict:
+    """
+    Ön işlemede bekleyen sesi tanıyıcıya verip nihai sonucu zorlar (işçi havuzunda çalışır).
+    """
+    if front_end is not None:
+        tail = front_end.flush()
+        if tail:
+            stt_service.recognizer.AcceptWaveform(tail)
+    return stt_service.get_final_result()
+
+
 @app.websocket("/ws/stream_stt")
-async def websocket_stt_endpoint(websocket: WebSocket, sample_rate: int = 16000):
+async def websocket_stt_endpoint(websocket: WebSocket, sample_rate: int = 16000, vad: Optional[bool] = None,
+                                 denoise: Optional[bool] = None, grammar: Optional[str] = None,
+                                 encoding: Optional[str] = None):
     """
     Aktif dinleyici (STT) WebSocket endpoint'i.
     İstemciden (örn. tarayıcı, mobil) gelen ham ses (PCM) akışını alır.
     Sesi gerçek zamanlı olarak metne döker.
     Kısmi (partial) ve nihai (final) transkriptleri JSON olarak geri gönderir.
+    'vad' parametresi sessizlik ayıklama/konuşma sonu algılamayı açar veya kapatır.
+    'sample_rate' hedef hızdan (16 kHz) farklıysa ses sunucuda yeniden örneklenir;
+    'denoise' gürültü bastırmayı açar veya kapatır.
+    'grammar' ayarlardaki bir dilbilgisi adıdır (örn. 'yes_no'); verilirse yalnızca o kelime
+    dağarcığıyla çözümlenir, 'full' tam dil modelini seçer.
+    'encoding' sesin kablo kodlamasıdır: 'pcm16' (varsayılan), 'float32' (Web Audio örnekleri)
+    veya 'mulaw' (G.711, yarı bant genişliği). Sorgu parametresi yerine ilk mesaj olarak
+    '{"encoding": "mulaw"}' metin mesajı da gönderilebilir; ses başladıktan sonra değiştirilemez.
     """
     await websocket.accept()
-    logger.info(f"WebSocket bağlantısı kabul edildi (Rate: {sample_rate}).")
+    logger.info(f"WebSocket bağlantısı kabul edildi (Rate: {sample_rate}, Dilbilgisi: {grammar}, Kodlama: {encoding}).")
+    try:
+        grammar = resolve_grammar(grammar)
+        decoder = WireDecoder(encoding)
+    except ValueError as e:
+        # 1008: "Policy Violation" - geçersiz bağlantı parametresi
+        await websocket.close(code=1008, reason=str(e))
+        return
+    front_end = create_front_end(sample_rate, denoise)
+    decode_rate = front_end.out_rate if front_end is not None else sample_rate
+    vad_endpointer = create_vad(vad, decode_rate)
+    ACTIVE_STREAMS.inc(endpoint="stream_stt")
+    stream_opened()
+    stt_service = None
+    reusable = True
+    throttle = PartialThrottle.from_settings(STT_SETTINGS)
+    coalesce_s = STT_SETTINGS.get("coalesce_max_ms", 1000) / 1000
+    coalescer = ChunkCoalescer(
+        max_chunks=STT_SETTINGS.get("receive_queue_chunks", 32),
+        max_bytes=int(sample_rate * decoder.sample_width * coalesce_s)
+    )
+
+    async def receive_audio():
+        # Alım çözümlemeden ayrı bir görevde yapılır; çözümleme geride kalırsa parçalar birikir
+        audio_started = False
+        try:
+            while True:
+                # Not: Tarayıcılar genelde 'bytes' yollar, Python istemcileri de 'bytes' yollamalı
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                if message.get("bytes") is None:
+                    # Tek kontrol mesajı: sesten önce kodlama seçimi
+                    control = parse_control_message(message.get("text") or "")
+                    if control is None or "encoding" not in control:
+                        raise WireEncodingError("Beklenmeyen metin mesajı; yalnızca '{\"encoding\": ...}' kabul edilir.")
+                    if audio_started:
+                        raise WireEncodingError("Ses kodlaması ses akışı başladıktan sonra değiştirilemez.")
+                    decoder.set_encoding(control["encoding"])
+                    coalescer.max_bytes = int(sample_rate * decoder.sample_width * coalesce_s)
+                    continue
+                audio_chunk = message["bytes"]
+                audio_started = True
+                STT_AUDIO_BYTES.inc(len(audio_chunk), endpoint="stream_stt")
+                await coalescer.put(audio_chunk)
+        except WebSocketDisconnect:
+            await coalescer.put(None)
+        except Exception as e:
+            await coalescer.put(e)
+
+    receiver = asyncio.create_task(receive_audio())
     
     try:
-        # Her bağlantı için yeni, stateful bir STTService başlat
-        stt_service = STTService(sample_rate=sample_rate)
+        # Her bağlantı için stateful bir STTService başlat (tanıyıcı havuzdan, sıfırlanmış olarak gelir)
+        stt_service = await open_stt_service(decode_rate, grammar)
+        # Bu bağlantının parçaları havuzda sırayla çözümlenir
+        decode_stream = decode_pool.stream()
         
-        # WebSocket üzerinden gelen ses 'chunk'larını dinle
+        # Biriken ses 'chunk'larını toplu halde al
         while True:
-            # Not: Tarayıcılar genelde 'bytes' yollar, Python istemcileri de 'bytes' yollamalı
-            audio_chunk = await websocket.receive_bytes()
+            chunks = await coalescer.get_batch()
+            if chunks is None:
+                raise WebSocketDisconnect()
+            STT_COALESCED_CHUNKS.observe(len(chunks))
             
-            # Gelen 'chunk'ı işle
-            result = stt_service.transcribe_chunk(audio_chunk)
+            # Parçaları işçi havuzunda işle (olay döngüsü bloklanmaz)
+            results = await decode_stream.submit(
+                transcribe_chunks, stt_service, vad_endpointer, chunks, front_end, throttle, decoder
+            )
             
-            # Sadece anlamlı bir metin varsa (boş değilse) istemciye gönder
-            if result and result.get("text"):
-                await websocket.send_json(result)
-                
-                # Eğer nihai sonuçsa logla
-                if result.get("type") == "final":
-                    logger.info(f"WebSocket Nihai Transkript: '{result['text']}'")
+            for result in results:
+                # Sadece anlamlı ve (kısmi sonuçsa) değişmiş metni, en fazla 'partial_min_interval_ms'de bir gönder
+                if throttle.should_send(result):
+                    await websocket.send_json(result)
+                    STT_RESULTS.inc(endpoint="stream_stt", type=result["type"])
+                    
+                    # Eğer nihai sonuçsa logla; kısmi sonuçlar örneklenerek loglanır
+                    if result.get("type") == "final":
+                        logger.info(f"WebSocket Nihai Transkript: '{result['text']}'")
+                    else:
+                        # %-argümanları: örneklemeyle elenen kayıtta metin hiç birleştirilmez
+                        logger.info("WebSocket Kısmi Transkript: '%s'", result["text"], extra={"sample": "partial"})
 
     except WebSocketDisconnect:
         logger.warning("WebSocket bağlantısı kapandı (Disconnect).")
+        logger.info(f"Kısmi sonuç istatistikleri: {throttle.stats()}, birleştirme: {coalescer.stats()}")
+        if vad_endpointer is not None:
+            logger.info(f"VAD istatistikleri: {vad_endpointer.stats()}")
+        if front_end is not None:
+            logger.info(f"Ön işleme istatistikleri: {front_end.stats()}")
         # (Opsiyonel: Bağlantı koptuğunda eldeki son veriyi de gönderebilirsiniz)
         # last_result = stt_service.get_final_result()
         # if last_result and last_result.get("text"):
         #     await websocket.send_json(last_result)
             
+    except WireEncodingError as e:
+        logger.warning(f"WebSocket kodlama hatası: {e}")
+        try:
+            await websocket.close(code=1008, reason=str(e))
+        except:
+            pass
+
+    except (DecodeQueueFull, RecognizerPoolExhausted) as e:
+        logger.error(f"WebSocket Hatası (kapasite dolu): {e}")
+        # 1013: "Try Again Later" - istemci kısa süre sonra yeniden bağlanabilir
+        try:
+            await websocket.close(code=1013, reason="Sunucu meşgul, lütfen tekrar deneyin.")
+        except:
+            pass
+
+    except asyncio.CancelledError:
+        reusable = False
+        raise
+
     except Exception as e:
         logger.error(f"WebSocket Hatası: {e}")
         # Hata durumunda istemciye bir hata mesajı göndermeyi deneyin
@@ -228,16 +959,732 @@ async def websocket_stt_endpoint(websocket: WebSocket, sample_rate: int = 16000)
         except:
             pass # Bağlantı zaten kopmuşsa (örn. VADİ hatası) pass geç
 
+    finally:
+        receiver.cancel()
+        for reason, count in throttle.suppressed.items():
+            if count:
+                STT_PARTIALS_SUPPRESSED.inc(count, endpoint="stream_stt", reason=reason)
+        close_stt_service(stt_service, decode_rate, grammar, reuse=reusable)
+        ACTIVE_STREAMS.dec(endpoint="stream_stt")
+        stream_closed()
+
+
+# --- API Endpoint 4: Dosya Transkripsiyonu (toplu) ---
+
+TRANSCRIBE_SETTINGS = get_section("transcribe")
+WAV_CONTENT_TYPES = {"audio/wav", "audio/x-wav", "audio/wave", "audio/vnd.wave", "application/octet-stream"}
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+
+class UploadTooLarge(Exception):
+    """
+    Yükleme 'transcribe' ayarlarındaki boyut veya dosya sayısı sınırını aştı.
+    """
+
+
+def decode_file_block(stt_service: STTService, front_end, pcm: bytes, final: bool = False) -> tuple:
+    """
+    Dosyadan okunan bir ses bloğunu çözümler (işçi havuzunda çalışır). Kısmi sonuç hesaplanmaz.
+    'final' ise bekleyen ses de işlenip nihai sonuç zorlanır. (metinler, çözümleme süresi) döndürür.
+    """
+    started = time.perf_counter()
+    texts = []
+    if front_end is not None and pcm:
+        pcm = front_end.process(pcm)
+    if pcm:
+        result = stt_service.transcribe_chunk(pcm, partial=False)
+        if result is not None and result["text"]:
+            texts.append(result["text"])
+    if final:
+        result = finish_utterance(stt_service, front_end)
+        if result["text"]:
+            texts.append(result["text"])
+    return texts, time.perf_counter() - started
+
+
+class FileTranscription:
+    """
+    Tek bir WAV dosyasının yükleme sırasında, diske yazılmadan çözümlenmesi.
+
+    Baytlar geldikçe 'feed' ile verilir: başlık ayrıştırılınca havuzdan tanıyıcı alınır,
+    ses 'block_ms'lik bloklar halinde dosyaya özel DecodeStream ile sırayla çözümlenir.
+    Çözümlenmeyi bekleyen blok sayısı 'max_in_flight_blocks' ile sınırlıdır; çözümleme
+    geride kalırsa alım bekler (bellek büyümez). 'slots' verilirse dosya açık kaldığı
+    sürece bir yer tutar (aynı anda çözümlenen dosya sayısı sınırı).
+    Hatalar isteği düşürmez; dosyanın sonucunda 'error' olarak raporlanır.
+    """
+    def __init__(self, name: str, grammar: Optional[str] = None, slots: Optional[asyncio.Semaphore] = None):
+        self.name = name
+        self.grammar = grammar
+        self.slots = slots
+        self.parser = WavStreamParser()
+        self.max_in_flight = max(1, TRANSCRIBE_SETTINGS.get("max_in_flight_blocks", 4))
+        self.block_bytes = 0
+        self.stt_service = None
+        self.front_end = None
+        self.decode_rate = None
+        self.decode_stream = None
+        self.buffer = bytearray()
+        self.pending = deque()
+        self.texts = []
+        self.decode_seconds = 0.0
+        self.error = None
+        self.started = time.perf_counter()
+        self.wall_seconds = None
+        self._holds_slot = False
+        self._closed = False
+
+    async def _open(self):
+        if self.slots is not None:
+            await self.slots.acquire()
+            self._holds_slot = True
+        rate = self.parser.sample_rate
+        # Dosyalar gürültü bastırmadan geçirilir; yalnızca gerekirse yeniden örneklenir
+        self.front_end = create_front_end(rate, False)
+        self.decode_rate = self.front_end.out_rate if self.front_end is not None else rate
+        self.stt_service = await open_stt_service(self.decode_rate, self.grammar)
+        self.decode_stream = decode_pool.stream()
+        self.block_bytes = max(2, int(rate * TRANSCRIBE_SETTINGS.get("block_ms", 500) / 1000) * 2)
+
+    def _submit(self, pcm: bytes, final: bool = False):
+        self.pending.append(asyncio.ensure_future(
+            self.decode_stream.submit(decode_file_block, self.stt_service, self.front_end, pcm, final)
+        ))
+
+    async def _collect(self, keep: int):
+        # Bekleyen blok sayısı 'keep'e inene kadar en eski blokların sonucunu alır
+        while len(self.pending) > keep:
+            texts, elapsed = await self.pending.popleft()
+            self.texts.extend(texts)
+            self.decode_seconds += elapsed
+
+    def _fail(self, e: Exception):
+        if self.error is None:
+            self.error = str(e)
+            logger.warning(f"Dosya transkripsiyonu başarısız ({self.name}): {e}")
+
+    async def feed(self, data: bytes):
+        if self.error is not None or self._closed:
+            return
+        try:
+            pcm = self.parser.feed(data)
+            if self.stt_service is None and self.parser.ready:
+                await self._open()
+            if not pcm:
+                return
+            self.buffer.extend(pcm)
+            while len(self.buffer) >= self.block_bytes:
+                block = bytes(self.buffer[:self.block_bytes])
+                del self.buffer[:self.block_bytes]
+                self._submit(block)
+                await self._collect(self.max_in_flight)
+        except (WavFormatError, DecodeQueueFull, RecognizerPoolExhausted) as e:
+            self._fail(e)
+        except Exception as e:
+            logger.exception(f"Dosya çözümlenirken beklenmedik hata ({self.name})")
+            self._fail(e)
+
+    async def finish(self) -> dict:
+        """
+        Dosya bitti: kalan sesi ve nihai sonucu çözümler, tanıyıcıyı iade eder ve sonucu döndürür.
+        """
+        try:
+            if self.error is None:
+                self.parser.close()
+                self._submit(bytes(self.buffer), final=True)
+                self.buffer.clear()
+                await self._collect(0)
+        except asyncio.CancelledError:
+            self.abort()
+            raise
+        except Exception as e:
+            self._fail(e)
+        if self.pending:
+            # Hata sonrası kuyruğa girmiş bloklar bitmeden tanıyıcı iade edilmez
+            await asyncio.gather(*self.pending, return_exceptions=True)
+            self.pending.clear()
+        self._close(reuse=True)
+        return self.result()
+
+    def abort(self):
+        """
+        İstek iptal edildi: bekleyen blokları iptal eder, tanıyıcıyı havuza geri koymadan bırakır.
+        """
+        for task in self.pending:
+            task.cancel()
+        self.pending.clear()
+        self._close(reuse=False)
+
+    def _close(self, reuse: bool):
+        if self._closed:
+            return
+        self._closed = True
+        self.wall_seconds = time.perf_counter() - self.started
+        close_stt_service(self.stt_service, self.decode_rate, self.grammar, reuse=reuse)
+        if self._holds_slot:
+            self.slots.release()
+            self._holds_slot = False
+
+    def result(self) -> dict:
+        audio_seconds = self.parser.audio_seconds
+        return {
+            "file": self.name,
+            "text": " ".join(self.texts),
+            "sample_rate": self.parser.sample_rate,
+            "channels": self.parser.channels,
+            "audio_seconds": round(audio_seconds, 3),
+            "decode_seconds": round(self.decode_seconds, 4),
+            "wall_seconds": round(self.wall_seconds or 0.0, 4),
+            # Gerçek zaman oranı: çözümleme süresi / ses süresi (1'den küçük = gerçek zamandan hızlı)
+            "rtf": round(self.decode_seconds / audio_seconds, 4) if audio_seconds else None,
+            "error": self.error,
+        }
+
+
+def is_zip_upload(name: Optional[str], content_type: Optional[str]) -> bool:
+    if content_type and parse_header_params(content_type)[0] in ZIP_CONTENT_TYPES:
+        return True
+    return bool(name) and name.lower().endswith(".zip")
+
+
+async def transcribe_zip(data: bytes, grammar: Optional[str], slots: asyncio.Semaphore, counter: dict,
+                         transcriptions: list) -> list:
+    """
+    Bellekteki zip arşivindeki WAV dosyalarını (aynı anda en fazla 'slots' kadar) çözümler.
+    Zip'in içerik dizini dosyanın sonunda olduğundan arşiv bellekte toplanır; üyeler ise
+    açılırken parça parça okunur, tamamı ayrıca belleğe alınmaz.
+
+    'max_upload_mb' yalnızca sıkıştırılmış baytları sınırlar; açılmış boyut ('max_unzipped_mb',
+    üyelerin bildirdiği boyutların toplamı) ve zip içindeki toplam ses süresi
+    ('max_zip_audio_seconds') ayrıca sınırlanır. Bozuk, şifreli veya desteklenmeyen
+    sıkıştırmalı üye isteği düşürmez; o dosyanın sonucunda 'error' olarak raporlanır.
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile as e:
+        return [{"file": None, "error": f"Geçersiz zip arşivi: {e}"}]
+    members = [
+        member for member in archive.infolist()
+        if not member.is_dir() and member.filename.lower().endswith(".wav")
+    ]
+    counter["files"] += len(members)
+    if counter["files"] > TRANSCRIBE_SETTINGS.get("max_files", 100):
+        raise UploadTooLarge(f"En fazla {TRANSCRIBE_SETTINGS.get('max_files', 100)} dosya yüklenebilir.")
+    max_unzipped_mb = TRANSCRIBE_SETTINGS.get("max_unzipped_mb", 1024)
+    # 'zipfile' bir üyeden bildirilen 'file_size'dan fazlasını açmaz (fazlası CRC/boyut hatasıdır)
+    if sum(member.file_size for member in members) > max_unzipped_mb * 1024 * 1024:
+        raise UploadTooLarge(f"Zip içeriği açıldığında {max_unzipped_mb} MB sınırını aşıyor.")
+    max_audio_seconds = TRANSCRIBE_SETTINGS.get("max_zip_audio_seconds", 7200)
+    counter.setdefault("zip_audio_seconds", 0.0)
+
+    async def transcribe_member(member: zipfile.ZipInfo) -> dict:
+        transcription = FileTranscription(member.filename, grammar, slots)
+        transcriptions.append(transcription)
+        counted = 0.0
+        try:
+            with archive.open(member) as f:
+                while transcription.error is None:
+                    block = f.read(64 * 1024)
+                    if not block:
+                        break
+                    await transcription.feed(block)
+                    seconds = transcription.parser.audio_seconds
+                    counter["zip_audio_seconds"] += seconds - counted
+                    counted = seconds
+                    if counter["zip_audio_seconds"] > max_audio_seconds:
+                        raise UploadTooLarge(f"Zip içindeki ses toplamı {max_audio_seconds} saniye sınırını aşıyor.")
+        except (zipfile.BadZipFile, zlib.error, NotImplementedError, RuntimeError, EOFError) as e:
+            # Bozuk veri / CRC hatası, desteklenmeyen sıkıştırma yöntemi veya şifreli üye
+            transcription._fail(e)
+        return await transcription.finish()
+
+    return await asyncio.gather(*(transcribe_member(member) for member in members))
+
+
+@app.post("/api/transcribe")
+async def transcribe_files_endpoint(request: Request, filename: str = "upload.wav", grammar: Optional[str] = None):
+    """
+    Kaydedilmiş ses dosyalarını toplu olarak metne döker; yükleme diske yazılmaz.
+    Gövde türleri:
+    - audio/wav (veya application/octet-stream): tek WAV dosyası, 'filename' ile adlandırılır,
+    - multipart/form-data: bir veya daha fazla dosya bölümü (zip bölümü de olabilir),
+    - application/zip: içindeki *.wav dosyaları.
+    WAV başlığı akıştan okunur ve ses, geldikçe çözümleme havuzunda çözümlenir; dosyalar
+    eşzamanlı işlenir. Her dosya için metin ve gerçek zaman oranı (rtf) döndürülür.
+    """
+    with REQUEST_SECONDS.time(endpoint="transcribe"):
+        try:
+            grammar = resolve_grammar(grammar)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        content_type, params = parse_header_params(request.headers.get("content-type") or "application/octet-stream")
+        if content_type not in WAV_CONTENT_TYPES | ZIP_CONTENT_TYPES and content_type != "multipart/form-data":
+            raise HTTPException(status_code=415, detail=f"Desteklenmeyen içerik türü: {content_type}")
+
+        max_bytes = int(TRANSCRIBE_SETTINGS.get("max_upload_mb", 200) * 1024 * 1024)
+        max_files = TRANSCRIBE_SETTINGS.get("max_files", 100)
+        slots = asyncio.Semaphore(max(1, TRANSCRIBE_SETTINGS.get("max_concurrent_files", 4)))
+        counter = {"files": 0, "bytes": 0}
+        transcriptions = []  # iptalde tanıyıcıları bırakmak için açılan tüm dosyalar
+        jobs = []            # yükleme sırasıyla dosya (veya zip) sonuçlarını veren görevler
+        started = time.perf_counter()
+
+        async def body():
+            async for chunk in request.stream():
+                counter["bytes"] += len(chunk)
+                if counter["bytes"] > max_bytes:
+                    raise UploadTooLarge(f"Yükleme {TRANSCRIBE_SETTINGS.get('max_upload_mb', 200)} MB sınırını aşıyor.")
+                if chunk:
+                    yield chunk
+
+        def open_file(name: str) -> FileTranscription:
+            counter["files"] += 1
+            if counter["files"] > max_files:
+                raise UploadTooLarge(f"En fazla {max_files} dosya yüklenebilir.")
+            transcription = FileTranscription(name, grammar, slots)
+            transcriptions.append(transcription)
+            return transcription
+
+        async def zip_job(buffer: io.BytesIO) -> list:
+            return await transcribe_zip(buffer.getvalue(), grammar, slots, counter, transcriptions)
+
+        async def file_job(transcription: FileTranscription) -> list:
+            return [await transcription.finish()]
+
+        try:
+            if content_type == "multipart/form-data":
+                try:
+                    parser = MultipartStreamParser(params.get("boundary"))
+                except MultipartError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                current = None
+                async for chunk in body():
+                    try:
+                        events = parser.feed(chunk)
+                    except MultipartError as e:
+                        raise HTTPException(status_code=400, detail=str(e))
+                    for kind, value in events:
+                        if kind == "begin":
+                            name = part_filename(value)
+                            if name is None:
+                                current = None  # dosya olmayan form alanları yok sayılır
+                            elif is_zip_upload(name, value.get("content-type")):
+                                current = io.BytesIO()
+                            else:
+                                current = open_file(name)
+                        elif kind == "data" and current is not None:
+                            if isinstance(current, io.BytesIO):
+                                current.write(value)
+                            else:
+                                await current.feed(value)
+                        elif kind == "end" and current is not None:
+                            # Dosyanın kalan çözümlemesi sonraki bölümün alımıyla örtüşür
+                            if isinstance(current, io.BytesIO):
+                                jobs.append(asyncio.ensure_future(zip_job(current)))
+                            else:
+                                jobs.append(asyncio.ensure_future(file_job(current)))
+                            current = None
+                if not parser.done:
+                    raise HTTPException(status_code=400, detail="multipart gövdesi eksik (kapanış sınırı yok).")
+            elif content_type in ZIP_CONTENT_TYPES:
+                buffer = io.BytesIO()
+                async for chunk in body():
+                    buffer.write(chunk)
+                jobs.append(asyncio.ensure_future(zip_job(buffer)))
+            else:
+                transcription = open_file(filename)
+                async for chunk in body():
+                    await transcription.feed(chunk)
+                jobs.append(asyncio.ensure_future(file_job(transcription)))
+
+            files = [item for items in await asyncio.gather(*jobs) for item in items]
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        finally:
+            # Hata veya istemci kopması: bitmemiş dosyaların tanıyıcıları bırakılır
+            for job in jobs:
+                job.cancel()
+            for transcription in transcriptions:
+                transcription.abort()
+
+        audio_seconds = sum(item.get("audio_seconds") or 0.0 for item in files)
+        decode_seconds = sum(item.get("decode_seconds") or 0.0 for item in files)
+        wall_seconds = time.perf_counter() - started
+        logger.info(
+            f"Dosya transkripsiyonu: {len(files)} dosya, {audio_seconds:.1f}s ses, {wall_seconds:.2f}s sürdü."
+        )
+        return {
+            "files": files,
+            "count": len(files),
+            "errors": sum(1 for item in files if item.get("error")),
+            "audio_seconds": round(audio_seconds, 3),
+            "decode_seconds": round(decode_seconds, 4),
+            "wall_seconds": round(wall_seconds, 4),
+            "rtf": round(decode_seconds / audio_seconds, 4) if audio_seconds else None,
+            # Eşzamanlılık sayesinde duvar saati süresine göre hız
+            "throughput_x_realtime": round(audio_seconds / wall_seconds, 2) if wall_seconds else None,
+        }
+
+
+# --- İzleme Endpoint'leri (İstatistikler) ---
+
+@app.get("/api/stt/models")
+async def stt_model_stats_endpoint():
+    """
+    Paylaşılan Vosk modellerinin yükleme süresi, bellek artışı ve
+    kaç bağlantı tarafından yeniden kullanıldığı bilgisini döndürür.
+    """
+    return model_registry.stats()
+
+
+@app.get("/api/server/workers")
+async def server_workers_stats_endpoint():
+    """
+    İşçi başına açık/toplam WebSocket akışı sayısını döndürür. 'python -m src.server'
+    ile ön-çatallanmış çalışırken tüm işçiler, aksi halde yalnızca bu süreç raporlanır.
+    """
+    return workers_stats()
+
+
+@app.get("/api/stt/recognizer_pool")
+async def stt_recognizer_pool_stats_endpoint():
+    """
+    Tanıyıcı havuzunun doluluk oranı, yeniden kullanım sayısı ve tanıyıcı alma
+    (bekleme dahil) sürelerini döndürür.
+    """
+    return recognizer_pool.stats()
+
+
+@app.get("/api/stt/decode_pool")
+async def stt_decode_pool_stats_endpoint():
+    """
+    Çözümleme işçi havuzunun işçi sayısı, kuyruk derinliği ve tamamlanan/reddedilen iş sayılarını döndürür.
+    """
+    return decode_pool.stats()
+
+
+@app.get("/api/upstream/stats")
+async def upstream_stats_endpoint():
+    """
+    Gemini çağrılarının uç nokta bazında istek sayısı, bağlantı yeniden kullanımı ve toplam süresini döndürür.
+    """
+    return gemini_client.stats()
+
+
+@app.get("/api/server/logging")
+async def logging_stats_endpoint():
+    """
+    Log kuyruğunun doluluğunu, dolu kuyruk yüzünden düşürülen ve örneklemeyle elenen kayıt sayılarını döndürür.
+    """
+    return logging_stats()
+
+
+@app.get("/api/intent/cache")
+async def intent_cache_stats_endpoint():
+    """
+    Intent önbelleğinin boyutu, isabet/ıskalama sayıları ve isabet oranını döndürür.
+    """
+    if intent_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **intent_cache.stats()}
+
+
+@app.get("/api/intent/router")
+async def intent_router_stats_endpoint():
+    """
+    Yerel hızlı yönlendiricinin LLM'siz cevap oranını ve LLM'e düşme sebeplerini döndürür.
+    """
+    if intent_router is None:
+        return {"enabled": False}
+    return {"enabled": True, **intent_router.stats()}
+
+
+@app.get("/api/intent/batcher")
+async def intent_batcher_stats_endpoint():
+    """
+    Intent mikro-toplayıcısının parti sayısı ve parti boyutu dağılımını döndürür.
+    """
+    if intent_batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **intent_batcher.stats()}
+
+
+@app.get("/api/tts/cache")
+async def tts_cache_stats_endpoint():
+    """
+    TTS önbelleğinin bellek/disk katmanı doluluğunu ve isabet sayılarını döndürür.
+    """
+    if tts_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **tts_cache.stats()}
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """
+    Tüm aşama süreleri, sayaçlar ve anlık değerler (aktif akışlar, çözümleme kuyruğu)
+    Prometheus metin biçiminde.
+    """
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# --- API Endpoint 5: Uçtan Uca Pipeline (STT -> Intent -> TTS, tek WebSocket) ---
+
+async def get_reply_audio(text: str, voice: str) -> bytes:
+    """
+    Cevap cümlesinin WAV baytlarını döndürür; önce TTS önbelleğine bakar.
+    """
+    if tts_cache is not None:
+        source, cached = tts_cache.lookup(tts_cache_key(text, voice, TTS_SAMPLE_RATE))
+        if source == "memory":
+            return cached
+        if source == "disk":
+            def read_file(path):
+                with open(path, "rb") as f:
+                    return f.read()
+            return await asyncio.to_thread(read_file, cached)
+    return await synthesize_cached(text, voice)
+
+
+def parse_control_message(text: str) -> Optional[dict]:
+    """
+    İstemcinin metin (kontrol) mesajını çözer; geçerli bir JSON nesnesi değilse None döner.
+    """
+    try:
+        control = json.loads(text)
+    except ValueError:
+        return None
+    return control if isinstance(control, dict) else None
+
+
+@app.websocket("/ws/pipeline")
+async def websocket_pipeline_endpoint(websocket: WebSocket, sample_rate: int = 16000, voice: str = "Kore",
+                                      vad: Optional[bool] = None, denoise: Optional[bool] = None,
+                                      grammar: Optional[str] = None, encoding: Optional[str] = None):
+    """
+    Tek soket üzerinden uçtan uca akış: istemci ham PCM gönderir, sunucu
+    kısmi/nihai transkriptleri, intent sonucunu ve seslendirilmiş cevabı aynı
+    bağlantıdan geri yollar. Üç ayrı istek (WebSocket + 2x HTTP) yerine tek tur yeterlidir.
+
+    Kararlı görünen kısmi transkriptler için intent analizi spekülatif olarak başlatılır;
+    nihai metin farklı çıkarsa iptal edilir.
+
+    Sunucu mesajları (hepsinde oturum başından itibaren 't_ms' bulunur):
+    - {"type": "partial", "text": ...}
+    - {"type": "final", "text": ...}
+    - {"type": "intent", "poliklinik": ..., "aciliyet": ..., "sebep_ozeti": ..., "speculative": bool}
+    - {"type": "audio", "text": ..., "bytes": N, "stages": {...}} ve ardından N byte'lık WAV (binary)
+    - {"type": "grammar", "name": ...}
+    - {"type": "encoding", "name": ...}
+    - {"type": "error", "stage": ..., "detail": ...}
+
+    İstemci konuşmayı bitirdiğini '{"eof": 1}' metin mesajıyla bildirebilir. '{"grammar": "yes_no"}'
+    sonraki konuşmanın dilbilgisini değiştirir (örn. onay adımı); aynı mesajda 'eof' varsa önce mevcut
+    konuşma bitirilir, yoksa henüz nihai sonuca dönüşmemiş ses atılır.
+    Ses kodlaması '?encoding=' veya '{"encoding": "mulaw"}' kontrol mesajıyla seçilir ('/ws/stream_stt'
+    ile aynı: pcm16, float32, mulaw); kontrol mesajı sonraki parçalardan itibaren geçerlidir.
+    JSON nesnesi olmayan metin mesajları, tanımsız dilbilgileri ve kodlamalar {"type": "error", "stage": "control"}
+    ile yanıtlanır, bağlantı açık kalır.
+
+    Intent/TTS aşaması ayrı bir görevde çalışır; bu sırada ses almaya ve çözümlemeye devam
+    edilir. Aynı oturumdaki cevaplar bir kilitle sıraya konur, bağlantı kapanınca iptal edilir.
+    """
+    await websocket.accept()
+    logger.info(
+        f"Pipeline bağlantısı kabul edildi (Rate: {sample_rate}, Ses: {voice}, Dilbilgisi: {grammar}, Kodlama: {encoding})."
+    )
+    try:
+        grammar = resolve_grammar(grammar)
+        decoder = WireDecoder(encoding)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    front_end = create_front_end(sample_rate, denoise)
+    decode_rate = front_end.out_rate if front_end is not None else sample_rate
+    vad_endpointer = create_vad(vad, decode_rate)
+    clock = StageClock()
+    speculation = SpeculativeIntent(
+        get_intent,
+        stable_chunks=PIPELINE_SETTINGS.get("speculative_stable_chunks", 3),
+        min_words=PIPELINE_SETTINGS.get("speculative_min_words", 2)
+    )
+    throttle = PartialThrottle.from_settings(STT_SETTINGS)
+    ACTIVE_STREAMS.inc(endpoint="pipeline")
+    stream_opened()
+
+    # Cevaplar sırayla üretilir; 'audio' başlığı ile WAV baytları arasına başka mesaj girmez
+    reply_lock = asyncio.Lock()
+    send_lock = asyncio.Lock()
+    reply_tasks = set()
+
+    async def send_json(data: dict):
+        async with send_lock:
+            await websocket.send_json(data)
+
+    async def respond(final_text: str):
+        async with reply_lock:
+            await produce_reply(final_text)
+
+    def reply_done(task: asyncio.Task):
+        reply_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Pipeline cevap hatası: {task.exception()}")
+
+    async def produce_reply(final_text: str):
+        clock.mark("stt_final")
+        await send_json({"type": "final", "text": final_text, "t_ms": clock.now_ms()})
+        try:
+            intent_data, speculative = await speculation.resolve(final_text)
+        except HTTPException as e:
+            await send_json({"type": "error", "stage": "intent", "detail": e.detail, "t_ms": clock.now_ms()})
+            return
+        clock.mark("intent")
+        await send_json({
+            "type": "intent", **intent_data.model_dump(), "speculative": speculative, "t_ms": clock.now_ms()
+        })
+
+        reply_text = build_reply_text(intent_data.poliklinik)
+        try:
+            wav_bytes = await get_reply_audio(reply_text, voice)
+        except HTTPException as e:
+            await send_json({"type": "error", "stage": "tts", "detail": e.detail, "t_ms": clock.now_ms()})
+            return
+        clock.mark("tts")
+        async with send_lock:
+            await websocket.send_json({
+                "type": "audio", "text": reply_text, "bytes": len(wav_bytes),
+                "stages": dict(clock.marks), "t_ms": clock.now_ms()
+            })
+            await websocket.send_bytes(wav_bytes)
+        clock.reset()
+
+    stt_service = None
+    reusable = True
+    try:
+        stt_service = await open_stt_service(decode_rate, grammar)
+        decode_stream = decode_pool.stream()
+
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            if message.get("bytes") is not None:
+                STT_AUDIO_BYTES.inc(len(message["bytes"]), endpoint="pipeline")
+                results = await decode_stream.submit(
+                    transcribe_with_vad, stt_service, vad_endpointer, message["bytes"], front_end, None, decoder
+                )
+            elif message.get("text"):
+                control = parse_control_message(message["text"])
+                if control is None:
+                    await send_json({
+                        "type": "error", "stage": "control",
+                        "detail": "Kontrol mesajı bir JSON nesnesi olmalı.", "t_ms": clock.now_ms()
+                    })
+                    continue
+                results = []
+                if control.get("eof"):
+                    # Konuşma bitti: elde kalan sesi nihai sonuca zorla
+                    results.append(await decode_stream.submit(finish_utterance, stt_service, front_end))
+                if "grammar" in control:
+                    try:
+                        new_grammar = resolve_grammar(control["grammar"])
+                    except ValueError as e:
+                        await send_json({"type": "error", "stage": "control", "detail": str(e), "t_ms": clock.now_ms()})
+                    else:
+                        if new_grammar != grammar:
+                            # Önceki parçalar çözümlendi (submit beklendi); tanıyıcı güvenle değiştirilebilir
+                            previous_service, previous_grammar = stt_service, grammar
+                            stt_service = await open_stt_service(decode_rate, new_grammar)
+                            grammar = new_grammar
+                            close_stt_service(previous_service, decode_rate, previous_grammar)
+                            throttle.reset()
+                        await send_json({"type": "grammar", "name": grammar or FULL_GRAMMAR, "t_ms": clock.now_ms()})
+                if "encoding" in control:
+                    try:
+                        # Parçalar sırayla beklenerek çözümlendiği için yeni kodlama bir sonraki parçadan geçerlidir
+                        decoder.set_encoding(control["encoding"])
+                    except WireEncodingError as e:
+                        await send_json({"type": "error", "stage": "control", "detail": str(e), "t_ms": clock.now_ms()})
+                    else:
+                        await send_json({"type": "encoding", "name": decoder.encoding, "t_ms": clock.now_ms()})
+            else:
+                continue
+
+            for result in results:
+                if not result or not result.get("text"):
+                    continue
+                if result["type"] == "partial":
+                    # Spekülasyon her kısmi sonucu görür; istemciye yalnızca değişenler, seyreltilerek gider
+                    if speculation.observe_partial(result["text"]):
+                        clock.mark("intent_speculative_start")
+                    if throttle.should_send(result):
+                        STT_RESULTS.inc(endpoint="pipeline", type="partial")
+                        await send_json({**result, "t_ms": clock.now_ms()})
+                        logger.info("Pipeline Kısmi Transkript: '%s'", result["text"], extra={"sample": "partial"})
+                else:
+                    throttle.should_send(result)
+                    STT_RESULTS.inc(endpoint="pipeline", type="final")
+                    logger.info(f"Pipeline Nihai Transkript: '{result['text']}'")
+                    task = asyncio.create_task(respond(result["text"]))
+                    reply_tasks.add(task)
+                    task.add_done_callback(reply_done)
+
+    except WebSocketDisconnect:
+        logger.warning(
+            f"Pipeline bağlantısı kapandı (Spekülasyon: {speculation.stats()}, Kısmi sonuçlar: {throttle.stats()})."
+        )
+
+    except (DecodeQueueFull, RecognizerPoolExhausted) as e:
+        logger.error(f"Pipeline Hatası (kapasite dolu): {e}")
+        try:
+            await websocket.close(code=1013, reason="Sunucu meşgul, lütfen tekrar deneyin.")
+        except:
+            pass
+
+    except asyncio.CancelledError:
+        reusable = False
+        raise
+
+    except Exception as e:
+        logger.error(f"Pipeline Hatası: {e}")
+        try:
+            await websocket.close(code=1011, reason=f"Sunucu hatası: {e}")
+        except:
+            pass
+
+    finally:
+        for task in list(reply_tasks):
+            task.cancel()
+        speculation.cancel()
+        for reason, count in throttle.suppressed.items():
+            if count:
+                STT_PARTIALS_SUPPRESSED.inc(count, endpoint="pipeline", reason=reason)
+        close_stt_service(stt_service, decode_rate, grammar, reuse=reusable)
+        ACTIVE_STREAMS.dec(endpoint="pipeline")
+        stream_closed()
+
 
 # Basit kök (root) endpoint — 404'leri önlemek için
 @app.get("/")
 async def root():
     """
     Kök (root) endpoint. Uygulamanın çalıştığını ve Swagger UI adresini gösterir.
+    Süreç ayakta olduğu sürece 200 döner (canlılık); trafik yönlendirmek için '/ready' kullanın.
     """
     return {"message": "Holographic AI Assistant API çalışıyor.", "docs": "/docs"}
 
 
+@app.get("/ready")
+async def ready():
+    """
+    Hazır olma (readiness) kontrolü: model yüklenip tanıyıcılar ısıtılana ve HTTP istemcisi ile
+    önbellekler kurulana kadar (veya kritik bir açılış adımı başarısızsa) 503 döner. Cevap açılış
+    adımlarının sürelerini ve süreç başlangıcından hazır olmaya geçen süreyi ('cold_start_s') içerir.
+    """
+    return JSONResponse(startup.stats(), status_code=200 if startup.ready else 503)
+
+
 # Basit favicon yanıtı (tarayıcıların favicon isteği 404 döndürmesin diye)
 @app.get("/favicon.ico")
 async def favicon():
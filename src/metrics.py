@@ -0,0 +1,306 @@
+import time
+import bisect
+import threading
+
+# Gecikme histogramları için varsayılan kova sınırları (saniye)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Etiketli (label) ölçümlerin ortak tabanı. Etiket değerleri, tanımdaki 'labelnames'
+    sırasıyla anahtar (tuple) olarak tutulur; güncellemeler kısa bir kilit altında yapılır
+    (çözümleme işçi thread'leri ile olay döngüsü aynı ölçümü güncelleyebilir).
+    """
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: beklenen etiketler {self.labelnames}, gelen {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def render(self) -> list:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Yalnızca artan sayaç.
+    """
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Artıp azalabilen anlık değer. 'callback' verilirse değer her okumada ondan alınır
+    (örn. kuyruk derinliği); bu durumda etiket kullanılmaz.
+    """
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        if self.callback is not None:
+            return self.callback()
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list:
+        lines = self._header()
+        if self.callback is not None:
+            try:
+                lines.append(f"{self.name} {_format_value(self.callback())}")
+            except Exception:
+                # Okunamayan değer atlanır; diğer ölçümler yine de sunulur
+                pass
+            return lines
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class _Timer:
+    """
+    'with histogram.time(...)' için hafif bağlam yöneticisi.
+    """
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Histogram(_Metric):
+    """
+    Sabit kovalı histogram. Gözlem başına yalnızca bir ikili arama ve üç toplama yapılır;
+    kümülatif kova sayıları okuma (render) sırasında hesaplanır.
+    """
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [kova sayıları (+Inf dahil), toplam, adet]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels) -> _Timer:
+        return _Timer(self, labels)
+
+    def snapshot(self, **labels) -> dict:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            if state is None:
+                return {"count": 0, "sum": 0.0}
+            return {"count": state[2], "sum": state[1]}
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        lines = self._header()
+        bounds = self.buckets + (float("inf"),)
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Süreç genelindeki ölçümlerin kaydı; Prometheus metin biçiminde (0.0.4) çıktı üretir.
+    Aynı adla ikinci kez kayıt, mevcut ölçümü döndürür (modüller yeniden yüklense de tek kopya).
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"'{name}' zaten farklı türde kayıtlı.")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames=(), callback=None) -> Gauge:
+        gauge = self._register(Gauge, name, documentation, labelnames)
+        if callback is not None:
+            gauge.callback = callback
+        return gauge
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Süreç genelinde tek kayıt
+metrics = MetricsRegistry()
+
+# --- Uygulama ölçümleri ---
+# STT: model yükleme, AcceptWaveform, sonuç okuma, ön işleme ve VAD süreleri
+STT_MODEL_LOAD_SECONDS = metrics.gauge(
+    "stt_model_load_seconds", "Vosk modelinin diskten yüklenme süresi.", ("model",)
+)
+STARTUP_SECONDS = metrics.gauge(
+    "startup_seconds", "Açılış adımlarının süresi (step=cold_start_to_ready: süreç başlangıcından hazır olmaya).",
+    ("step",)
+)
+STT_STAGE_SECONDS = metrics.histogram(
+    "stt_stage_seconds", "STT aşama süreleri (accept_waveform, result, front_end, vad, wire_decode).", ("stage",)
+)
+STT_RECOGNIZER_ACQUIRE_SECONDS = metrics.histogram(
+    "stt_recognizer_acquire_seconds", "Tanıyıcı havuzundan tanıyıcı alma süresi (bekleme dahil)."
+)
+STT_AUDIO_BYTES = metrics.counter(
+    "stt_audio_bytes_total", "WebSocket üzerinden alınan ham ses baytları.", ("endpoint",)
+)
+STT_RESULTS = metrics.counter(
+    "stt_results_total", "İstemciye gönderilen STT sonuçları.", ("endpoint", "type")
+)
+STT_PARTIALS_SUPPRESSED = metrics.counter(
+    "stt_partials_suppressed_total", "Gönderilmeyen kısmi sonuçlar (unchanged: metin aynı, rate: aralık dolmadı).",
+    ("endpoint", "reason")
+)
+STT_COALESCED_CHUNKS = metrics.histogram(
+    "stt_coalesced_chunks", "Tek çözümleme işinde birleştirilen WebSocket ses parçası sayısı.",
+    buckets=(1, 2, 4, 8, 16, 32)
+)
+ACTIVE_STREAMS = metrics.gauge(
+    "active_streams", "Açık WebSocket akışları.", ("endpoint",)
+)
+# Gemini çağrıları ve TTS paketleme
+UPSTREAM_REQUEST_SECONDS = metrics.histogram(
+    "upstream_request_seconds", "Gemini çağrılarının gidiş-dönüş süresi.", ("endpoint", "outcome")
+)
+TTS_STAGE_SECONDS = metrics.histogram(
+    "tts_stage_seconds", "TTS aşama süreleri (base64_decode, wav_package).", ("stage",)
+)
+UPSTREAM_EVENTS = metrics.counter(
+    "upstream_events_total",
+    "Gemini çağrı politikası olayları (retry, hedge, hedge_won, circuit_rejected, limiter_timeout, deadline_exhausted).",
+    ("endpoint", "event")
+)
+INTENT_RESULTS = metrics.counter(
+    "intent_results_total", "Intent sonuçlarının kaynağı (cache, fast_path, llm, fallback).", ("source",)
+)
+INTENT_BATCH_SIZE = metrics.histogram(
+    "intent_batch_size", "Tek LLM çağrısında analiz edilen metin sayısı (micro: mikro-toplayıcı, api: toplu uç nokta).",
+    ("path",), buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+REQUEST_SECONDS = metrics.histogram(
+    "request_seconds", "HTTP uç noktalarının toplam işlem süresi.", ("endpoint",)
+)
+
+
+def observe_upstream_request(request_stats: dict):
+    """
+    UpstreamHTTPClient 'stats_hooks' kancası: her Gemini çağrısının süresini kaydeder.
+    """
+    if request_stats["error"] is not None:
+        outcome = request_stats["error"]
+    else:
+        outcome = str(request_stats["status_code"])
+    UPSTREAM_REQUEST_SECONDS.observe(request_stats["elapsed_s"], endpoint=request_stats["endpoint"], outcome=outcome)
+
+
+def observe_upstream_event(endpoint: str, event: str):
+    """
+    UpstreamPolicy 'event_hooks' kancası: yeniden deneme, hedge ve devre kesici olaylarını sayar.
+    """
+    UPSTREAM_EVENTS.inc(endpoint=endpoint, event=event)
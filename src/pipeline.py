@@ -0,0 +1,97 @@
+import time
+import asyncio
+from .intent_cache import normalize_transcript
+
+
+class StageClock:
+    """
+    Bir pipeline oturumundaki aşama zamanlarını, oturum başlangıcından itibaren
+    milisaniye cinsinden tutar.
+    """
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.marks = {}
+
+    def now_ms(self) -> float:
+        return round((time.perf_counter() - self._started) * 1000, 1)
+
+    def mark(self, stage: str) -> float:
+        self.marks[stage] = self.now_ms()
+        return self.marks[stage]
+
+    def reset(self):
+        self.marks = {}
+
+
+class SpeculativeIntent:
+    """
+    Kısmi (partial) transkript kararlı görünüyorsa intent analizini nihai sonucu
+    beklemeden başlatır.
+
+    - Aynı kısmi metin 'stable_chunks' ardışık parça boyunca değişmezse ve en az
+      'min_words' kelime içeriyorsa spekülatif analiz başlar.
+    - Nihai metin (normalize edilmiş haliyle) spekülatif metinle aynıysa hazır sonuç
+      kullanılır; farklıysa spekülatif analiz iptal edilir ve nihai metin analiz edilir.
+    """
+    def __init__(self, analyze, stable_chunks=3, min_words=2):
+        self.analyze = analyze
+        self.stable_chunks = stable_chunks
+        self.min_words = min_words
+        self._last_partial = ""
+        self._repeats = 0
+        self._task = None
+        self._task_key = None
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+
+    def observe_partial(self, text: str) -> bool:
+        """
+        Yeni bir kısmi sonucu kaydeder. Spekülatif analiz bu çağrıda başladıysa True döner.
+        """
+        key = normalize_transcript(text)
+        if key != self._last_partial:
+            self._last_partial = key
+            self._repeats = 1
+            return False
+
+        self._repeats += 1
+        if (
+            self._repeats >= self.stable_chunks
+            and len(key.split()) >= self.min_words
+            and key != self._task_key
+        ):
+            self.cancel()
+            self._task_key = key
+            self._task = asyncio.create_task(self.analyze(text))
+            # İptal edilen/atılan görevlerin hataları "never retrieved" uyarısı üretmesin
+            self._task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self.started += 1
+            return True
+        return False
+
+    async def resolve(self, final_text: str):
+        """
+        Nihai metnin intent sonucunu döndürür: (sonuç, spekülasyon_isabeti).
+        """
+        key = normalize_transcript(final_text)
+        task, task_key = self._task, self._task_key
+        self._task, self._task_key = None, None
+        self._last_partial, self._repeats = "", 0
+
+        if task is not None and task_key == key:
+            self.hits += 1
+            return await task, True
+
+        if task is not None:
+            task.cancel()
+            self.misses += 1
+        return await self.analyze(final_text), False
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task, self._task_key = None, None
+
+    def stats(self) -> dict:
+        return {"started": self.started, "hits": self.hits, "misses": self.misses}
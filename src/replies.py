@@ -0,0 +1,34 @@
+# Hologramın seslendirdiği sabit cevap cümleleri.
+# Bu cümleler TTS önbelleğinde açılışta önceden seslendirilir; metinleri değiştirmek
+# önbellek anahtarlarını da değiştirir.
+
+FALLBACK_REPLY = "Üzgünüm, şikayetinizi tam olarak anlayamadım. Lütfen daha detaylı anlatır mısınız?"
+CLINIC_REPLY_TEMPLATE = "Anladım. Sizi {poliklinik} polikliniğine yönlendiriyorum."
+# Şikayet özeti ayrı ve önbelleksiz bir cümle olarak sabit cümleden sonra seslendirilir
+REASON_REPLY_TEMPLATE = "Şikayetinizi '{sebep}' olarak not aldım."
+
+
+def build_reply_text(poliklinik) -> str:
+    """
+    Intent sonucundaki polikliniğe göre seslendirilecek cevap cümlesini kurar.
+    """
+    if not poliklinik or poliklinik.lower() == "belirsiz":
+        return FALLBACK_REPLY
+    return CLINIC_REPLY_TEMPLATE.format(poliklinik=poliklinik)
+
+
+def build_reason_text(poliklinik, sebep_ozeti):
+    """
+    Sabit yönlendirme cümlesinin ardından seslendirilen, şikayet özetini içeren ikinci cümle.
+    Hastaya özgü olduğu için önbelleğe alınmaz; poliklinik belirsizse veya özet boşsa None.
+    """
+    if not poliklinik or poliklinik.lower() == "belirsiz" or not (sebep_ozeti or "").strip():
+        return None
+    return REASON_REPLY_TEMPLATE.format(sebep=sebep_ozeti.strip().rstrip("."))
+
+
+def fixed_reply_phrases(clinics) -> list:
+    """
+    Önceden seslendirilecek tüm sabit cümleler: geri dönüş cümlesi ve her poliklinik için yönlendirme.
+    """
+    return [FALLBACK_REPLY] + [build_reply_text(clinic) for clinic in clinics]
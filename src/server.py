@@ -0,0 +1,262 @@
+"""
+Ön-çatallanmış (pre-fork) çok işçili sunucu başlatıcısı.
+
+'uvicorn --workers N' her işçide Vosk modelini yeniden yükler (N kopya). Bu başlatıcı
+modeli ana süreçte bir kez yükler, sonra işçileri 'os.fork()' ile oluşturur; model
+sayfaları işçiler arasında yazınca-kopyala (copy-on-write) ile paylaşılır. Çözümleme
+modeli yalnızca okuduğu için sayfalar kopyalanmaz; çekirdek başına bir işçi, tek model
+kopyasıyla çalışır.
+
+- Bağlantı dağıtımı: Linux'ta her işçiye aynı porta SO_REUSEPORT ile bağlı ayrı bir soket
+  verilir; çekirdek yeni bağlantıları işçiler arasında dengeler. SO_REUSEPORT yoksa tüm
+  işçiler tek dinleme soketini paylaşır.
+- İşçi başına açık/toplam akış sayısı paylaşılan bellekte tutulur; herhangi bir işçideki
+  'GET /api/server/workers' tüm işçileri raporlar.
+- Beklenmedik şekilde kapanan işçi (aynı soketle) yeniden başlatılır; SIGTERM/SIGINT
+  işçilere iletilir.
+
+Kullanım (proje kökünden):
+    python -m src.server --host 0.0.0.0 --port 8000 --workers 4
+"""
+import os
+import gc
+import sys
+import time
+import signal
+import socket
+import logging
+import argparse
+from multiprocessing.sharedctypes import RawArray
+
+from .settings import get_section
+
+logger = logging.getLogger(__name__)
+
+SERVER_SETTINGS = get_section("server")
+
+# İşçi başına paylaşılan alanlar: pid, açık akış, toplam akış, yeniden başlatma sayısı
+_FIELDS = 4
+_PID, _ACTIVE, _TOTAL, _RESTARTS = range(_FIELDS)
+
+# Tek süreçli çalışmada (uvicorn src.main:app) sayaçlar süreç içi bir listede tutulur
+_slots = [0] * _FIELDS
+_worker_index = 0
+_prefork = False
+
+
+def is_primary_worker() -> bool:
+    """
+    Paylaşılan dosyalara yazan tekil işleri (intent anlık görüntüsü, TTS ön-seslendirmesi)
+    yalnızca bir işçi yapar: tek süreçli çalışmada süreç kendisi, ön-çatallanmış sunucuda 0. işçi.
+    """
+    return not _prefork or _worker_index == 0
+
+
+def stream_opened():
+    """
+    Bu işçide yeni bir WebSocket akışı açıldı.
+    """
+    base = _worker_index * _FIELDS
+    _slots[base + _ACTIVE] += 1
+    _slots[base + _TOTAL] += 1
+
+
+def stream_closed():
+    _slots[_worker_index * _FIELDS + _ACTIVE] -= 1
+
+
+def _proportional_set_size(pid: int):
+    # PSS: paylaşılan sayfalar paylaşan süreç sayısına bölünür (yalnızca Linux)
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def workers_stats() -> dict:
+    """
+    Tüm işçilerin açık/toplam akış sayılarını ve (Linux'ta) PSS bellek kullanımını döndürür.
+    """
+    workers = []
+    for index in range(len(_slots) // _FIELDS):
+        base = index * _FIELDS
+        pid = _slots[base + _PID] or (os.getpid() if not _prefork else 0)
+        workers.append({
+            "index": index,
+            "pid": pid or None,
+            "alive": bool(pid),
+            "active_streams": _slots[base + _ACTIVE],
+            "total_streams": _slots[base + _TOTAL],
+            "restarts": _slots[base + _RESTARTS],
+            "pss_bytes": _proportional_set_size(pid) if pid else None,
+        })
+    return {
+        "prefork": _prefork,
+        "current_worker": _worker_index,
+        "active_streams": sum(w["active_streams"] for w in workers),
+        "workers": workers,
+    }
+
+
+def _listen_sockets(host: str, port: int, count: int, reuse_port: bool) -> list:
+    """
+    SO_REUSEPORT destekleniyorsa işçi başına bir soket, yoksa tek bir paylaşılan soket açar.
+    """
+    reuse_port = reuse_port and hasattr(socket, "SO_REUSEPORT")
+    sockets = []
+    for _ in range(count if reuse_port else 1):
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((host, port))
+        # Port 0 verildiyse sonraki soketler ilk soketin aldığı porta bağlanır
+        port = sock.getsockname()[1]
+        sock.listen(SERVER_SETTINGS.get("backlog", 2048))
+        sock.set_inheritable(True)
+        sockets.append(sock)
+    return sockets
+
+
+def _run_worker(index: int, sock: socket.socket, app, log_level: str):
+    """
+    Çatallanmış süreçte çalışır; uvicorn'u ana süreçten devralınan soketle başlatır.
+    """
+    global _worker_index
+    import uvicorn
+
+    _worker_index = index
+    _slots[index * _FIELDS + _PID] = os.getpid()
+    _slots[index * _FIELDS + _ACTIVE] = 0
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers=None, reuse_port: bool = True, log_level: str = "info",
+          respawn: bool = True):
+    """
+    Modeli yükler, işçileri çatallar ve kapanana kadar onları denetler.
+    """
+    global _slots, _prefork
+    workers = workers or os.cpu_count() or 1
+
+    # Uygulama (ve ayarlar, önbellekler, istemciler) ana süreçte içe aktarılır; thread'ler
+    # ve olay döngüleri yalnızca işçilerde, 'lifespan' sırasında başlatılır
+    from .main import app, model_registry, STT_MODEL_PATH
+    if not hasattr(os, "fork"):
+        logger.warning("os.fork() yok; tek süreçli uvicorn ile devam ediliyor.")
+        import uvicorn
+        uvicorn.run(app, host=host, port=port, log_level=log_level)
+        return
+
+    try:
+        model_registry.get(STT_MODEL_PATH)
+        logger.info(f"Vosk modeli ana süreçte yüklendi; {workers} işçi tarafından paylaşılacak.")
+    except Exception as e:
+        # İşçiler yine açılır; model her işçide ilk bağlantıda yeniden denenir
+        logger.error(f"Vosk modeli ana süreçte yüklenemedi: {e}")
+
+    sockets = _listen_sockets(host, port, workers, reuse_port)
+    _slots = RawArray("q", workers * _FIELDS)
+    _prefork = True
+    logger.info(
+        f"Ön-çatallanmış sunucu {host}:{sockets[0].getsockname()[1]} üzerinde "
+        f"({workers} işçi, {'SO_REUSEPORT' if len(sockets) > 1 else 'paylaşılan soket'})."
+    )
+
+    # Çöp toplayıcı mevcut nesneleri işçilerde dolaşıp sayfalarına yazmasın (gereksiz kopyalama olmaz)
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+
+    children = {}  # pid -> işçi no
+    started_at = {}
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(index, sockets[index % len(sockets)], app, log_level)
+            except BaseException:
+                logger.exception(f"İşçi {index} hata ile kapandı.")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = index
+        started_at[index] = time.monotonic()
+        _slots[index * _FIELDS + _PID] = pid
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(workers):
+        spawn(index)
+
+    while children:
+        try:
+            pid, status = os.waitpid(-1, 0)
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None:
+            continue
+        base = index * _FIELDS
+        _slots[base + _PID] = 0
+        _slots[base + _ACTIVE] = 0
+        if stopping or not respawn:
+            continue
+        logger.error(f"İşçi {index} (pid {pid}) beklenmedik şekilde kapandı (durum {status}); yeniden başlatılıyor.")
+        # Açılışta sürekli çöken işçi döngüye girmesin
+        if time.monotonic() - started_at[index] < 1.0:
+            time.sleep(1.0)
+        _slots[base + _RESTARTS] += 1
+        spawn(index)
+
+    for sock in sockets:
+        sock.close()
+    logger.info("Ön-çatallanmış sunucu kapandı.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=SERVER_SETTINGS.get("host", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=SERVER_SETTINGS.get("port", 8000))
+    parser.add_argument("--workers", type=int, default=SERVER_SETTINGS.get("workers"),
+                        help="İşçi sayısı (varsayılan: CPU çekirdek sayısı)")
+    parser.add_argument("--no-reuse-port", action="store_true", help="Tek paylaşılan dinleme soketi kullan")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    serve(
+        args.host, args.port, args.workers,
+        reuse_port=SERVER_SETTINGS.get("reuse_port", True) and not args.no_reuse_port,
+        log_level=args.log_level,
+        respawn=SERVER_SETTINGS.get("respawn", True),
+    )
+
+
+if __name__ == "__main__":
+    # 'python -m src.server' bu dosyayı '__main__' olarak çalıştırır; sayaçların uygulamanın
+    # kullandığı modül kopyasında tutulması için 'src.server' üzerinden başlatılır
+    from src import server
+    sys.exit(server.main())
@@ -0,0 +1,68 @@
+import os
+import copy
+import yaml
+
+# Ayar dosyası proje kökündeki config/ dizininde tutulur.
+# İstenirse APP_SETTINGS_PATH ortam değişkeni ile farklı bir dosya gösterilebilir.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SETTINGS_PATH = os.path.join(PROJECT_ROOT, "config", "settings.yaml")
+
+# libyaml varsa C ayrıştırıcı kullanılır; saf Python ayrıştırıcı bu dosyayı ~10 kat yavaş
+# okur ve ayarlar her süreç açılışında (ve her içe aktarmada) okunur
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def load_settings(path=None) -> dict:
+    """
+    YAML ayar dosyasını okur ve sözlük olarak döndürür.
+    Dosya yoksa veya boşsa boş sözlük döner (tüm ayarların varsayılanı vardır).
+    """
+    path = path or os.environ.get("APP_SETTINGS_PATH", DEFAULT_SETTINGS_PATH)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_SafeLoader)
+    return data or {}
+
+
+def resolve_path(path: str) -> str:
+    """
+    Ayar dosyasındaki göreli yolları proje köküne göre mutlak yola çevirir.
+    """
+    if os.path.isabs(path):
+        return path
+    return os.path.join(PROJECT_ROOT, path)
+
+
+settings = load_settings()
+
+
+def get_section(name: str) -> dict:
+    """
+    Ayarların bir bölümünü (örn. 'stt') döndürür. Bölüm yoksa boş sözlük döner.
+    """
+    return settings.get(name) or {}
+
+
+def write_isolated_settings(directory: str, overrides: dict = None) -> str:
+    """
+    Geçerli ayarların, diske yazan önbellekleri 'directory' altına yönlendirilmiş bir kopyasını
+    YAML olarak yazar ve dosya yolunu döndürür: intent anlık görüntüsü kapalı, TTS disk katmanı
+    geçici dizinde, açılışta ön-seslendirme kapalı. Yük testi ve alt süreçte sunucu açan testler
+    bu yolu APP_SETTINGS_PATH ile verir; böylece gerçek önbellekler sahte cevaplarla kirlenmez.
+    'overrides' {bölüm: {anahtar: değer}} biçimindedir ve bölüm içinde birleştirilir.
+    """
+    data = copy.deepcopy(settings)
+    isolated = {
+        "intent_cache": {"snapshot_path": None},
+        "tts_cache": {"cache_dir": os.path.join(directory, "tts"), "warmup": False},
+    }
+    for section_overrides in (isolated, overrides or {}):
+        for name, values in section_overrides.items():
+            section = data.get(name) or {}
+            section.update(values)
+            data[name] = section
+    path = os.path.join(directory, "settings.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
+    return path
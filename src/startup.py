@@ -0,0 +1,129 @@
+"""
+Açılış sırası ve hazır olma (readiness) takibi.
+
+'GET /' yalnızca sürecin ayakta olduğunu (liveness) söyler; 'GET /ready' ise işçinin trafik
+almaya hazır olduğunu: model yüklendi, havuzdaki tanıyıcılar örnek sesle ısıtıldı, HTTP istemcisi
+ve önbellek katmanları kuruldu. Kayan yeniden başlatmalarda yük dengeleyici soğuk işçiye trafik
+göndermesin diye hazır olma kontrolü olarak '/ready' kullanılmalıdır.
+
+Her adımın süresi ve süreç başlangıcından (fork dahil) hazır olmaya kadar geçen soğuk başlangıç
+süresi '/ready' cevabında ve 'startup_seconds' ölçümünde raporlanır.
+
+İçe aktarmalar yalnızca hazır olmadan önce gerekmiyorsa ertelenir: 'vosk' ilk model
+yüklemesine kadar içe aktarılmaz. 'pydantic' zaten FastAPI ile gelir; 'httpx' kritik
+'http_client' adımında gerekir (ertelemek süreyi yalnızca '/ready' öncesine kaydırır ve
+ön-çatallanmış sunucuda ana süreçteki tek içe aktarmanın işçilerle paylaşılmasını bozar).
+"""
+import os
+import time
+import wave
+import logging
+from contextlib import contextmanager
+
+from .metrics import STARTUP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def process_uptime_s():
+    """
+    Sürecin başlangıcından bu yana geçen saniye (Linux /proc üzerinden); okunamazsa None.
+    """
+    try:
+        with open("/proc/self/stat", "r") as f:
+            stat = f.read()
+        # Komut adı boşluk içerebilir; alanlar son ')' karakterinden sonra sayılır (starttime: 22. alan)
+        started_ticks = int(stat[stat.rindex(")") + 2:].split()[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - started_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def load_warmup_audio(path: str, sample_rate: int = 16000, max_seconds: float = 1.0) -> bytes:
+    """
+    Isıtma örneğinin başından en fazla 'max_seconds' saniyelik PCM16 mono veriyi döndürür.
+    """
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1 or wav.getframerate() != sample_rate:
+            raise ValueError(
+                f"Isıtma örneği {sample_rate} Hz 16-bit mono WAV olmalı: {path} "
+                f"({wav.getframerate()} Hz, {wav.getnchannels()} kanal, {8 * wav.getsampwidth()}-bit)"
+            )
+        return wav.readframes(int(sample_rate * max_seconds))
+
+
+class StartupTracker:
+    """
+    Açılış adımlarının süresini, hatalarını ve işçinin hazır olup olmadığını tutar.
+
+    'critical' adımlardan biri başarısız olursa işçi hazır sayılmaz ('/ready' 503 döner);
+    diğer adımların hatası loglanır ve raporlanır ama hazır olmayı engellemez.
+    """
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        # Süreç başlangıcı; /proc okunamazsa bu nesnenin oluşturulduğu an (modülün içe aktarılması)
+        self.started_at = clock() - (process_uptime_s() or 0.0)
+        self.begin()
+
+    def begin(self):
+        """
+        Yeni bir açılış sırası başlatır (uygulama 'lifespan'i her başladığında).
+        """
+        self.steps = {}
+        self.failed = []
+        self.ready_at = None
+
+    @contextmanager
+    def step(self, name: str, critical: bool = False, errors=(Exception,)):
+        """
+        Blok süresini 'name' adımı olarak kaydeder. 'errors' türündeki hatalar loglanıp
+        adıma yazılır ve yutulur. Dönen sözlüğe adımın ayrıntıları eklenebilir.
+        """
+        info = {"ok": True}
+        self.steps[name] = info
+        started = self._clock()
+        try:
+            yield info
+        except errors as e:
+            info["ok"] = False
+            info["error"] = str(e)
+            if critical:
+                self.failed.append(name)
+            logger.error(f"Açılış adımı başarısız ({name}): {e}")
+        finally:
+            info["seconds"] = round(self._clock() - started, 4)
+            STARTUP_SECONDS.set(info["seconds"], step=name)
+
+    def mark_ready(self) -> bool:
+        """
+        Açılış tamamlandı; kritik adımlar başarılıysa işçiyi hazır işaretler.
+        """
+        if self.failed:
+            logger.error(f"İşçi hazır değil; başarısız açılış adımları: {', '.join(self.failed)}")
+            return False
+        self.ready_at = self._clock()
+        STARTUP_SECONDS.set(self.cold_start_s, step="cold_start_to_ready")
+        summary = ", ".join(f"{name} {info['seconds']}s" for name, info in self.steps.items())
+        logger.info(f"İşçi hazır: soğuk başlangıçtan hazır olmaya {self.cold_start_s}s ({summary}).")
+        return True
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    @property
+    def cold_start_s(self):
+        if self.ready_at is None:
+            return None
+        return round(self.ready_at - self.started_at, 4)
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "cold_start_s": self.cold_start_s,
+            "uptime_s": round(self._clock() - self.started_at, 4),
+            "steps": {name: dict(info) for name, info in self.steps.items()},
+            "failed": list(self.failed),
+        }
@@ -0,0 +1,166 @@
+import numpy as np
+
+
+class VADResult:
+    """
+    Bir ses parçasının VAD çıktısı.
+    - speech: tanıyıcıya iletilecek (konuşma içeren) PCM16 baytları
+    - end_of_speech: konuşma bitti; nihai sonuç zorlanmalı
+    """
+    __slots__ = ("speech", "end_of_speech")
+
+    def __init__(self, speech: bytes, end_of_speech: bool):
+        self.speech = speech
+        self.end_of_speech = end_of_speech
+
+
+class VADEndpointer:
+    """
+    STTService.transcribe_chunk önüne konan, NumPy ile vektörize edilmiş ses etkinliği
+    algılayıcı (VAD) ve konuşma sonu (endpoint) belirleyici.
+
+    Her parça int16 çerçevelere bölünür; çerçeve enerjisi (dBFS) ve sıfır geçiş oranı
+    (ZCR) tüm çerçeveler için tek seferde hesaplanır:
+    - Gürültü tabanı, son 'noise_window_ms' içindeki *tüm* çerçeve enerjilerinin düşük
+      bir yüzdeliği (minimum istatistiği) olarak izlenir; sabit uğultu veya lobi
+      gürültüsü bu sayede konuşma sanılmaz. Taban 'max_noise_floor_db' ile sınırlıdır;
+      pencere kesintisiz konuşmayla dolsa bile konuşma seviyesine çıkmaz.
+    - Enerjisi eşiğin (mutlak eşik veya gürültü tabanı + 'noise_margin_db', hangisi
+      yüksekse) üstündeki çerçeveler konuşmadır.
+    - Eşiğin biraz altında kalan ama ZCR'si yüksek ve gürültü tabanının belirgin üstündeki
+      çerçeveler ('s', 'ş', 'f' gibi ötümsüz sesler) de konuşma sayılır.
+    - Konuşmadan sonraki 'hangover_ms' ve önceki 'preroll_ms' kadar çerçeve de iletilir;
+      böylece kelime başları ve sonları kırpılmaz.
+    Sessiz çerçeveler tanıyıcıya hiç gönderilmez. Konuşmadan sonra 'end_of_speech_ms'
+    boyunca sessizlik olursa 'end_of_speech' bildirilir.
+    """
+    def __init__(self, sample_rate=16000, frame_ms=20, energy_threshold_db=-45.0, noise_margin_db=10.0,
+                 zcr_threshold=0.25, zcr_energy_margin_db=10.0, zcr_noise_margin_db=4.0, hangover_ms=300,
+                 preroll_ms=100, end_of_speech_ms=800, noise_window_ms=3000, noise_percentile=10.0,
+                 min_noise_ms=200, max_noise_floor_db=-35.0):
+        self.sample_rate = sample_rate
+        self.frame_len = max(1, int(sample_rate * frame_ms / 1000))
+        self.frame_ms = frame_ms
+        self.energy_threshold_db = energy_threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.zcr_threshold = zcr_threshold
+        self.zcr_energy_margin_db = zcr_energy_margin_db
+        self.zcr_noise_margin_db = zcr_noise_margin_db
+        self.noise_window_frames = max(1, int(noise_window_ms / frame_ms))
+        self.noise_percentile = noise_percentile
+        self.min_noise_frames = max(1, int(min_noise_ms / frame_ms))
+        self.max_noise_floor_db = max_noise_floor_db
+        self.hangover_frames = int(hangover_ms / frame_ms)
+        self.preroll_frames = int(preroll_ms / frame_ms)
+        self.end_of_speech_frames = max(1, int(end_of_speech_ms / frame_ms))
+
+        self._remainder = b""
+        self._preroll = np.empty(0, dtype=np.int16)
+        # Son konuşma çerçevesinden bu yana geçen çerçeve sayısı (başlangıçta "çok uzun")
+        self._since_speech = 1 << 30
+        self._in_utterance = False
+        self._noise_db = None
+        # Gürültü tabanı penceresi: son çerçevelerin enerjileri (konuşma/sessiz ayrımı yapılmadan)
+        self._energy_history = np.empty(0, dtype=np.float32)
+        self.frames_total = 0
+        self.frames_forwarded = 0
+        self.endpoints = 0
+
+    @classmethod
+    def from_settings(cls, section: dict, sample_rate: int) -> "VADEndpointer":
+        keys = ("frame_ms", "energy_threshold_db", "noise_margin_db", "zcr_threshold",
+                "zcr_energy_margin_db", "zcr_noise_margin_db", "hangover_ms", "preroll_ms",
+                "end_of_speech_ms", "noise_window_ms", "noise_percentile", "min_noise_ms",
+                "max_noise_floor_db")
+        return cls(sample_rate=sample_rate, **{k: section[k] for k in keys if k in section})
+
+    def _frame_features(self, frames: np.ndarray):
+        samples = frames.astype(np.float32) / 32768.0
+        energy_db = 10.0 * np.log10(np.mean(samples * samples, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_len - 1)
+        return energy_db, zcr
+
+    def process(self, chunk: bytes) -> VADResult:
+        data = self._remainder + chunk
+        usable = len(data) - len(data) % (2 * self.frame_len)
+        self._remainder = data[usable:]
+        if usable == 0:
+            return VADResult(b"", False)
+
+        frames = np.frombuffer(data, dtype=np.int16, count=usable // 2).reshape(-1, self.frame_len)
+        n = frames.shape[0]
+        energy_db, zcr = self._frame_features(frames)
+
+        # Eşik, gürültü tabanına göre uyarlanır ama mutlak eşiğin altına inmez
+        threshold = self.energy_threshold_db
+        zcr_floor = threshold - self.zcr_energy_margin_db
+        floor_known = self._noise_db is not None
+        if floor_known:
+            threshold = max(threshold, self._noise_db + self.noise_margin_db)
+            zcr_floor = max(threshold - self.zcr_energy_margin_db, self._noise_db + self.zcr_noise_margin_db)
+        is_speech = (energy_db > threshold) | ((energy_db > zcr_floor) & (zcr > self.zcr_threshold))
+
+        # Hangover: her çerçeve için son konuşma çerçevesine uzaklık (önceki parçadan devam eder)
+        idx = np.arange(n)
+        last_speech = np.where(is_speech, idx, -1 - self._since_speech)
+        last_speech = np.maximum.accumulate(last_speech)
+        since_speech = idx - last_speech
+        active = since_speech <= self.hangover_frames
+
+        # Pre-roll: bir sonraki konuşma çerçevesine 'preroll_frames' kadar yakın çerçeveler
+        if self.preroll_frames:
+            next_speech = np.where(is_speech, idx, n + self.preroll_frames + 1)
+            next_speech = np.minimum.accumulate(next_speech[::-1])[::-1]
+            active |= (next_speech - idx) <= self.preroll_frames
+
+        # Gürültü tabanını tüm çerçevelerden güncelle (minimum istatistiği: düşük yüzdelik).
+        # Yalnızca "sessiz" sayılan çerçevelerden öğrenilseydi taban, başlangıç eşiğinin
+        # üstüne hiç çıkamaz ve gürültülü ortam sonsuza dek konuşma sayılırdı.
+        history = np.concatenate((self._energy_history, energy_db.astype(np.float32)))
+        self._energy_history = history[-self.noise_window_frames:]
+        if self._energy_history.size >= self.min_noise_frames:
+            # Üst sınır: kesintisiz konuşma pencereyi doldursa bile taban konuşma seviyesine çıkmaz
+            floor = float(np.percentile(self._energy_history, self.noise_percentile))
+            self._noise_db = min(floor, self.max_noise_floor_db)
+
+        speech_frames = frames[active]
+        # Konuşma bu parçanın başına yakın başladıysa pre-roll'un eksik kalan kısmını
+        # önceki parçanın sessiz kuyruğundan tamamla
+        speech = speech_frames.tobytes()
+        if active[0] and self._since_speech > self.hangover_frames and self._preroll.size:
+            first_speech = int(np.argmax(is_speech)) if is_speech.any() else n
+            missing = max(0, self.preroll_frames - first_speech) * self.frame_len
+            if missing:
+                speech = self._preroll[-missing:].tobytes() + speech
+
+        # Parçanın sonundaki sessiz çerçeveler bir sonraki konuşmanın pre-roll'u olarak saklanır
+        active_idx = np.flatnonzero(active)
+        trailing_silent = n - 1 - (active_idx[-1] if active_idx.size else -1)
+        keep = min(self.preroll_frames, trailing_silent)
+        self._preroll = frames[n - keep:].reshape(-1).copy() if keep else np.empty(0, dtype=np.int16)
+
+        # Konuşma sonu: konuşmadan sonra yeterince uzun sessizlik
+        end_of_speech = False
+        # Gürültü tabanı henüz bilinmezken (ilk 'min_noise_ms') iletilen çerçeveler bir
+        # konuşma başlatmaz; aksi halde gürültülü ortamda açılışta sahte bir endpoint oluşurdu
+        if floor_known and is_speech.any():
+            self._in_utterance = True
+        self._since_speech = int(since_speech[-1])
+        if self._in_utterance and self._since_speech >= self.end_of_speech_frames:
+            self._in_utterance = False
+            end_of_speech = True
+            self.endpoints += 1
+
+        self.frames_total += n
+        self.frames_forwarded += int(active.sum())
+        return VADResult(speech, end_of_speech)
+
+    def stats(self) -> dict:
+        return {
+            "frames_total": self.frames_total,
+            "frames_forwarded": self.frames_forwarded,
+            "dropped_ratio": round(1 - self.frames_forwarded / self.frames_total, 4) if self.frames_total else 0.0,
+            "endpoints": self.endpoints,
+            "noise_floor_db": None if self._noise_db is None else round(self._noise_db, 1),
+        }
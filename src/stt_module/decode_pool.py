@@ -0,0 +1,115 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DecodeQueueFull(RuntimeError):
+    """
+    Çözümleme (decode) kuyruğu dolu ve bekleme süresi aşıldı.
+    """
+
+
+class DecodePool:
+    """
+    Vosk çözümlemesini (AcceptWaveform) asyncio olay döngüsünün dışında çalıştıran
+    sınırlı bir işçi (worker) havuzu.
+
+    Vosk'un C çağrıları (cffi) GIL'i bıraktığı için thread havuzu N eşzamanlı akışı
+    N çekirdeğe yayar; tanıyıcı durumu da süreç içinde kaldığından process havuzundaki
+    serileştirme maliyeti ödenmez.
+    Kuyruk derinliği 'max_queue' ile sınırlıdır: kuyruk doluysa yeni işler
+    'queue_timeout' saniye bekler, sonra 'DecodeQueueFull' fırlatılır.
+    """
+    def __init__(self, max_workers=None, max_queue=None, queue_timeout=5.0):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue or self.max_workers * 4
+        self.queue_timeout = queue_timeout
+        self._executor = None
+        self._slots = None
+        self._counter_lock = threading.Lock()
+        self._pending = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def start(self):
+        """
+        İşçi thread'lerini ve kuyruk sınırını hazırlar (uygulama açılışında çağrılır).
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="vosk-decode"
+            )
+        self._slots = asyncio.Semaphore(self.max_queue)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        self._slots = None
+
+    def _run_counted(self, fn, args):
+        with self._counter_lock:
+            self._in_flight += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._counter_lock:
+                self._in_flight -= 1
+                self._completed += 1
+
+    async def run(self, fn, *args):
+        """
+        'fn(*args)' çağrısını işçi havuzunda çalıştırır ve sonucunu döndürür.
+        """
+        if self._executor is None or self._slots is None:
+            self.start()
+
+        self._pending += 1
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._rejected += 1
+                raise DecodeQueueFull(
+                    f"Çözümleme kuyruğu dolu ({self.max_queue} iş, {self.queue_timeout}s beklendi)."
+                )
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, self._run_counted, fn, args)
+            finally:
+                self._slots.release()
+        finally:
+            self._pending -= 1
+
+    def stream(self) -> "DecodeStream":
+        """
+        Tek bir bağlantı için sıralamayı garanti eden bir akış nesnesi döndürür.
+        """
+        return DecodeStream(self)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self._pending,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+
+class DecodeStream:
+    """
+    Bağlantı başına çözümleme sırası.
+    Aynı tanıyıcıya ait parçalar, gönderildikleri sırayla ve asla eşzamanlı
+    olmadan işlenir (asyncio.Lock bekleyenleri FIFO sırasıyla uyandırır).
+    """
+    def __init__(self, pool: DecodePool):
+        self._pool = pool
+        self._lock = asyncio.Lock()
+
+    async def submit(self, fn, *args):
+        async with self._lock:
+            return await self._pool.run(fn, *args)
@@ -0,0 +1,115 @@
+import os
+import time
+import logging
+import threading
+from ..metrics import STT_MODEL_LOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# 'vosk' (libvosk ve 'requests'/'tqdm' bağımlılıkları) içe aktarılması açılışa ~0.1 s ekler;
+# ilk model yüklemesine kadar ertelenir. Testler bu adı sahte sınıfla değiştirir.
+Model = None
+
+
+def vosk_model_class():
+    """
+    Vosk 'Model' sınıfını ilk kullanımda içe aktarır (Kaldi logları kapatılarak).
+    """
+    global Model
+    if Model is None:
+        from vosk import Model as VoskModel, SetLogLevel
+        SetLogLevel(-1)
+        Model = VoskModel
+    return Model
+
+# Varsayılan model yolu, bu dosyanın konumuna göre belirlenir
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_PATH = os.path.join(SERVICE_DIR, "models", "vosk-model-small-tr-0.3")
+
+
+def current_rss_bytes() -> int:
+    """
+    Sürecin o anki yerleşik bellek (RSS) kullanımını byte olarak döndürür.
+    Linux'ta /proc üzerinden okunur; diğer platformlarda tepe (peak) değere düşülür.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS byte, Linux kilobyte cinsinden döndürür
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class ModelRegistry:
+    """
+    Süreç genelinde paylaşılan Vosk model kaydı.
+    Her model (yoluna göre) süreç başına yalnızca bir kez yüklenir ve
+    tüm bağlantıların 'KaldiRecognizer' örneklerine aynı 'Model' verilir.
+    Vosk 'Model' nesnesi salt okunurdur; birden fazla tanıyıcı tarafından
+    eşzamanlı kullanılabilir.
+    """
+    def __init__(self):
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_path: str = DEFAULT_MODEL_PATH):
+        """
+        Verilen yoldaki modeli döndürür; ilk çağrıda diskten yükler.
+        Birden fazla thread'den güvenle çağrılabilir: yükleme ve sayaçlar kilit altındadır
+        (kilit yalnızca bağlantı kurulumunda alınır, çözümleme yolunda değil).
+        """
+        key = os.path.abspath(model_path)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._stats[key]["hits"] += 1
+                return model
+
+            if not os.path.exists(key):
+                raise FileNotFoundError(f"Vosk modeli bulunamadı: {key}")
+
+            rss_before = current_rss_bytes()
+            started = time.perf_counter()
+            model = vosk_model_class()(key)
+            load_time = time.perf_counter() - started
+            rss_after = current_rss_bytes()
+
+            self._models[key] = model
+            self._stats[key] = {
+                "load_time_s": round(load_time, 4),
+                "rss_delta_bytes": rss_after - rss_before,
+                "loaded_at": time.time(),
+                "hits": 0,
+            }
+            STT_MODEL_LOAD_SECONDS.set(load_time, model=os.path.basename(key))
+            logger.info(f"Vosk modeli yüklendi: {key} ({load_time:.2f}s)")
+            return model
+
+    def is_loaded(self, model_path: str = DEFAULT_MODEL_PATH) -> bool:
+        return os.path.abspath(model_path) in self._models
+
+    def stats(self) -> dict:
+        """
+        Yüklü modellerin yükleme süresi, bellek artışı ve paylaşım sayılarını
+        ve sürecin güncel RSS değerini döndürür.
+        """
+        with self._lock:
+            models = {path: dict(info) for path, info in self._stats.items()}
+        return {"process_rss_bytes": current_rss_bytes(), "models": models}
+
+    def clear(self):
+        """
+        Tüm modelleri kayıttan çıkarır (testler ve yeniden yükleme için).
+        """
+        with self._lock:
+            self._models.clear()
+            self._stats.clear()
+
+
+# Süreç genelinde tek kayıt
+model_registry = ModelRegistry()
@@ -0,0 +1,246 @@
+import math
+import numpy as np
+
+
+def design_lowpass(num_taps: int, cutoff: float, beta: float = 8.0) -> np.ndarray:
+    """
+    Kaiser pencereli sinc alçak geçiren FIR filtresi tasarlar.
+    'cutoff', örnekleme hızının yarısına göre normalize edilmiş kesim frekansıdır (0-1).
+    """
+    n = np.arange(num_taps) - (num_taps - 1) / 2.0
+    taps = cutoff * np.sinc(cutoff * n) * np.kaiser(num_taps, beta)
+    return taps / taps.sum()
+
+
+class PolyphaseResampler:
+    """
+    Akış (parça parça) çalışan, NumPy ile vektörize edilmiş polifaz yeniden örnekleyici.
+
+    Oran 'up/down' sadeleştirilmiş kesre çevrilir (örn. 48000 -> 16000 için 1/3,
+    44100 -> 16000 için 160/441). Prototip filtre 'up' fazına bölünür; her çıkış örneği
+    yalnızca kendi fazının 'taps_per_phase' katsayısıyla hesaplanır, yani ara (up katı)
+    sinyal hiç oluşturulmaz. Parçalar arasında son 'taps_per_phase - 1' giriş örneği ve
+    faz konumu saklanır; parçalara bölünmüş akışın çıktısı tek seferde işlenmiş sinyalle
+    aynıdır. Eklenen gecikme filtre grup gecikmesi kadardır (~taps_per_phase/2 giriş örneği).
+    """
+    def __init__(self, in_rate: int, out_rate: int = 16000, taps_per_phase: int = 16):
+        g = math.gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self.taps_per_phase = taps_per_phase
+
+        # Kesim: iki hızdan düşük olanın Nyquist'inin biraz altı (örtüşmeyi önlemek için)
+        cutoff = 0.9 / max(self.up, self.down)
+        prototype = design_lowpass(self.up * taps_per_phase, cutoff) * self.up
+        # polyphase[p, k] = h[p + k*up]: faz 'p' için x[i], x[i-1], ... ile çarpılacak katsayılar
+        self._polyphase = prototype.reshape(taps_per_phase, self.up).T.astype(np.float32).copy()
+        self._offsets = np.arange(taps_per_phase)
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        # Sıradaki çıkış örneğinin, parçanın ilk örneğine göre 'up' biriminde konumu
+        self._pos = 0
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        float32 giriş örneklerini yeniden örnekleyip float32 çıkış döndürür.
+        """
+        if self.passthrough:
+            return samples.astype(np.float32, copy=False)
+        n_in = samples.shape[0]
+        total = n_in * self.up - self._pos
+        count = max(0, -(-total // self.down))
+        buffer = np.concatenate((self._history, samples.astype(np.float32, copy=False)))
+
+        positions = self._pos + np.arange(count) * self.down
+        base = positions // self.up + (self.taps_per_phase - 1)
+        phases = positions % self.up
+        window = buffer[base[:, None] - self._offsets[None, :]]
+        out = np.einsum("nk,nk->n", window, self._polyphase[phases])
+
+        self._pos += count * self.down - n_in * self.up
+        self._history = buffer[buffer.shape[0] - (self.taps_per_phase - 1):].copy()
+        return out
+
+
+class DCBlocker:
+    """
+    Parça bazında DC (sabit kayma) giderici.
+    Ortalama, parçalar üzerinde üstel olarak yumuşatılır; her parçadan güncel kestirim
+    çıkarılır. Örnek bazlı özyinelemeli filtre yerine tamamen vektörel çalışır.
+    """
+    def __init__(self, smoothing: float = 0.9):
+        self.smoothing = smoothing
+        self._mean = None
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if samples.size == 0:
+            return samples
+        block_mean = float(samples.mean())
+        if self._mean is None:
+            self._mean = block_mean
+        else:
+            self._mean = self.smoothing * self._mean + (1.0 - self.smoothing) * block_mean
+        return samples - np.float32(self._mean)
+
+
+class SpectralSubtractor:
+    """
+    Akış halinde spektral çıkarma ile gürültü bastırıcı.
+
+    %50 örtüşmeli karekök-Hann pencereli STFT kullanılır (analiz ve sentez pencerelerinin
+    çarpımı örtüşme-toplamada 1 verir). Bir çağrıdaki tüm çerçeveler tek seferde
+    rfft/irfft ile işlenir. Gürültü genlik spektrumu ilk 'init_frames' çerçeveden ve
+    sonrasında gürültü enerjisine yakın (sessiz) çerçevelerden üstel ortalamayla öğrenilir.
+    Kazanç: max(1 - over_subtraction * N/|X|, spectral_floor).
+
+    Eklenen gecikme bir sıçrama ('frame_size/2') kadardır; 16 kHz'te 512'lik çerçeve
+    için 16 ms, yani tipik bir WebSocket parçasından (125 ms) kısadır.
+    """
+    def __init__(self, frame_size: int = 512, over_subtraction: float = 1.5, spectral_floor: float = 0.1,
+                 noise_smoothing: float = 0.9, init_frames: int = 10, noise_gate_ratio: float = 2.0):
+        if frame_size % 2:
+            raise ValueError("frame_size çift sayı olmalı.")
+        self.frame_size = frame_size
+        self.hop = frame_size // 2
+        self.over_subtraction = over_subtraction
+        self.spectral_floor = spectral_floor
+        self.noise_smoothing = noise_smoothing
+        self.init_frames = init_frames
+        self.noise_gate_ratio = noise_gate_ratio
+        self._window = np.sqrt(np.hanning(frame_size + 1)[:-1]).astype(np.float32)
+        self._pending = np.zeros(self.hop, dtype=np.float32)
+        self._tail = np.zeros(self.hop, dtype=np.float32)
+        self._noise_mag = None
+        self._noise_power = None
+        self._frames_seen = 0
+
+    def _update_noise(self, mag: np.ndarray, power: np.ndarray):
+        if self._frames_seen < self.init_frames:
+            take = min(self.init_frames - self._frames_seen, mag.shape[0])
+            init_mag = mag[:take].mean(axis=0)
+            init_power = float(power[:take].mean())
+            if self._noise_mag is None:
+                self._noise_mag, self._noise_power = init_mag, init_power
+            else:
+                w = self._frames_seen / (self._frames_seen + take)
+                self._noise_mag = w * self._noise_mag + (1 - w) * init_mag
+                self._noise_power = w * self._noise_power + (1 - w) * init_power
+            mag, power = mag[take:], power[take:]
+        # Yalnızca gürültü seviyesine yakın çerçeveler tabanı günceller
+        quiet = power <= self._noise_power * self.noise_gate_ratio
+        if quiet.any():
+            a = self.noise_smoothing
+            self._noise_mag = a * self._noise_mag + (1 - a) * mag[quiet].mean(axis=0)
+            self._noise_power = a * self._noise_power + (1 - a) * float(power[quiet].mean())
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        float32 örnekleri işler; tamamlanan sıçramalar kadar (hop'un katı) çıkış döndürür.
+        """
+        buffer = np.concatenate((self._pending, samples.astype(np.float32, copy=False)))
+        n_frames = (buffer.shape[0] - self.frame_size) // self.hop + 1
+        if n_frames <= 0:
+            self._pending = buffer
+            return np.empty(0, dtype=np.float32)
+
+        frames = np.lib.stride_tricks.as_strided(
+            buffer, shape=(n_frames, self.frame_size),
+            strides=(buffer.strides[0] * self.hop, buffer.strides[0]), writeable=False
+        )
+        spectrum = np.fft.rfft(frames * self._window, axis=1)
+        mag = np.abs(spectrum)
+        power = np.mean(mag * mag, axis=1)
+        self._update_noise(mag, power)
+        self._frames_seen += n_frames
+
+        gain = np.maximum(1.0 - self.over_subtraction * self._noise_mag / (mag + 1e-9), self.spectral_floor)
+        cleaned = np.fft.irfft(spectrum * gain, n=self.frame_size, axis=1).astype(np.float32) * self._window
+
+        # Örtüşme-toplama: her çerçevenin ilk yarısı bir önceki çerçevenin ikinci yarısıyla toplanır
+        first, second = cleaned[:, :self.hop], cleaned[:, self.hop:]
+        previous = np.concatenate((self._tail[None, :], second[:-1]), axis=0)
+        out = (first + previous).reshape(-1)
+        self._tail = second[-1].copy()
+        self._pending = buffer[n_frames * self.hop:].copy()
+        return out
+
+    def flush(self) -> np.ndarray:
+        """
+        Bekleyen örnekleri sıfırla tamamlayıp işler (akış sonu).
+        """
+        return self.process(np.zeros(self.frame_size, dtype=np.float32))
+
+
+class AudioFrontEnd:
+    """
+    Tanıyıcıdan (ve VAD'den) önce çalışan PCM16 ön işleme aşaması:
+    yeniden örnekleme (hedef hız, varsayılan 16 kHz) -> DC giderme -> (isteğe bağlı)
+    spektral çıkarma. Tüm durum parçalar arasında korunur; bağlantı başına bir örnek
+    oluşturulmalıdır. İşçi havuzunda, bağlantının DecodeStream sırasıyla çağrılır.
+    """
+    def __init__(self, in_rate: int, out_rate: int = 16000, taps_per_phase: int = 16, dc_removal: bool = True,
+                 noise_suppression: bool = False, frame_size: int = 512, over_subtraction: float = 1.5,
+                 spectral_floor: float = 0.1):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.resampler = PolyphaseResampler(in_rate, out_rate, taps_per_phase)
+        self.dc_blocker = DCBlocker() if dc_removal else None
+        self.suppressor = SpectralSubtractor(
+            frame_size=frame_size, over_subtraction=over_subtraction, spectral_floor=spectral_floor
+        ) if noise_suppression else None
+        self._remainder = b""
+        self.samples_in = 0
+        self.samples_out = 0
+
+    @classmethod
+    def from_settings(cls, section: dict, in_rate: int, noise_suppression=None) -> "AudioFrontEnd":
+        if noise_suppression is None:
+            noise_suppression = section.get("noise_suppression", False)
+        keys = ("taps_per_phase", "dc_removal", "frame_size", "over_subtraction", "spectral_floor")
+        return cls(
+            in_rate=in_rate, out_rate=section.get("target_sample_rate", 16000),
+            noise_suppression=noise_suppression, **{k: section[k] for k in keys if k in section}
+        )
+
+    def _to_pcm16(self, samples: np.ndarray) -> bytes:
+        self.samples_out += samples.shape[0]
+        return np.clip(np.rint(samples * 32768.0), -32768, 32767).astype(np.int16).tobytes()
+
+    def process(self, chunk: bytes) -> bytes:
+        """
+        PCM16 (giriş hızında) baytları alır, PCM16 (hedef hızda) baytlar döndürür.
+        """
+        data = self._remainder + chunk
+        usable = len(data) - len(data) % 2
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data, dtype=np.int16, count=usable // 2).astype(np.float32) / 32768.0
+        self.samples_in += samples.shape[0]
+
+        samples = self.resampler.process(samples)
+        if self.dc_blocker is not None:
+            samples = self.dc_blocker.process(samples)
+        if self.suppressor is not None:
+            samples = self.suppressor.process(samples)
+        return self._to_pcm16(samples)
+
+    def flush(self) -> bytes:
+        """
+        Gürültü bastırıcının elinde kalan örnekleri çıkarır (konuşma/akış sonu).
+        """
+        if self.suppressor is None:
+            return b""
+        return self._to_pcm16(self.suppressor.flush())
+
+    def stats(self) -> dict:
+        return {
+            "in_rate": self.in_rate,
+            "out_rate": self.out_rate,
+            "input_seconds": round(self.samples_in / self.in_rate, 3),
+            "output_seconds": round(self.samples_out / self.out_rate, 3),
+            "noise_suppression": self.suppressor is not None,
+        }
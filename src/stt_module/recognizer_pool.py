@@ -0,0 +1,195 @@
+import time
+import logging
+import threading
+from collections import deque
+
+from .model_registry import model_registry, DEFAULT_MODEL_PATH
+from .stt_service import create_recognizer
+
+logger = logging.getLogger(__name__)
+
+
+class RecognizerPoolExhausted(RuntimeError):
+    """
+    Havuzdaki tüm tanıyıcılar kullanımda ve bekleme süresi aşıldı.
+    """
+
+
+class RecognizerPool:
+    """
+    (model, örnekleme hızı, dilbilgisi) başına önceden oluşturulmuş KaldiRecognizer havuzu.
+
+    Bağlantı kurulurken yeni tanıyıcı oluşturmak yerine havuzdan sıfırlanmış bir tanıyıcı
+    alınır; akış bittiğinde (veya hata verdiğinde) 'Reset()' edilip havuza geri konur.
+    Her anahtar için en fazla 'max_per_key' tanıyıcı oluşturulur: bağlantı patlamasında
+    sınırsız bellek ayırmak yerine 'acquire_timeout' saniyeye kadar beklenir, sonra
+    'RecognizerPoolExhausted' fırlatılır.
+
+    Bekleme thread tabanlıdır (threading.Condition); olay döngüsünden 'asyncio.to_thread'
+    ile çağrılır, böylece havuz farklı olay döngülerinden de güvenle kullanılabilir.
+
+    'grammars' {ad: ifade listesi} sözlüğüdür; dilbilgisi adıyla alınan tanıyıcılar
+    kısıtlı kelime dağarcığıyla kurulur ve ayrı bir anahtar altında tutulur.
+    """
+    def __init__(self, max_per_key=32, acquire_timeout=5.0, registry=model_registry, factory=create_recognizer,
+                 grammars=None):
+        self.max_per_key = max(1, max_per_key)
+        self.acquire_timeout = acquire_timeout
+        self.registry = registry
+        self.factory = factory
+        self.grammars = dict(grammars or {})
+        self._cond = threading.Condition()
+        self._idle = {}      # anahtar -> deque[(tanıyıcı, model)]
+        self._created = {}   # anahtar -> oluşturulmuş (boşta + kullanımda) tanıyıcı sayısı
+        self._in_use = {}    # anahtar -> kullanımdaki tanıyıcı sayısı
+        self.acquired = 0
+        self.reused = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.discarded = 0
+        self.total_acquire_s = 0.0
+        self.max_acquire_s = 0.0
+
+    def _key(self, model_path: str, sample_rate: int, grammar) -> tuple:
+        if grammar is not None and grammar not in self.grammars:
+            raise KeyError(f"Tanımsız dilbilgisi: {grammar}")
+        return (model_path, int(sample_rate), grammar)
+
+    def _create(self, model, key):
+        grammar = key[2]
+        return self.factory(model, key[1], self.grammars[grammar] if grammar is not None else None)
+
+    def prewarm(self, model_path: str = DEFAULT_MODEL_PATH, sample_rate: int = 16000, count: int = 0,
+                grammar=None, warm=None) -> int:
+        """
+        Havuzu 'count' boşta tanıyıcıya kadar doldurur (açılışta, beklenen kiosk sayısı kadar).
+        'warm(tanıyıcı)' verilirse her yeni tanıyıcı havuza girmeden önce onunla ısıtılır (örn. kısa
+        bir örnek ses çözülüp sıfırlanır). Oluşturulan yeni tanıyıcı sayısını döndürür.
+        """
+        key = self._key(model_path, sample_rate, grammar)
+        model = self.registry.get(model_path)
+        created = 0
+        while True:
+            with self._cond:
+                idle = self._idle.setdefault(key, deque())
+                if len(idle) >= count or self._created.get(key, 0) >= self.max_per_key:
+                    return created
+                self._created[key] = self._created.get(key, 0) + 1
+            recognizer = self._create(model, key)
+            if warm is not None:
+                warm(recognizer)
+            with self._cond:
+                idle.append((recognizer, model))
+                self._cond.notify()
+            created += 1
+
+    def acquire(self, model_path: str = DEFAULT_MODEL_PATH, sample_rate: int = 16000, grammar=None):
+        """
+        Boşta bir tanıyıcı döndürür; yoksa ve sınır aşılmadıysa yenisini oluşturur, aşıldıysa bekler.
+        Engelleyicidir (blocking): olay döngüsünden 'asyncio.to_thread' ile çağrılmalıdır.
+        """
+        key = self._key(model_path, sample_rate, grammar)
+        model = self.registry.get(model_path)
+        started = time.perf_counter()
+        deadline = started + self.acquire_timeout
+        waited = False
+        with self._cond:
+            idle = self._idle.setdefault(key, deque())
+            while True:
+                while idle:
+                    recognizer, owner = idle.popleft()
+                    if owner is model:
+                        self._checkout(key, started, waited, reused=True)
+                        return recognizer
+                    # Model yeniden yüklendiyse eski modele bağlı tanıyıcı atılır
+                    self._created[key] -= 1
+                    self.discarded += 1
+                if self._created.get(key, 0) < self.max_per_key:
+                    self._created[key] = self._created.get(key, 0) + 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise RecognizerPoolExhausted(
+                        f"Tanıyıcı havuzu dolu ({self.max_per_key} tanıyıcı, {self.acquire_timeout}s beklendi)."
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+        try:
+            recognizer = self._create(model, key)
+        except BaseException:
+            with self._cond:
+                self._created[key] -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._checkout(key, started, waited, reused=False)
+        return recognizer
+
+    def _checkout(self, key, started, waited, reused):
+        # Kilit altında çağrılmalı
+        elapsed = time.perf_counter() - started
+        self._in_use[key] = self._in_use.get(key, 0) + 1
+        self.acquired += 1
+        self.reused += int(reused)
+        self.waits += int(waited)
+        self.total_acquire_s += elapsed
+        self.max_acquire_s = max(self.max_acquire_s, elapsed)
+
+    def release(self, recognizer, model_path: str = DEFAULT_MODEL_PATH, sample_rate: int = 16000, grammar=None,
+                reuse: bool = True):
+        """
+        Tanıyıcıyı sıfırlayıp havuza geri koyar. 'reuse' False ise (örn. bir çözümleme hâlâ
+        sürüyor olabilir) veya sıfırlanamazsa atılır ve yeri boşaltılır.
+        """
+        key = self._key(model_path, sample_rate, grammar)
+        try:
+            if not reuse:
+                raise RuntimeError("yeniden kullanım dışı bırakıldı")
+            recognizer.Reset()
+            model = self.registry.get(model_path)
+        except Exception as e:
+            logger.warning(f"Tanıyıcı havuza geri konmadı: {e}")
+            with self._cond:
+                self._in_use[key] -= 1
+                self._created[key] -= 1
+                self.discarded += 1
+                self._cond.notify()
+            return
+        with self._cond:
+            self._in_use[key] -= 1
+            self._idle.setdefault(key, deque()).append((recognizer, model))
+            self._cond.notify()
+
+    def clear(self):
+        """
+        Boştaki tüm tanıyıcıları bırakır (testler ve model yeniden yükleme için).
+        """
+        with self._cond:
+            for key, idle in self._idle.items():
+                self._created[key] -= len(idle)
+                idle.clear()
+
+    def stats(self) -> dict:
+        with self._cond:
+            pools = {
+                f"{key[0]}@{key[1]}" + (f"#{key[2]}" if key[2] is not None else ""): {
+                    "idle": len(self._idle.get(key, ())),
+                    "in_use": self._in_use.get(key, 0),
+                    "created": created,
+                    "utilization": round(self._in_use.get(key, 0) / self.max_per_key, 4),
+                }
+                for key, created in self._created.items()
+            }
+            return {
+                "max_per_key": self.max_per_key,
+                "acquired": self.acquired,
+                "reused": self.reused,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "discarded": self.discarded,
+                "avg_acquire_ms": round(self.total_acquire_s / self.acquired * 1000, 3) if self.acquired else 0.0,
+                "max_acquire_ms": round(self.max_acquire_s * 1000, 3),
+                "pools": pools,
+            }
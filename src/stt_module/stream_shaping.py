@@ -0,0 +1,138 @@
+import time
+import asyncio
+
+# ChunkCoalescer'da "bekletilen öğe yok" işareti (None akış sonu anlamına gelir)
+_NOTHING = object()
+
+
+class PartialThrottle:
+    """
+    Kısmi (partial) transkriptlerin istemciye gönderimini sınırlar.
+
+    - 'only_on_change': bir önceki gönderilenle aynı metin tekrar gönderilmez.
+    - 'min_interval_ms': iki kısmi gönderim arasında en az bu kadar süre geçer.
+    Nihai (final) sonuçlar hiç bekletilmez ve durumu sıfırlar; yeni konuşmanın ilk kısmi
+    sonucu beklemeden gönderilir. 'due()' çözümleme tarafında, kısmi sonuç zaten
+    gönderilemeyecekse PartialResult()/JSON çözümlemesini atlamak için kullanılır.
+    """
+    def __init__(self, min_interval_ms: float = 100.0, only_on_change: bool = True, clock=time.monotonic):
+        self.min_interval_s = max(0.0, min_interval_ms) / 1000.0
+        self.only_on_change = only_on_change
+        self.clock = clock
+        self._last_text = None
+        self._last_sent = None
+        self.sent_partials = 0
+        self.sent_finals = 0
+        self.suppressed = {"unchanged": 0, "rate": 0}
+
+    @classmethod
+    def from_settings(cls, section: dict) -> "PartialThrottle":
+        return cls(
+            min_interval_ms=section.get("partial_min_interval_ms", 100.0),
+            only_on_change=section.get("partial_only_on_change", True),
+        )
+
+    def reset(self):
+        """
+        Yeni bir konuşmanın başı: sonraki kısmi sonuç beklemeden gönderilir.
+        """
+        self._last_text = None
+        self._last_sent = None
+
+    def due(self) -> bool:
+        """
+        Şu anda bir kısmi sonuç gönderilebilir mi (yalnızca zaman sınırına bakar).
+        """
+        return self._last_sent is None or self.clock() - self._last_sent >= self.min_interval_s
+
+    def should_send(self, result) -> bool:
+        """
+        Sonucun istemciye gönderilip gönderilmeyeceğine karar verir ve durumu günceller.
+        Boş sonuçlar hiç gönderilmez.
+        """
+        if not result or not result.get("text"):
+            return False
+        if result.get("type") == "final":
+            self.reset()
+            self.sent_finals += 1
+            return True
+        if self.only_on_change and result["text"] == self._last_text:
+            self.suppressed["unchanged"] += 1
+            return False
+        if not self.due():
+            self.suppressed["rate"] += 1
+            return False
+        self._last_text = result["text"]
+        self._last_sent = self.clock()
+        self.sent_partials += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "min_interval_ms": self.min_interval_s * 1000.0,
+            "sent_partials": self.sent_partials,
+            "sent_finals": self.sent_finals,
+            "suppressed": dict(self.suppressed),
+        }
+
+
+class ChunkCoalescer:
+    """
+    WebSocket alımı ile çözümleme arasındaki sınırlı kuyruk.
+
+    Alıcı görev parçaları 'put' ile ekler; kuyruk doluysa bekler (istemciye TCP üzerinden
+    geri basınç uygulanır). Çözümleme döngüsü 'get_batch' ile o ana kadar biriken parçaları
+    toplu alır: çözümleme gerçek zamanın gerisinde kalırsa birden fazla parça tek bir
+    çözümleme işinde ('max_bytes'a kadar) işlenir, yetişiyorsa her parça tek başına gelir.
+    Akış sonu 'put(None)', alıcıdaki hata ise 'put(hata)' ile bildirilir.
+    """
+    def __init__(self, max_chunks: int = 32, max_bytes: int = 32000):
+        self.max_bytes = max(1, max_bytes)
+        self._queue = asyncio.Queue(maxsize=max(1, max_chunks))
+        self._held = _NOTHING
+        self.batches = 0
+        self.chunks = 0
+        self.max_batch = 0
+
+    async def put(self, item):
+        await self._queue.put(item)
+
+    async def get_batch(self):
+        """
+        Bir veya daha fazla parçadan oluşan listeyi döndürür; akış bittiyse None döner,
+        alıcı hata verdiyse o hatayı fırlatır. Akış sonu/hata, önceki parçalar işlendikten sonra bildirilir.
+        """
+        if self._held is not _NOTHING:
+            item, self._held = self._held, _NOTHING
+        else:
+            item = await self._queue.get()
+        if item is None:
+            return None
+        if isinstance(item, BaseException):
+            raise item
+
+        batch = [item]
+        size = len(item)
+        while size < self.max_bytes:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is None or isinstance(item, BaseException):
+                self._held = item
+                break
+            batch.append(item)
+            size += len(item)
+
+        self.batches += 1
+        self.chunks += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        return batch
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "chunks": self.chunks,
+            "mean_chunks_per_batch": round(self.chunks / self.batches, 2) if self.batches else 0.0,
+            "max_chunks_per_batch": self.max_batch,
+        }
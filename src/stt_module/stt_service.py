@@ -1,56 +1,134 @@
-import os
 import json
-from vosk import Model, KaldiRecognizer, SetLogLevel
+from .model_registry import model_registry, DEFAULT_MODEL_PATH
+from ..metrics import STT_STAGE_SECONDS
+from ..intent_cache import turkish_lower
+
+# 'vosk' ilk tanıyıcı oluşturulurken içe aktarılır (bkz. model_registry.vosk_model_class)
+KaldiRecognizer = None
+
+
+def vosk_recognizer_class():
+    """
+    Vosk 'KaldiRecognizer' sınıfını ilk kullanımda içe aktarır (Vosk logları kapatılarak).
+    """
+    global KaldiRecognizer
+    if KaldiRecognizer is None:
+        from vosk import KaldiRecognizer as VoskRecognizer, SetLogLevel
+        SetLogLevel(-1)
+        KaldiRecognizer = VoskRecognizer
+    return KaldiRecognizer
+
+# Dilbilgisi dışı konuşma, listedeki en yakın kelimeye zorlanmak yerine bu belirteçle döner
+UNKNOWN_TOKEN = "[unk]"
+
+
+def load_grammars(section) -> dict:
+    """
+    Ayar dosyasındaki 'stt.grammars' bölümünü {ad: ifade demeti} sözlüğüne çevirir.
+    İfadeler küçük harfe çevrilip tekilleştirilir; her dilbilgisine '[unk]' eklenir.
+    """
+    grammars = {}
+    for name, phrases in (section or {}).items():
+        seen = []
+        for phrase in phrases or ():
+            phrase = " ".join(turkish_lower(str(phrase)).split())
+            if phrase and phrase not in seen:
+                seen.append(phrase)
+        if UNKNOWN_TOKEN not in seen:
+            seen.append(UNKNOWN_TOKEN)
+        grammars[name] = tuple(seen)
+    return grammars
+
+
+def create_recognizer(model, sample_rate: int, grammar=None):
+    """
+    Verilen model ve örnekleme hızı için kelime bilgisi açık bir tanıyıcı oluşturur.
+    'grammar' (ifade listesi) verilirse çözümleme tam dil modeli yerine yalnızca bu
+    ifadelerden kurulan küçük bir graf üzerinde yapılır (daha hızlı, dar alanda daha isabetli).
+    """
+    recognizer_class = vosk_recognizer_class()
+    if grammar:
+        recognizer = recognizer_class(model, sample_rate, json.dumps(list(grammar), ensure_ascii=False))
+    else:
+        recognizer = recognizer_class(model, sample_rate)
+    recognizer.SetWords(True) # Kısmi sonuçlar için kelimeleri de al
+    return recognizer
+
+
+def warm_up_recognizer(recognizer, audio: bytes, chunk_bytes: int = 8000):
+    """
+    Tanıyıcıya örnek sesi gerçek akıştaki gibi parça parça çözdürüp sıfırlar. Böylece ilk
+    bağlantı, Kaldi'nin ilk çözümlemedeki tampon/graf ayırmalarını ve soğuk önbelleği ödemez.
+    """
+    for offset in range(0, len(audio), chunk_bytes):
+        if recognizer.AcceptWaveform(audio[offset:offset + chunk_bytes]):
+            recognizer.Result()
+        else:
+            recognizer.PartialResult()
+    recognizer.FinalResult()
+    recognizer.Reset()
+
+
+def _clean_text(text: str) -> str:
+    # Dilbilgisi modunda tanınmayan kelimeler '[unk]' olarak gelir; istemciye gönderilmez
+    if UNKNOWN_TOKEN not in text:
+        return text
+    return " ".join(word for word in text.split() if word != UNKNOWN_TOKEN)
 
-# Vosk loglarını kapat
-SetLogLevel(-1)
 
 class STTService:
     """
     Ses akışını (stream) gerçek zamanlı işleyen STT Servisi.
     Bu sınıf artık stateful (durum bilgili). 
     Her WebSocket bağlantısı için yeni bir 'STTService' örneği oluşturulmalıdır.
+    Model ise süreç genelindeki 'model_registry' üzerinden paylaşılır;
+    bağlantı kurulumu model boyutuyla ölçeklenmez.
     """
-    def __init__(self, sample_rate=16000):
+    def __init__(self, sample_rate=16000, model_path=DEFAULT_MODEL_PATH, registry=model_registry, recognizer=None,
+                 grammar=None):
         """
-        Modeli ve tanıyıcıyı (recognizer) başlatır.
+        Paylaşılan modeli alır ve bu bağlantıya özel tanıyıcıyı (recognizer) başlatır.
+        'recognizer' verilirse (örn. tanıyıcı havuzundan alınmış, sıfırlanmış bir örnek) o kullanılır;
+        'grammar' verilirse tanıyıcı kısıtlı kelime dağarcığıyla kurulur.
         """
-        # Model yolu, bu dosyanın konumuna göre belirlenir
-        service_dir = os.path.dirname(os.path.abspath(__file__))
-        model_path = os.path.join(service_dir, "models", "vosk-model-small-tr-0.3")
-        
-        if not os.path.exists(model_path):
-            raise FileNotFoundError(f"Vosk modeli bulunamadı: {model_path}")
-            
-        self.model = Model(model_path)
-        self.recognizer = KaldiRecognizer(self.model, sample_rate)
-        self.recognizer.SetWords(True) # Kısmi sonuçlar için kelimeleri de al
+        self.model = registry.get(model_path)
+        if recognizer is not None:
+            self.recognizer = recognizer
+            return
+        self.recognizer = create_recognizer(self.model, sample_rate, grammar)
         
         print(f"[STTService] Yeni bir tanıyıcı başlatıldı (Rate: {sample_rate}).")
 
-    def transcribe_chunk(self, chunk: bytes):
+    def transcribe_chunk(self, chunk: bytes, partial: bool = True):
         """
         Bir ses 'chunk'ını (parçasını) işler.
         Konuşma devam ediyorsa kısmi sonuç, bittiyse nihai sonuç döner.
+        'partial' False ise (örn. kısmi sonuç zaten gönderilmeyecekse) konuşma devam ederken
+        PartialResult() çağrılmaz ve None döner.
 
         Dönen JSON formatı:
         - {"type": "partial", "text": "boğazım ağrıyor..."}
         - {"type": "final", "text": "boğazım ağrıyor ve başım dönüyor"}
         """
-        if self.recognizer.AcceptWaveform(chunk):
-            # Konuşma durakladı veya bitti -> Nihai sonuç
-            final_result = json.loads(self.recognizer.FinalResult())
-            return {
-                "type": "final",
-                "text": final_result.get("text", "")
-            }
-        else:
-            # Konuşma devam ediyor -> Kısmi sonuç
-            partial_result = json.loads(self.recognizer.PartialResult())
-            return {
-                "type": "partial",
-                "text": partial_result.get("partial", "")
-            }
+        with STT_STAGE_SECONDS.time(stage="accept_waveform"):
+            is_final = self.recognizer.AcceptWaveform(chunk)
+        with STT_STAGE_SECONDS.time(stage="result"):
+            if is_final:
+                # Konuşma durakladı veya bitti -> Nihai sonuç
+                final_result = json.loads(self.recognizer.FinalResult())
+                return {
+                    "type": "final",
+                    "text": _clean_text(final_result.get("text", ""))
+                }
+            elif not partial:
+                return None
+            else:
+                # Konuşma devam ediyor -> Kısmi sonuç
+                partial_result = json.loads(self.recognizer.PartialResult())
+                return {
+                    "type": "partial",
+                    "text": _clean_text(partial_result.get("partial", ""))
+                }
 
     def get_final_result(self):
         """
@@ -60,5 +138,5 @@ class STTService:
         final_result = json.loads(self.recognizer.FinalResult())
         return {
             "type": "final",
-            "text": final_result.get("text", "")
+            "text": _clean_text(final_result.get("text", ""))
         }
@@ -0,0 +1,128 @@
+import numpy as np
+
+# WebSocket üzerinden kabul edilen ses kodlamaları ve örnek başına bayt sayıları
+PCM16 = "pcm16"
+FLOAT32 = "float32"
+MULAW = "mulaw"
+SAMPLE_WIDTHS = {PCM16: 2, FLOAT32: 4, MULAW: 1}
+
+
+class WireEncodingError(ValueError):
+    """
+    Tanımsız ses kodlaması veya kodlamanın geçersiz zamanda değiştirilmesi.
+    """
+
+
+def _build_mulaw_table() -> np.ndarray:
+    # G.711 μ-law çözme tablosu: 256 kod -> PCM16 örnek
+    codes = ~np.arange(256, dtype=np.uint8)
+    exponent = (codes >> 4) & 0x07
+    mantissa = (codes & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(codes & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+MULAW_TABLE = _build_mulaw_table()
+
+
+def resolve_encoding(name) -> str:
+    """
+    İstenen kodlama adını doğrular; boş bırakılırsa PCM16. Tanımsız ad için WireEncodingError.
+    """
+    if name is None or name == "":
+        return PCM16
+    name = str(name).lower()
+    if name not in SAMPLE_WIDTHS:
+        raise WireEncodingError(f"Tanımsız ses kodlaması: '{name}' (tanımlı olanlar: {', '.join(SAMPLE_WIDTHS)})")
+    return name
+
+
+class WireDecoder:
+    """
+    İstemcinin gönderdiği ses parçalarını tanıyıcının beklediği PCM16'ya çevirir.
+
+    - pcm16: parçalar olduğu gibi geçer (ek maliyet yok).
+    - mulaw: G.711 μ-law; 256 elemanlı tablo ile tek 'np.take' çağrısında çözülür (yarı bant genişliği).
+    - float32: Web Audio'nun [-1, 1] aralığındaki küçük-endian örnekleri; istemcide Int16'ya çevirmek gerekmez.
+
+    Çıkış, bağlantıya özel ve yalnızca büyüyen bir tampona yazılır; parça başına yeni dizi
+    ayrılmaz. 'decode' dönüş değerleri tamponun görünümleridir (memoryview) ve bir sonraki
+    'decode' çağrısına kadar geçerlidir; bu yüzden bir çözümleme işindeki tüm parçalar tek
+    çağrıda çözülür. Örnek sınırına denk gelmeyen artık baytlar sonraki parçaya eklenir.
+    """
+    def __init__(self, encoding: str = PCM16):
+        self.encoding = resolve_encoding(encoding)
+        self._out = np.empty(0, dtype=np.int16)
+        self._scratch = np.empty(0, dtype=np.float32)
+        self._remainder = b""
+        self.bytes_in = 0
+        self.samples_out = 0
+
+    @property
+    def sample_width(self) -> int:
+        return SAMPLE_WIDTHS[self.encoding]
+
+    @property
+    def passthrough(self) -> bool:
+        return self.encoding == PCM16
+
+    def set_encoding(self, encoding: str):
+        self.encoding = resolve_encoding(encoding)
+        self._remainder = b""
+
+    def _reserve(self, samples: int):
+        # Tampon yalnızca büyür; kararlı akışta ilk parçalardan sonra bellek ayrılmaz
+        if self._out.shape[0] < samples:
+            size = max(samples, 2 * self._out.shape[0])
+            self._out = np.empty(size, dtype=np.int16)
+            if self.encoding == FLOAT32:
+                self._scratch = np.empty(size, dtype=np.float32)
+        elif self.encoding == FLOAT32 and self._scratch.shape[0] < samples:
+            self._scratch = np.empty(self._out.shape[0], dtype=np.float32)
+
+    def decode(self, chunks: list) -> list:
+        """
+        Parça listesini PCM16'ya çevirir; her giriş parçası için bir çıkış döndürür.
+        """
+        if self.encoding == PCM16:
+            return chunks
+        width = self.sample_width
+        self.bytes_in += sum(len(chunk) for chunk in chunks)
+
+        # Her parçanın (önceki artıkla birlikte) kaç tam örnek içerdiği
+        counts = []
+        remainder = len(self._remainder)
+        for chunk in chunks:
+            total = remainder + len(chunk)
+            counts.append(total // width)
+            remainder = total % width
+        self._reserve(sum(counts))
+
+        outputs = []
+        offset = 0
+        for chunk, count in zip(chunks, counts):
+            if self._remainder:
+                chunk = self._remainder + bytes(chunk)
+            usable = count * width
+            self._remainder = bytes(chunk[usable:]) if usable < len(chunk) else b""
+            out = self._out[offset:offset + count]
+            if self.encoding == MULAW:
+                # 'clip' kipi (uint8 indeksler zaten sınır içinde) numpy'nin ara tampon ayırmasını önler
+                np.take(MULAW_TABLE, np.frombuffer(chunk, dtype=np.uint8, count=count), out=out, mode="clip")
+            else:
+                scratch = self._scratch[:count]
+                np.multiply(np.frombuffer(chunk, dtype="<f4", count=count), 32767.0, out=scratch)
+                np.rint(scratch, out=scratch)
+                np.clip(scratch, -32768.0, 32767.0, out=scratch)
+                np.copyto(out, scratch, casting="unsafe")
+            outputs.append(memoryview(out).cast("B"))
+            offset += count
+        self.samples_out += offset
+        return outputs
+
+    def stats(self) -> dict:
+        return {
+            "encoding": self.encoding,
+            "bytes_in": self.bytes_in,
+            "samples_out": self.samples_out,
+        }
@@ -0,0 +1,173 @@
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def tts_cache_key(text: str, voice: str, sample_rate: int) -> str:
+    """
+    (metin, ses, örnekleme hızı) üçlüsünden içerik adresli önbellek anahtarı üretir.
+    """
+    raw = f"{text}\0{voice}\0{sample_rate}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class TTSCache:
+    """
+    Hazır WAV yanıtları için iki katmanlı, içerik adresli TTS önbelleği.
+
+    - Bellek katmanı: toplam byte sınırı olan LRU (hazır WAV baytları).
+    - Disk katmanı: '<anahtar>.wav' dosyaları; yeniden başlatmalardan sonra da geçerlidir.
+      Toplam boyut 'max_disk_bytes' ile sınırlıdır; aşılınca en uzun süredir kullanılmayan
+      dosyalar silinir. Dosya listesi ilk kullanımda bir kez taranır (değişiklik zamanına
+      göre sıralanır), sonrasında dosya sayısı ve toplam boyut bellekte izlenir.
+
+    İsabetler yeniden kodlanmadan doğrudan tampondan veya dosyadan servis edilir.
+    Disk yazımı işçi thread'lerinden yapıldığı için disk dizini bir kilitle korunur.
+    """
+    def __init__(self, cache_dir=None, max_memory_bytes=64 * 1024 * 1024, max_disk_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # anahtar -> WAV baytları
+        self._memory_bytes = 0
+        self._disk = None  # anahtar -> dosya boyutu (LRU sırasıyla); ilk kullanımda doldurulur
+        self._disk_bytes = 0
+        self._disk_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+    def disk_path(self, key: str):
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def _disk_index(self) -> OrderedDict:
+        # Kilit altında çağrılmalı
+        if self._disk is None:
+            entries = []
+            if self.cache_dir and os.path.isdir(self.cache_dir):
+                for entry in os.scandir(self.cache_dir):
+                    if entry.name.endswith(".wav") and entry.is_file():
+                        info = entry.stat()
+                        entries.append((info.st_mtime, entry.name[:-4], info.st_size))
+            entries.sort()
+            self._disk = OrderedDict((key, size) for _, key, size in entries)
+            self._disk_bytes = sum(size for _, _, size in entries)
+        return self._disk
+
+    def load_index(self) -> int:
+        """
+        Disk katmanının dosya listesini şimdi tarar (açılışta; ilk istek taramayı beklemesin).
+        Diskteki kayıt sayısını döndürür.
+        """
+        if not self.cache_dir:
+            return 0
+        with self._disk_lock:
+            return len(self._disk_index())
+
+    def lookup(self, key: str):
+        """
+        Önbellekte arar. Dönen değer:
+        - ("memory", bytes)  bellek isabeti
+        - ("disk", dosya_yolu)  disk isabeti
+        - (None, None)  ıskalama
+        """
+        wav = self._memory.get(key)
+        if wav is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return "memory", wav
+
+        if self.cache_dir:
+            with self._disk_lock:
+                index = self._disk_index()
+                if key in index:
+                    index.move_to_end(key)
+                    self.disk_hits += 1
+                    return "disk", self.disk_path(key)
+
+        self.misses += 1
+        return None, None
+
+    def contains(self, key: str) -> bool:
+        if key in self._memory:
+            return True
+        if not self.cache_dir:
+            return False
+        with self._disk_lock:
+            return key in self._disk_index()
+
+    def put_memory(self, key: str, wav: bytes):
+        if len(wav) > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = wav
+        self._memory_bytes += len(wav)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def write_disk(self, key: str, wav: bytes):
+        """
+        WAV baytlarını disk katmanına atomik olarak yazar ve boyut sınırını korur
+        (olay döngüsü dışında çağrılmalı).
+        """
+        path = self.disk_path(key)
+        if not path or len(wav) > self.max_disk_bytes:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Aynı anahtarı yazan thread'ler/işçiler ayrı geçici dosya kullanır
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(wav)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        with self._disk_lock:
+            index = self._disk_index()
+            old_size = index.pop(key, None)
+            if old_size is not None:
+                self._disk_bytes -= old_size
+            index[key] = len(wav)
+            self._disk_bytes += len(wav)
+            evicted = []
+            while self._disk_bytes > self.max_disk_bytes:
+                old_key, size = index.popitem(last=False)
+                self._disk_bytes -= size
+                self.disk_evictions += 1
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            try:
+                os.remove(self.disk_path(old_key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        disk_entries = 0
+        disk_bytes = 0
+        if self.cache_dir:
+            with self._disk_lock:
+                disk_entries = len(self._disk_index())
+                disk_bytes = self._disk_bytes
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "max_memory_bytes": self.max_memory_bytes,
+            "disk_entries": disk_entries,
+            "disk_bytes": disk_bytes,
+            "max_disk_bytes": self.max_disk_bytes,
+            "disk_evictions": self.disk_evictions,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,105 @@
+import io
+import re
+import wave
+import struct
+import asyncio
+import binascii
+
+# Cümle sonu: nokta, ünlem, soru işareti veya üç nokta ve ardından boşluk
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+")
+
+# 4'ün katı olmalı: her 4 base64 karakteri 3 byte PCM'e çözülür
+BASE64_BLOCK_CHARS = 32 * 1024
+
+
+def split_sentences(text: str, min_chars: int = 20) -> list:
+    """
+    Metni seslendirme için cümlelere böler.
+    'min_chars'tan kısa parçalar bir sonrakine eklenir; böylece "Anladım." gibi
+    çok kısa cümleler için ayrı TTS çağrısı yapılmaz.
+    """
+    segments = []
+    pending = ""
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        if not sentence:
+            continue
+        pending = f"{pending} {sentence}" if pending else sentence
+        if len(pending) >= min_chars:
+            segments.append(pending)
+            pending = ""
+    if pending:
+        if segments and len(pending) < min_chars:
+            segments[-1] = f"{segments[-1]} {pending}"
+        else:
+            segments.append(pending)
+    return segments
+
+
+def wav_header(sample_rate: int, data_size=None, channels: int = 1, sample_width: int = 2) -> bytes:
+    """
+    44 byte'lık PCM WAV başlığı üretir.
+    'data_size' bilinmiyorsa (akış) boyut alanları 0xFFFFFFFF olarak yazılır;
+    tarayıcılar ve yaygın oynatıcılar bu durumda veriyi akış sonuna kadar okur.
+    """
+    if data_size is None:
+        riff_size = data_len = 0xFFFFFFFF
+    else:
+        riff_size = 36 + data_size
+        data_len = data_size
+    byte_rate = sample_rate * channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", riff_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, byte_rate, channels * sample_width, sample_width * 8,
+        b"data", data_len,
+    )
+
+
+def join_wavs(wavs: list) -> bytes:
+    """
+    Aynı biçimdeki (örnekleme hızı, kanal, örnek genişliği) WAV baytlarını tek WAV'da birleştirir.
+    """
+    frames = []
+    params = None
+    for data in wavs:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            current = (wav.getframerate(), wav.getnchannels(), wav.getsampwidth())
+            if params is not None and current != params:
+                raise ValueError(f"WAV biçimleri farklı: {current} != {params}")
+            params = current
+            frames.append(wav.readframes(wav.getnframes()))
+    pcm = b"".join(frames)
+    sample_rate, channels, sample_width = params
+    return wav_header(sample_rate, len(pcm), channels, sample_width) + pcm
+
+
+def iter_pcm_from_base64(audio_base64: str, block_chars: int = BASE64_BLOCK_CHARS):
+    """
+    Base64 ses verisini bloklar halinde çözüp PCM parçaları üretir.
+    Tüm ses hiçbir zaman tek bir ara tamponda birden fazla kez kopyalanmaz;
+    her blok doğrudan çıkış akışına yazılabilir.
+    """
+    for start in range(0, len(audio_base64), block_chars):
+        yield binascii.a2b_base64(audio_base64[start:start + block_chars])
+
+
+async def iter_segments_in_order(segments: list, synthesize, concurrency: int = 3):
+    """
+    Tüm parçaları en fazla 'concurrency' eşzamanlı çağrıyla sentezler ve
+    sonuçları parçaların orijinal sırasıyla, hazır oldukça üretir.
+    Tüketici erken çıkarsa bekleyen sentezler iptal edilir.
+    """
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(segment):
+        async with slots:
+            return await synthesize(segment)
+
+    tasks = [asyncio.create_task(run(segment)) for segment in segments]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
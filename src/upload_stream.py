@@ -0,0 +1,259 @@
+import re
+import struct
+from urllib.parse import unquote
+
+import numpy as np
+
+# Yaygın WAV biçim kodları
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavFormatError(ValueError):
+    """
+    Yükleme geçerli bir 16-bit PCM WAV değil.
+    """
+
+
+class WavStreamParser:
+    """
+    RIFF/WAVE dosyasını baştan sona tek geçişte, parça parça ayrıştırır.
+
+    'feed' gelen baytları alır ve başlık okunduktan sonra 'data' yığınındaki sesi mono 16-bit
+    PCM olarak döndürür (çok kanallı ses kanalların ortalamasıyla teke indirilir). Dosyanın
+    tamamı bellekte tutulmaz; yalnızca tamamlanmamış başlık/örnek baytları bekletilir.
+    'data' boyutu 0 veya 0xFFFFFFFF ise (akış halinde yazılmış WAV) akış sonuna kadar okunur.
+    """
+    def __init__(self, max_header_bytes: int = 1 << 16):
+        self.max_header_bytes = max_header_bytes
+        self.sample_rate = None
+        self.channels = None
+        self.sample_width = None
+        self.pcm_bytes = 0  # döndürülen mono PCM bayt sayısı
+        self._buffer = bytearray()
+        self._riff_checked = False
+        self._skip = 0
+        self._data_remaining = None  # None: henüz 'data' yığınına gelinmedi
+        self._header_bytes = 0
+        self._done = False
+
+    @property
+    def ready(self) -> bool:
+        """
+        Biçim ('fmt ') okundu ve ses verisi başladı mı.
+        """
+        return self._data_remaining is not None
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.pcm_bytes / 2 / self.sample_rate if self.sample_rate else 0.0
+
+    def _parse_fmt(self, body: bytes):
+        if len(body) < 16:
+            raise WavFormatError("'fmt ' yığını eksik.")
+        audio_format, channels, rate, _, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+        if audio_format == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+            audio_format = struct.unpack("<H", body[24:26])[0]
+        if audio_format != WAVE_FORMAT_PCM or bits != 16:
+            raise WavFormatError(f"Yalnızca 16-bit PCM WAV destekleniyor (biçim {audio_format}, {bits} bit).")
+        if channels < 1 or rate <= 0 or block_align != channels * 2:
+            raise WavFormatError("Geçersiz WAV biçim bilgisi.")
+        self.channels = channels
+        self.sample_rate = rate
+        self.sample_width = 2
+
+    def _read_header(self) -> bool:
+        # Başlık yığınlarını 'data'ya kadar okur; daha fazla bayt gerekiyorsa False döner
+        buffer = self._buffer
+        if not self._riff_checked:
+            if len(buffer) < 12:
+                return False
+            if buffer[:4] != b"RIFF" or buffer[8:12] != b"WAVE":
+                raise WavFormatError("RIFF/WAVE başlığı bulunamadı.")
+            del buffer[:12]
+            self._riff_checked = True
+        while True:
+            if self._skip:
+                skipped = min(self._skip, len(buffer))
+                del buffer[:skipped]
+                self._skip -= skipped
+                if self._skip:
+                    return False
+            if len(buffer) < 8:
+                return False
+            chunk_id = bytes(buffer[:4])
+            size = struct.unpack("<I", buffer[4:8])[0]
+            if chunk_id == b"data":
+                if self.sample_rate is None:
+                    raise WavFormatError("'data' yığını 'fmt ' yığınından önce geldi.")
+                del buffer[:8]
+                self._data_remaining = float("inf") if size in (0, 0xFFFFFFFF) else size
+                return True
+            if chunk_id == b"fmt ":
+                if len(buffer) < 8 + size:
+                    return False
+                self._parse_fmt(bytes(buffer[8:8 + size]))
+                del buffer[:8 + size + (size & 1)]
+                continue
+            # Diğer yığınlar (LIST, fact, ...) atlanır; tek uzunluklu yığınlarda bir dolgu baytı vardır
+            del buffer[:8]
+            self._skip = size + (size & 1)
+
+    def feed(self, data: bytes) -> bytes:
+        """
+        Yeni baytları işler ve hazır olan mono PCM16 sesi döndürür (henüz yoksa b"").
+        """
+        if self._done:
+            return b""
+        self._buffer.extend(data)
+        if not self.ready:
+            self._header_bytes += len(data)
+            if not self._read_header():
+                if self._header_bytes > self.max_header_bytes:
+                    raise WavFormatError("WAV başlığı çok uzun veya 'data' yığını yok.")
+                return b""
+
+        block_align = self.channels * 2
+        available = min(len(self._buffer), self._data_remaining)
+        usable = int(available - available % block_align)
+        if usable <= 0:
+            return b""
+        chunk = bytes(self._buffer[:usable])
+        del self._buffer[:usable]
+        self._data_remaining -= usable
+        if self._data_remaining <= 0:
+            # 'data' yığını bitti; sonraki yığınlar (örn. LIST) yok sayılır
+            self._done = True
+            self._buffer.clear()
+
+        if self.channels > 1:
+            frames = np.frombuffer(chunk, dtype=np.int16).reshape(-1, self.channels)
+            chunk = frames.mean(axis=1).astype(np.int16).tobytes()
+        self.pcm_bytes += len(chunk)
+        return chunk
+
+    def close(self):
+        """
+        Akış bitti: başlık hiç tamamlanmadıysa hata verir.
+        """
+        if not self.ready:
+            raise WavFormatError("Dosya WAV başlığı tamamlanmadan bitti.")
+
+
+class MultipartError(ValueError):
+    """
+    multipart/form-data gövdesi ayrıştırılamadı.
+    """
+
+
+def parse_header_params(value: str) -> tuple:
+    """
+    'multipart/form-data; boundary="abc"' -> ("multipart/form-data", {"boundary": "abc"})
+    """
+    parts = value.split(";")
+    params = {}
+    for item in parts[1:]:
+        if "=" not in item:
+            continue
+        key, _, val = item.strip().partition("=")
+        params[key.strip().lower()] = val.strip().strip('"')
+    return parts[0].strip().lower(), params
+
+
+class MultipartStreamParser:
+    """
+    multipart/form-data gövdesini parça parça ayrıştıran küçük bir akış ayrıştırıcısı.
+
+    'feed' olay listesi döndürür:
+    - ("begin", başlıklar): yeni bölüm; başlık adları küçük harflidir
+    - ("data", bayt): bölümün içeriğinden bir parça
+    - ("end", None): bölüm bitti
+    Sınır (boundary) bir 'feed' çağrısında bölünmüş gelebilir; bu yüzden sınır uzunluğundan
+    kısa bir kuyruk bir sonraki çağrıya bırakılır. Bölüm içeriği bellekte biriktirilmez.
+    """
+    _PREAMBLE, _AFTER_DELIMITER, _HEADERS, _BODY, _DONE = range(5)
+
+    def __init__(self, boundary: str, max_header_bytes: int = 16384):
+        if not boundary:
+            raise MultipartError("multipart sınırı (boundary) belirtilmemiş.")
+        self._delimiter = b"\r\n--" + boundary.encode("latin-1")
+        self.max_header_bytes = max_header_bytes
+        # İlk sınır başında CRLF olmadan gelir; tek bir arama kuralı için başa eklenir
+        self._buffer = bytearray(b"\r\n")
+        self._state = self._PREAMBLE
+
+    @property
+    def done(self) -> bool:
+        return self._state == self._DONE
+
+    def feed(self, data: bytes) -> list:
+        buffer = self._buffer
+        buffer.extend(data)
+        events = []
+        delimiter = self._delimiter
+        while True:
+            state = self._state
+            if state in (self._PREAMBLE, self._BODY):
+                index = buffer.find(delimiter)
+                if index < 0:
+                    # Sınırın başlangıcı olabilecek kuyruk saklanır
+                    safe = max(0, len(buffer) - len(delimiter) + 1)
+                    if state == self._BODY and safe:
+                        events.append(("data", bytes(buffer[:safe])))
+                    del buffer[:safe]
+                    return events
+                if state == self._BODY:
+                    if index:
+                        events.append(("data", bytes(buffer[:index])))
+                    events.append(("end", None))
+                del buffer[:index + len(delimiter)]
+                self._state = self._AFTER_DELIMITER
+            elif state == self._AFTER_DELIMITER:
+                if len(buffer) < 2:
+                    return events
+                if buffer[:2] == b"--":
+                    self._state = self._DONE
+                    buffer.clear()
+                    return events
+                # Sınır satırının sonundaki boşluklar (transport padding) atlanır
+                line_end = buffer.find(b"\r\n")
+                if line_end < 0:
+                    if len(buffer) > 1024:
+                        raise MultipartError("Geçersiz multipart sınır satırı.")
+                    return events
+                if buffer[:line_end].strip(b" \t"):
+                    raise MultipartError("Geçersiz multipart sınır satırı.")
+                del buffer[:line_end + 2]
+                self._state = self._HEADERS
+            elif state == self._HEADERS:
+                index = buffer.find(b"\r\n\r\n")
+                if index < 0:
+                    if len(buffer) > self.max_header_bytes:
+                        raise MultipartError("multipart bölüm başlıkları çok uzun.")
+                    return events
+                headers = {}
+                for line in bytes(buffer[:index]).decode("utf-8", "replace").split("\r\n"):
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                del buffer[:index + 4]
+                events.append(("begin", headers))
+                self._state = self._BODY
+            else:
+                buffer.clear()
+                return events
+
+
+_FILENAME_STAR = re.compile(r"filename\*=(?:UTF-8'')?([^;]+)", re.IGNORECASE)
+
+
+def part_filename(headers: dict):
+    """
+    Bölümün Content-Disposition başlığındaki dosya adını döndürür (yoksa None).
+    """
+    disposition = headers.get("content-disposition", "")
+    match = _FILENAME_STAR.search(disposition)
+    if match:
+        return unquote(match.group(1).strip().strip('"'))
+    _, params = parse_header_params(disposition)
+    return params.get("filename")
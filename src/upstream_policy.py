@@ -0,0 +1,384 @@
+import math
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Yeniden denenebilir HTTP durum kodları (aşırı yük / geçici sunucu hataları)
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class UpstreamUnavailable(httpx.RequestError):
+    """
+    Üst servise istek gönderilmeden vazgeçildi: devre açık, eşzamanlılık sınırında
+    beklerken süre bütçesi doldu vb. httpx.RequestError alt sınıfıdır; mevcut
+    "servise ulaşılamadı" hata yolları onu da yakalar.
+    """
+    def __init__(self, message: str, reason: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class LatencyWindow:
+    """
+    Son 'size' başarılı çağrının süresi; hedge eşiği bunların yüzdeliğinden hesaplanır.
+    """
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=max(1, size))
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float):
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(q / 100.0 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """
+    Art arda 'failure_threshold' hatadan sonra devre açılır ve 'open_s' saniye boyunca
+    istekler üst servise hiç gönderilmeden reddedilir. Süre dolunca tek bir deneme
+    (half-open) isteğine izin verilir: başarılıysa devre kapanır, değilse yeniden açılır.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str = "", failure_threshold: int = 5, open_s: float = 10.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_s = open_s
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probe_started = None
+        self.opens = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """
+        İstek gönderilebilir mi? Açık devrede süre dolduysa deneme isteği için yarı açığa geçer.
+        """
+        if self.state == self.CLOSED:
+            return True
+        now = self.clock()
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.open_s:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+        # Yarı açık: aynı anda tek deneme isteği; sonucu gelmeyen (iptal edilmiş) deneme süre sonunda yenilenir
+        if self._probe_started is not None and now - self._probe_started < self.open_s:
+            self.rejected += 1
+            return False
+        self._probe_started = now
+        return True
+
+    def retry_after(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.open_s - (self.clock() - self.opened_at))
+
+    def release_probe(self):
+        """
+        Deneme isteği hiç gönderilemediyse (örn. eşzamanlılık sınırı) deneme hakkı geri verilir.
+        """
+        self._probe_started = None
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f"Devre kesici kapandı ({self.name}): üst servis yeniden cevap veriyor.")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+            self._probe_started = None
+            self.opens += 1
+            logger.warning(
+                f"Devre kesici açıldı ({self.name}): {self.failures} art arda hata; "
+                f"{self.open_s}s boyunca istekler gönderilmeyecek."
+            )
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opens": self.opens,
+            "rejected": self.rejected,
+            "retry_after_s": round(self.retry_after(), 3),
+        }
+
+
+class UpstreamPolicy:
+    """
+    Gemini çağrılarında uzun kuyruk gecikmesi (tail latency) denetimi; tüm uç noktalar paylaşır.
+
+    - Eşzamanlılık sınırı: aynı anda en fazla 'max_concurrency' istek (hedge istekleri dahil)
+      dışarı çıkar; fazlası, çağrının süre bütçesi içinde sırada bekler.
+    - Süre bütçesi (deadline): uç nokta başına toplam süre ('deadlines'); her denemenin zaman
+      aşımı kalan bütçeyle sınırlanır. Geçici hatalarda (bağlantı/zaman aşımı, 429, 5xx) üstel
+      geri çekilme ve tam rastgele sapma (full jitter) ile yeniden denenir; kalan bütçe bir
+      denemeye yetmiyorsa denenmez.
+    - Hedge: 'hedge_endpoints' içindeki uç noktalarda ilk istek, uç noktanın son çağrılarının
+      p95'ini aşarsa (yeterli örnek yoksa 'hedge_delay_ms') ikinci bir istek gönderilir; ilk
+      başarılı cevap kazanır, diğeri iptal edilir. Sınır doluysa hedge yapılmaz.
+    - Devre kesici: uç nokta başına; açıkken istekler beklemeden UpstreamUnavailable ile reddedilir.
+
+    Semafor olay döngüsüne bağlı olduğundan 'start' ile (istemci açılırken) oluşturulur.
+    """
+    def __init__(self, max_concurrency: int = 16, deadlines=None, default_deadline_s: float = 10.0,
+                 max_attempts: int = 3, backoff_base_ms: float = 100.0, backoff_max_ms: float = 1000.0,
+                 min_attempt_ms: float = 200.0, hedge_endpoints=(), hedge_percentile: float = 95.0,
+                 hedge_min_samples: int = 20, hedge_delay_ms: float = 1000.0, hedge_min_delay_ms: float = 50.0,
+                 latency_window: int = 200, failure_threshold: int = 5, open_s: float = 10.0,
+                 clock=time.monotonic, rng=random.random):
+        self.max_concurrency = max(1, max_concurrency)
+        self.deadlines = dict(deadlines or {})
+        self.default_deadline_s = default_deadline_s
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base_s = backoff_base_ms / 1000.0
+        self.backoff_max_s = backoff_max_ms / 1000.0
+        self.min_attempt_s = min_attempt_ms / 1000.0
+        self.hedge_endpoints = frozenset(hedge_endpoints or ())
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_delay_s = hedge_delay_ms / 1000.0
+        self.hedge_min_delay_s = hedge_min_delay_ms / 1000.0
+        self.latency_window = latency_window
+        self.failure_threshold = failure_threshold
+        self.open_s = open_s
+        self.clock = clock
+        self.rng = rng
+        self.event_hooks = []
+        self._slots = None
+        self._in_flight = 0
+        self._endpoints = {}
+
+    @classmethod
+    def from_settings(cls, section: dict) -> "UpstreamPolicy":
+        """
+        config/settings.yaml içindeki 'gemini.resilience' bölümünden politika oluşturur.
+        """
+        hedge = section.get("hedge") or {}
+        circuit = section.get("circuit") or {}
+        return cls(
+            max_concurrency=section.get("max_concurrency", 16),
+            deadlines=section.get("deadlines"),
+            max_attempts=section.get("max_attempts", 3),
+            backoff_base_ms=section.get("backoff_base_ms", 100.0),
+            backoff_max_ms=section.get("backoff_max_ms", 1000.0),
+            min_attempt_ms=section.get("min_attempt_ms", 200.0),
+            hedge_endpoints=(hedge.get("endpoints") or ()) if hedge.get("enabled", True) else (),
+            hedge_percentile=hedge.get("percentile", 95.0),
+            hedge_min_samples=hedge.get("min_samples", 20),
+            hedge_delay_ms=hedge.get("delay_ms", 1000.0),
+            hedge_min_delay_ms=hedge.get("min_delay_ms", 50.0),
+            failure_threshold=circuit.get("failure_threshold", 5),
+            open_s=circuit.get("open_s", 10.0),
+        )
+
+    def start(self):
+        """
+        Eşzamanlılık sınırını çalışan olay döngüsü için (yeniden) oluşturur.
+        """
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._in_flight = 0
+
+    def stop(self):
+        self._slots = None
+
+    def _endpoint(self, endpoint: str) -> dict:
+        state = self._endpoints.get(endpoint)
+        if state is None:
+            state = self._endpoints[endpoint] = {
+                "breaker": CircuitBreaker(endpoint, self.failure_threshold, self.open_s, self.clock),
+                "latency": LatencyWindow(self.latency_window),
+                "events": {},
+            }
+        return state
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        return self._endpoint(endpoint)["breaker"]
+
+    def _event(self, endpoint: str, event: str):
+        events = self._endpoint(endpoint)["events"]
+        events[event] = events.get(event, 0) + 1
+        for hook in self.event_hooks:
+            try:
+                hook(endpoint, event)
+            except Exception as e:
+                logger.error(f"Upstream olay kancası hatası: {e}")
+
+    def hedge_delay(self, endpoint: str):
+        """
+        Hedge isteğinden önce beklenecek süre; uç noktada hedge kapalıysa None.
+        """
+        if endpoint not in self.hedge_endpoints:
+            return None
+        latency = self._endpoint(endpoint)["latency"]
+        if len(latency) < self.hedge_min_samples:
+            return self.hedge_delay_s
+        return max(self.hedge_min_delay_s, latency.percentile(self.hedge_percentile))
+
+    def _backoff(self, attempt: int) -> float:
+        return self.rng() * min(self.backoff_max_s, self.backoff_base_s * (2 ** (attempt - 1)))
+
+    async def call(self, endpoint: str, send):
+        """
+        'send(zaman aşımı saniyesi)' ile üst servise istek gönderir ve httpx.Response döndürür.
+        Tüm denemeler geçici hatayla biterse son cevap döndürülür (çağıran durum kodunu
+        değerlendirir) veya son hata fırlatılır.
+        """
+        if self._slots is None:
+            self.start()
+        state = self._endpoint(endpoint)
+        breaker = state["breaker"]
+        deadline = self.clock() + self.deadlines.get(endpoint, self.default_deadline_s)
+        last_response = None
+        last_error = None
+
+        for attempt in range(1, self.max_attempts + 1):
+            if not breaker.allow():
+                self._event(endpoint, "circuit_rejected")
+                if last_response is not None:
+                    return last_response
+                raise UpstreamUnavailable(
+                    f"Üst servis ({endpoint}) geçici olarak devre dışı (devre kesici açık).",
+                    "circuit_open", breaker.retry_after()
+                )
+            try:
+                response = await self._attempt(endpoint, send, deadline)
+            except UpstreamUnavailable:
+                # Deneme hiç gönderilmedi; devre kesicinin deneme hakkı boşa düşmesin
+                breaker.release_probe()
+                if last_response is not None:
+                    return last_response
+                raise
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                last_error, last_response = e, None
+            else:
+                if response.status_code not in RETRYABLE_STATUS:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                last_error, last_response = None, response
+
+            if attempt == self.max_attempts:
+                break
+            delay = self._backoff(attempt)
+            if last_response is not None:
+                # Sunucunun istediği bekleme (Retry-After) bütçeye sığıyorsa ona uyulur
+                try:
+                    delay = max(delay, float(last_response.headers.get("retry-after", 0)))
+                except ValueError:
+                    pass
+            if deadline - self.clock() - delay < self.min_attempt_s:
+                self._event(endpoint, "deadline_exhausted")
+                break
+            self._event(endpoint, "retry")
+            await asyncio.sleep(delay)
+
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    async def _attempt(self, endpoint: str, send, deadline: float):
+        remaining = deadline - self.clock()
+        if remaining <= 0:
+            raise UpstreamUnavailable(f"Üst servis ({endpoint}) için süre bütçesi doldu.", "deadline")
+        slots = self._slots
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=remaining)
+        except asyncio.TimeoutError:
+            self._event(endpoint, "limiter_timeout")
+            raise UpstreamUnavailable(
+                f"Üst servis ({endpoint}) eşzamanlılık sınırında ({self.max_concurrency}) süre bütçesi doldu.",
+                "limiter"
+            )
+
+        primary = asyncio.ensure_future(self._send(endpoint, send, deadline, slots))
+        tasks = [primary]
+        try:
+            delay = self.hedge_delay(endpoint)
+            if delay is not None and delay < deadline - self.clock():
+                await asyncio.wait(tasks, timeout=delay)
+                if not primary.done() and not slots.locked():
+                    await slots.acquire()
+                    self._event(endpoint, "hedge")
+                    tasks.append(asyncio.ensure_future(self._send(endpoint, send, deadline, slots)))
+
+            # İlk başarılı cevap döner; biri hata verirse (veya geçici hata koduyla dönerse) diğeri beklenir
+            pending = set(tasks)
+            error = None
+            retryable_response = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    response = task.result()
+                    if response.status_code in RETRYABLE_STATUS:
+                        retryable_response = response
+                        continue
+                    if task is not primary:
+                        self._event(endpoint, "hedge_won")
+                    return response
+            if retryable_response is not None:
+                return retryable_response
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _send(self, endpoint: str, send, deadline: float, slots: asyncio.Semaphore):
+        # Semafor yeri çağıran tarafından alınmıştır; burada bırakılır
+        self._in_flight += 1
+        try:
+            started = self.clock()
+            response = await send(max(0.001, deadline - started))
+            if response.status_code not in RETRYABLE_STATUS:
+                self._endpoint(endpoint)["latency"].add(self.clock() - started)
+            return response
+        finally:
+            self._in_flight -= 1
+            slots.release()
+
+    def stats(self) -> dict:
+        endpoints = {}
+        for name, state in self._endpoints.items():
+            latency = state["latency"]
+            hedge_delay = self.hedge_delay(name)
+            p95 = latency.percentile(95)
+            endpoints[name] = {
+                "deadline_s": self.deadlines.get(name, self.default_deadline_s),
+                "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+                "hedge_delay_ms": round(hedge_delay * 1000, 2) if hedge_delay is not None else None,
+                "circuit": state["breaker"].stats(),
+                "events": dict(state["events"]),
+            }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "max_attempts": self.max_attempts,
+            "endpoints": endpoints,
+        }
@@ -0,0 +1,183 @@
+import json
+import time
+import base64
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from src.stt_module import model_registry as model_registry_module
+from src.stt_module import stt_service as stt_service_module
+
+
+class FakeModel:
+    """
+    Gerçek Vosk modeli yerine geçen hafif nesne.
+    Kaç kez yüklendiğini saymak için sınıf düzeyinde sayaç tutar.
+    """
+    instances = 0
+
+    def __init__(self, model_path):
+        FakeModel.instances += 1
+        self.model_path = model_path
+
+
+class FakeRecognizer:
+    """
+    KaldiRecognizer taklidi: gelen byte sayısını biriktirir,
+    'final_after' byte'a ulaşınca nihai sonuç üretir.
+    """
+    final_after = 8000
+
+    def __init__(self, model, sample_rate, grammar=None):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.grammar = json.loads(grammar) if grammar is not None else None
+        self.received = 0
+        self.chunks = 0
+
+    def SetWords(self, enabled):
+        self.words = enabled
+
+    def AcceptWaveform(self, data):
+        self.received += len(data)
+        self.chunks += 1
+        return self.received >= self.final_after
+
+    def PartialResult(self):
+        return json.dumps({"partial": " ".join(["kelime"] * self.chunks)})
+
+    def Result(self):
+        return self.FinalResult()
+
+    def FinalResult(self):
+        text = " ".join(["kelime"] * self.chunks)
+        self.Reset()
+        return json.dumps({"text": text})
+
+    def Reset(self):
+        self.received = 0
+        self.chunks = 0
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(monkeypatch):
+    """
+    Her test boş, diske yazmayan önbelleklerle ve boş bir tanıyıcı havuzuyla çalışır. Yerel hızlı yönlendirici kapalıdır;
+    böylece LLM yolunu ölçen testler tablodaki şikayetlerden etkilenmez.
+    """
+    from src import main
+    from src.intent_cache import IntentCache
+    from src.tts_cache import TTSCache
+    from src.stt_module.recognizer_pool import RecognizerPool
+
+    monkeypatch.setattr(main, "intent_cache", IntentCache(main.ClinicIntentResponse))
+    monkeypatch.setattr(main, "recognizer_pool", RecognizerPool(
+        max_per_key=8, acquire_timeout=1.0, grammars=main.STT_GRAMMARS
+    ))
+    monkeypatch.setattr(main, "tts_cache", TTSCache())
+    monkeypatch.setitem(main.TTS_CACHE_SETTINGS, "warmup", False)
+    monkeypatch.setattr(main, "intent_router", None)
+
+
+@pytest.fixture
+def fake_vosk(monkeypatch):
+    """
+    Vosk Model/KaldiRecognizer sınıflarını sahteleriyle değiştirir ve
+    paylaşılan model kaydını test boyunca temiz tutar.
+    """
+    FakeModel.instances = 0
+    monkeypatch.setattr(model_registry_module, "Model", FakeModel)
+    monkeypatch.setattr(stt_service_module, "KaldiRecognizer", FakeRecognizer)
+    model_registry_module.model_registry.clear()
+    yield FakeModel
+    model_registry_module.model_registry.clear()
+
+
+class FakeGeminiServer:
+    """
+    Ağ erişimi olmadan Gemini LLM/TTS uç noktalarını taklit eden yerel HTTP/1.1 sunucusu.
+    Açılan TCP bağlantılarını sayar; böylece istemcinin bağlantı yeniden kullanımı ölçülebilir.
+    'faults' kuyruğuna eklenen (gecikme saniyesi, durum kodu) çiftleri sıradaki isteklere
+    uygulanır; kuyruk boşken 'delay' kadar beklenip 200 döner.
+    """
+    def __init__(self):
+        self.intent = {"poliklinik": "KBB", "aciliyet": "normal", "sebep_ozeti": "Boğaz ağrısı"}
+        self.sample_rate = 24000
+        self.connections = 0
+        self.requests = []
+        self.faults = deque()
+        self.delay = 0.0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                server.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                server.requests.append((self.path, body))
+                try:
+                    delay, status = server.faults.popleft()
+                except IndexError:
+                    delay, status = server.delay, 200
+                if delay:
+                    time.sleep(delay)
+                if status != 200:
+                    error = json.dumps({"error": {"code": status, "message": "sahte hata"}}).encode("utf-8")
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(error)))
+                    self.end_headers()
+                    self.wfile.write(error)
+                    return
+                text = body["contents"][0]["parts"][0]["text"]
+                if "tts" in self.path:
+                    # Metin uzunluğuyla orantılı, deterministik sahte PCM
+                    pcm = text.encode("utf-8") * 10
+                    part = {"inlineData": {
+                        "mimeType": f"audio/L16;rate={server.sample_rate}",
+                        "data": base64.b64encode(pcm).decode("ascii"),
+                    }}
+                elif body["generationConfig"]["responseSchema"].get("type") == "array":
+                    # Toplu istek: giriş dizisindeki her metin için bir sonuç
+                    intents = [server.intent] * len(json.loads(text))
+                    part = {"text": json.dumps(intents, ensure_ascii=False)}
+                else:
+                    part = {"text": json.dumps(server.intent, ensure_ascii=False)}
+                payload = json.dumps({"candidates": [{"content": {"parts": [part]}}]}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """
+    Yerel sahte Gemini sunucusunu başlatır ve uygulamanın paylaşılan HTTP istemcisini ona yönlendirir.
+    """
+    from src import main
+    from src.http_client import UpstreamHTTPClient
+
+    server = FakeGeminiServer()
+    monkeypatch.setattr(main, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(main, "gemini_client", UpstreamHTTPClient(base_url=server.url, http2=False))
+    yield server
+    server.close()
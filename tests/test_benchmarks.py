@@ -0,0 +1,68 @@
+import time
+import wave
+
+import httpx
+
+from benchmarks.bench_grammar import run as run_grammar_bench, word_error_rate
+from benchmarks.load_test import summarize_latencies
+from benchmarks.stand_in_gemini import StandInGemini
+from src.settings import load_settings, write_isolated_settings
+
+
+def test_summarize_latencies_reports_percentiles():
+    summary = summarize_latencies(list(range(1, 101)))
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == 50.5
+    assert summary["p99_ms"] == 99.01
+    assert summarize_latencies([]) == {"count": 0}
+
+
+def test_stand_in_gemini_injects_latency_and_errors():
+    server = StandInGemini(latency_ms=50, error_rate=1.0, seed=0).start()
+    try:
+        body = {"contents": [{"parts": [{"text": "dişim ağrıyor"}]}]}
+        started = time.perf_counter()
+        response = httpx.post(f"{server.url}/v1beta/models/x:generateContent", json=body)
+        assert time.perf_counter() - started >= 0.05
+        assert response.status_code == 503
+
+        server.error_rate = 0.0
+        response = httpx.post(f"{server.url}/v1beta/models/x-tts:generateContent", json=body)
+        part = response.json()["candidates"][0]["content"]["parts"][0]
+        assert part["inlineData"]["mimeType"] == "audio/L16;rate=24000"
+        assert server.requests == 2 and server.errors == 1
+    finally:
+        server.close()
+
+
+def test_word_error_rate():
+    assert word_error_rate("boğazım ağrıyor", "Boğazım ağrıyor!") == 0.0
+    assert word_error_rate("başım çok ağrıyor", "başım ağrıyor") == 1 / 3
+    assert word_error_rate("evet", "hayır evet") == 1.0
+    assert word_error_rate("", "") == 0.0
+
+
+def test_grammar_bench_compares_modes(fake_vosk, tmp_path):
+    with wave.open(str(tmp_path / "ornek.wav"), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(b"\x00" * 32000)
+
+    from src.main import STT_MODEL_PATH
+    report = run_grammar_bench(str(tmp_path), STT_MODEL_PATH, {"yes_no": ("evet", "hayır", "[unk]")})
+    assert set(report["summary"]) == {"full", "yes_no"}
+    assert report["wer_reference"] == "full"
+    assert report["summary"]["full"]["mean_wer"] == 0.0
+    assert report["summary"]["yes_no"]["audio_seconds"] == 1.0
+    assert all(row["rtf"] is not None for row in report["files"])
+
+
+def test_isolated_settings_keep_caches_out_of_the_repo(tmp_path):
+    settings = load_settings(write_isolated_settings(str(tmp_path), {"stt": {"decode_workers": 2}}))
+    assert settings["intent_cache"]["snapshot_path"] is None
+    assert settings["tts_cache"]["cache_dir"] == str(tmp_path / "tts")
+    assert settings["tts_cache"]["warmup"] is False
+    # Diğer ayarlar korunur, verilen değerler bölüm içinde birleştirilir
+    assert settings["stt"]["decode_workers"] == 2
+    assert settings["stt"]["model_path"] == load_settings()["stt"]["model_path"]
@@ -0,0 +1,68 @@
+import time
+import asyncio
+import pytest
+
+from src.stt_module.decode_pool import DecodePool, DecodeQueueFull
+
+
+def test_stream_preserves_chunk_order():
+    async def scenario():
+        pool = DecodePool(max_workers=4)
+        pool.start()
+        seen = []
+
+        def decode(i):
+            # İlk parçalar daha uzun sürse bile sıra korunmalı
+            time.sleep(0.01 * (5 - i))
+            seen.append(i)
+            return i
+
+        stream = pool.stream()
+        results = await asyncio.gather(*(stream.submit(decode, i) for i in range(5)))
+        pool.shutdown()
+        return seen, results
+
+    seen, results = asyncio.run(scenario())
+    assert seen == [0, 1, 2, 3, 4]
+    assert results == [0, 1, 2, 3, 4]
+
+
+def test_decoding_does_not_block_event_loop():
+    async def scenario():
+        pool = DecodePool(max_workers=2)
+        pool.start()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await pool.run(time.sleep, 0.2)
+        task.cancel()
+        pool.shutdown()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 5
+
+
+def test_queue_full_is_rejected():
+    async def scenario():
+        pool = DecodePool(max_workers=1, max_queue=1, queue_timeout=0.05)
+        pool.start()
+        blocker = asyncio.create_task(pool.run(time.sleep, 0.3))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(DecodeQueueFull):
+                await pool.run(time.sleep, 0)
+        finally:
+            await blocker
+            pool.shutdown()
+        return pool.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 1
+    assert stats["queue_depth"] == 0
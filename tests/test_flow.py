@@ -3,6 +3,10 @@ import json
 import os
 import subprocess
 
+# Proje kökünden modül olarak çalıştırın ('src' paketi böylece bulunur): python -m tests.test_flow
+from src.replies import build_reply_text, build_reason_text
+from src.tts_stream import join_wavs
+
 SERVER_URL = "http://127.0.0.1:8000"
 INPUT_AUDIO_FILE = "data/samples/test_fixed3.wav" 
 OUTPUT_AUDIO_FILE = "response.wav"
@@ -35,14 +39,15 @@ def run_full_flow():
 
     try:
         poliklinik = intent_json.get('poliklinik')
-        sebep = intent_json.get('sebep_ozeti')
 
-        if not poliklinik or poliklinik.lower() == "belirsiz":
-            response_text = "Üzgünüm, şikayetinizi tam olarak anlayamadım. Lütfen daha detaylı anlatır mısınız?"
-        else:
-            response_text = f"Anladım. '{sebep}' şikayetiniz için sizi {poliklinik} polikliniğine yönlendiriyorum."
+        # Sunucuyla aynı sabit cümleler: TTS önbelleğinde önceden seslendirilmiş olarak bulunur.
+        # Şikayet özeti ayrı, önbelleksiz ikinci cümle olarak seslendirilir.
+        reply_texts = [build_reply_text(poliklinik)]
+        reason_text = build_reason_text(poliklinik, intent_json.get('sebep_ozeti'))
+        if reason_text:
+            reply_texts.append(reason_text)
         
-        print(f"\n[Adım 2 Tamamlandı] Oluşturulan Cevap Cümlesi:\n'{response_text}'")
+        print(f"\n[Adım 2 Tamamlandı] Oluşturulan Cevap Cümleleri:\n{reply_texts}")
 
     except Exception as e:
         print(f"HATA: JSON işlenirken hata oluştu: {e}")
@@ -50,12 +55,15 @@ def run_full_flow():
 
     print("\n[Adım 3 Başlıyor] Cevap cümlesi seslendiriliyor...")
     try:
-        payload = {"text": response_text, "voice": "Kore"} # 'Kore' (varsayılan) veya 'Puck'
-        response = requests.post(f"{SERVER_URL}/synthesize", json=payload, timeout=30)
-        response.raise_for_status()
+        wavs = []
+        for text in reply_texts:
+            payload = {"text": text, "voice": "Kore"} # 'Kore' (varsayılan) veya 'Puck'
+            response = requests.post(f"{SERVER_URL}/synthesize", json=payload, timeout=30)
+            response.raise_for_status()
+            wavs.append(response.content)
 
         with open(OUTPUT_AUDIO_FILE, 'wb') as f:
-            f.write(response.content)
+            f.write(join_wavs(wavs))
         
         print(f"\nBAŞARILI: Cevap sesi '{OUTPUT_AUDIO_FILE}' olarak kaydedildi.")
         
@@ -0,0 +1,69 @@
+import asyncio
+import httpx
+import pytest
+
+from src import main
+from src.http_client import UpstreamHTTPClient
+
+
+def test_intent_calls_reuse_one_connection(fake_gemini):
+    seen = []
+
+    async def scenario():
+        main.gemini_client.stats_hooks.append(seen.append)
+        results = [await main.fetch_llm_intent("boğazım ağrıyor") for _ in range(3)]
+        await main.gemini_client.aclose()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert [r.poliklinik for r in results] == ["KBB"] * 3
+    assert fake_gemini.connections == 1
+    assert [s["connection_reused"] for s in seen] == [False, True, True]
+    stats = main.gemini_client.stats()["endpoints"]["intent"]
+    assert stats["requests"] == 3
+    assert stats["reused_connections"] == 2
+    # API anahtarı sorgu parametresi olarak gönderilmeli
+    assert fake_gemini.requests[0][0].endswith("key=test-key")
+
+
+def test_intent_and_tts_share_pool(fake_gemini):
+    from fastapi.testclient import TestClient
+
+    with TestClient(main.app) as client:
+        assert client.post("/api/get_intent", json={"text": "boğazım ağrıyor"}).status_code == 200
+        response = client.post("/api/synthesize", json={"text": "Merhaba"})
+        assert response.status_code == 200
+        assert response.content[:4] == b"RIFF"
+        stats = client.get("/api/upstream/stats").json()
+
+    assert fake_gemini.connections == 1
+    assert stats["endpoints"]["tts"]["reused_connections"] == 1
+
+
+def test_per_endpoint_timeouts():
+    client = UpstreamHTTPClient(timeouts={"intent": 12.0}, connect_timeout=3.0)
+    assert client.timeout_for("intent").read == 12.0
+    assert client.timeout_for("tts").read == 20.0
+    assert client.timeout_for("tts").connect == 3.0
+
+
+def test_failed_requests_are_recorded():
+    # Kapalı bir porta bağlanma hatası: istek başarısız olsa da istatistiklere ve kancalara yansımalı
+    client = UpstreamHTTPClient(base_url="http://127.0.0.1:9", http2=False, connect_timeout=0.5)
+    seen = []
+    client.stats_hooks.append(seen.append)
+
+    async def scenario():
+        try:
+            await client.post("intent", "/v1beta/models/x:generateContent", json={})
+        finally:
+            await client.aclose()
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(scenario())
+
+    stats = client.stats()["endpoints"]["intent"]
+    assert (stats["requests"], stats["errors"], stats["new_connections"]) == (1, 1, 0)
+    assert seen[0]["error"] == "ConnectError"
+    assert seen[0]["status_code"] is None
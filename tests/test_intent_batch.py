@@ -0,0 +1,88 @@
+import json
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from src import main
+from src.intent_batcher import MicroBatcher
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    batches = []
+
+    async def process(items):
+        batches.append(list(items))
+        return [item.upper() for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(process, max_batch_size=3, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(text) for text in ["a", "b", "c", "d"]))
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == ["A", "B", "C", "D"]
+    # İlk üçü boyut sınırıyla hemen, sonuncusu bekleme süresi dolunca gönderildi
+    assert batches == [["a", "b", "c"], ["d"]]
+    assert stats["batches"] == 2
+    assert stats["batch_size_counts"] == {"1": 1, "3": 1}
+
+
+def test_micro_batcher_delivers_per_item_and_batch_errors():
+    async def process(items):
+        if "hepsi" in items:
+            raise RuntimeError("toplu hata")
+        return [ValueError(item) if item == "kötü" else item for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=5)
+        first = await asyncio.gather(batcher.submit("iyi"), batcher.submit("kötü"), return_exceptions=True)
+        second = await asyncio.gather(batcher.submit("hepsi"), batcher.submit("iyi"), return_exceptions=True)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first[0] == "iyi"
+    assert isinstance(first[1], ValueError)
+    assert all(isinstance(result, RuntimeError) for result in second)
+
+
+def test_concurrent_get_intent_calls_share_one_llm_request(fake_gemini):
+    async def scenario():
+        try:
+            return await asyncio.gather(*(
+                main.get_intent(text) for text in ["boğazım ağrıyor", "kulağım çınlıyor", "sesim kısıldı"]
+            ))
+        finally:
+            await main.gemini_client.aclose()
+
+    results = asyncio.run(scenario())
+    assert [result.poliklinik for result in results] == ["KBB"] * 3
+    assert len(fake_gemini.requests) == 1
+    _, body = fake_gemini.requests[0]
+    assert json.loads(body["contents"][0]["parts"][0]["text"]) == ["boğazım ağrıyor", "kulağım çınlıyor", "sesim kısıldı"]
+    assert body["generationConfig"]["responseSchema"]["type"] == "array"
+
+
+def test_batch_endpoint_deduplicates_and_keeps_order(fake_gemini, monkeypatch):
+    monkeypatch.setitem(main.INTENT_BATCH_SETTINGS, "max_batch_size", 2)
+    main.intent_cache.put("dişim ağrıyor", main.ClinicIntentResponse(
+        poliklinik="Diş", aciliyet="normal", sebep_ozeti="Diş ağrısı"
+    ))
+    texts = ["Boğazım ağrıyor.", "dişim ağrıyor", "", "boğazım ağrıyor", "başım dönüyor", "kulağım ağrıyor"]
+
+    with TestClient(main.app) as client:
+        response = client.post("/api/get_intent/batch", json={"texts": texts})
+        assert response.status_code == 200
+        results = response.json()["results"]
+
+        assert [item["text"] for item in results] == texts
+        assert [item["source"] for item in results] == ["llm", "cache", None, "llm", "llm", "llm"]
+        assert results[2]["error"] == "Metin boş olamaz."
+        assert results[0]["result"]["poliklinik"] == "KBB"
+
+        assert client.post("/api/get_intent/batch", json={"texts": []}).status_code == 400
+
+    # 3 farklı şikayet, en fazla 2'lik gruplar: 2 LLM çağrısı
+    sizes = sorted(len(json.loads(body["contents"][0]["parts"][0]["text"]))
+                   if body["generationConfig"]["responseSchema"].get("type") == "array" else 1
+                   for _, body in fake_gemini.requests)
+    assert sizes == [1, 2]
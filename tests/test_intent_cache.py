@@ -0,0 +1,67 @@
+import asyncio
+
+from src import main
+from src.intent_cache import IntentCache, normalize_transcript, turkish_lower
+from src.main import ClinicIntentResponse
+
+
+def make_intent(poliklinik="KBB"):
+    return ClinicIntentResponse(poliklinik=poliklinik, aciliyet="normal", sebep_ozeti="Boğaz ağrısı")
+
+
+def test_normalize_transcript_turkish_rules():
+    assert turkish_lower("IĞDIR İZMİR") == "ığdır izmir"
+    assert normalize_transcript("Şey... Boğazım   AĞRIYOR!") == "boğazım ağrıyor"
+    assert normalize_transcript("eee yani başım, dönüyor hmmm") == "başım dönüyor"
+    assert normalize_transcript("?!") == ""
+
+
+def test_lru_eviction_and_counters():
+    cache = IntentCache(ClinicIntentResponse, max_size=2)
+    cache.put("boğazım ağrıyor", make_intent("KBB"))
+    cache.put("dişim ağrıyor", make_intent("Diş"))
+    assert cache.get("Boğazım ağrıyor.").poliklinik == "KBB"
+    cache.put("başım dönüyor", make_intent("Nöroloji"))
+
+    # En az kullanılan ("dişim ağrıyor") çıkarılmış olmalı
+    assert cache.get("dişim ağrıyor") is None
+    assert cache.get("boğazım ağrıyor") is not None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 1, 1, 2)
+
+
+def test_ttl_expiry():
+    now = [1000.0]
+    cache = IntentCache(ClinicIntentResponse, ttl_s=10, clock=lambda: now[0])
+    cache.put("boğazım ağrıyor", make_intent())
+    now[0] += 11
+    assert cache.get("boğazım ağrıyor") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / "intent_cache.json"
+    cache = IntentCache(ClinicIntentResponse, snapshot_path=str(path))
+    cache.put("boğazım ağrıyor", make_intent())
+    cache.save_snapshot()
+
+    warm = IntentCache(ClinicIntentResponse, snapshot_path=str(path))
+    assert warm.load_snapshot() == 1
+    restored = warm.get("BOĞAZIM AĞRIYOR")
+    assert isinstance(restored, ClinicIntentResponse)
+    assert restored.poliklinik == "KBB"
+    # Geçici dosya geride kalmaz
+    assert [p.name for p in tmp_path.iterdir()] == ["intent_cache.json"]
+
+
+def test_get_intent_calls_llm_once(fake_gemini):
+    async def scenario():
+        first = await main.get_intent("Boğazım ağrıyor.")
+        second = await main.get_intent("şey boğazım ağrıyor")
+        await main.gemini_client.aclose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first is second
+    assert len(fake_gemini.requests) == 1
+    assert main.intent_cache.stats()["hits"] == 1
@@ -0,0 +1,87 @@
+from fastapi.testclient import TestClient
+
+from src import main
+from src.settings import get_section
+from src.intent_router import AhoCorasick, FastIntentRouter
+
+RULES = [
+    {"poliklinik": "Diş", "aciliyet": "normal", "sebep_ozeti": "Diş ağrısı", "phrases": ["diş"]},
+    {"poliklinik": "Kardiyoloji", "aciliyet": "acil", "sebep_ozeti": "Göğüs ağrısı",
+     "phrases": ["göğsümde ağrı", "göğüs ağrı"]},
+    {"poliklinik": "Kardiyoloji", "aciliyet": "normal", "sebep_ozeti": "Kalp şikayeti", "phrases": ["çarpıntı"]},
+    {"poliklinik": "Göz", "aciliyet": "normal", "sebep_ozeti": "Göz şikayeti", "phrases": ["gözler"]},
+    {"poliklinik": "Dermatoloji", "aciliyet": "normal", "sebep_ozeti": "Cilt şikayeti", "phrases": ["kaşın"]},
+]
+
+
+def make_router(**kwargs):
+    return FastIntentRouter(RULES, main.ClinicIntentResponse, ambiguous_words=["yok", "değil"], **kwargs)
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    automaton = AhoCorasick(["he", "she", "hers", "his"])
+    found = sorted((start, automaton.patterns[index]) for start, _, index in automaton.finditer("ushers"))
+    assert found == [(1, "she"), (2, "he"), (2, "hers")]
+
+
+def test_router_answers_clear_complaints_and_matches_stems():
+    router = make_router()
+    assert router.route("Dişim çok ağrıyor!").poliklinik == "Diş"
+
+    result = router.route("göğsümde ağrı var ve çarpıntı oluyor")
+    assert result.poliklinik == "Kardiyoloji"
+    assert result.aciliyet == "acil"  # aynı poliklinikte en yüksek aciliyet
+
+    # Kökler yalnızca kelime başında eşleşir
+    assert router.route("kardiş geldi") is None
+
+
+def test_router_falls_back_when_unsure():
+    router = make_router(max_words=6)
+    assert router.route("gözlerim kaşınıyor") is None              # iki poliklinik eşit puanda
+    assert router.route("dişim ağrımıyor ağrı yok") is None        # olumsuzluk
+    assert router.route("merhaba nasılsınız") is None              # eşleşme yok
+    assert router.route("dişim dün akşamdan beri çok fena şekilde ağrıyor") is None  # uzun anlatım
+
+    stats = router.stats()
+    assert stats["routed"] == 0
+    assert stats["fallbacks"] == {"no_match": 1, "ambiguous": 1, "negation": 1, "too_long": 1, "red_flag": 0}
+
+
+def test_configured_table_covers_common_complaints():
+    router = FastIntentRouter.from_settings(get_section("fast_router"), main.ClinicIntentResponse)
+    assert router.route("dişim ağrıyor").poliklinik == "Diş"
+    assert router.route("göğsümde ağrı var").aciliyet == "acil"
+    assert router.route("boğazım ağrıyor").poliklinik == "KBB"
+    assert router.route("başım dönüyor ve midem bulanıyor") is None
+
+
+def test_urgent_phrasings_are_never_fast_pathed_as_normal():
+    router = FastIntentRouter.from_settings(get_section("fast_router"), main.ClinicIntentResponse)
+    for text in ["kalbim sıkışıyor", "kalbim çok ağrıyor", "kalbim", "görme kaybı oldu aniden",
+                 "gözüm görmüyor", "birden gözlerim karardı", "çarpıntı aniden başladı şiddetli",
+                 "dişim kanıyor durmuyor"]:
+        result = router.route(text)
+        assert result is None or result.aciliyet == "acil", text
+    assert router.route("görme kaybı oldu aniden").poliklinik == "Göz"
+    assert router.fallbacks["red_flag"] >= 2
+
+    # Alarm kelimesi acil kuralı engellemez; normal kurallar sakin metinlerde çalışmaya devam eder
+    assert router.route("göğsüm sıkışıyor").aciliyet == "acil"
+    assert router.route("gözüm sulanıyor").aciliyet == "normal"
+
+
+def test_get_intent_uses_fast_path_before_llm(fake_gemini, monkeypatch):
+    monkeypatch.setattr(main, "intent_router", make_router())
+
+    with TestClient(main.app) as client:
+        response = client.post("/api/get_intent", json={"text": "dişim ağrıyor"})
+        assert response.json()["poliklinik"] == "Diş"
+        response = client.post("/api/get_intent", json={"text": "boğazım ağrıyor"})
+        assert response.json()["poliklinik"] == "KBB"  # sahte LLM cevabı
+
+        stats = client.get("/api/intent/router").json()
+        assert stats["routed"] == 1
+        assert stats["fallbacks"]["no_match"] == 1
+
+    assert len(fake_gemini.requests) == 1
@@ -0,0 +1,103 @@
+import io
+import sys
+import json
+import queue
+import logging
+from contextlib import redirect_stderr
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.settings import get_section
+from utils import logger as log_module
+from utils.logger import (
+    JsonFormatter, SamplingFilter, NonBlockingQueueHandler, StderrHandler, log_context, setup_logging, logging_stats
+)
+
+
+@pytest.fixture
+def restore_logging():
+    # Yakalama bittikten sonra çalışır; uygulamanın loglama kurulumu geri yüklenir
+    yield
+    setup_logging(get_section("logging"))
+
+
+def make_record(msg="mesaj", *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("src.main", logging.INFO, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_queue_handler_captures_context_and_drops_when_full():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    with log_context(request_id="istek-1", session_id="oturum-1"):
+        handler.handle(make_record("'%s' alındı", "boğazım ağrıyor"))
+        handler.handle(make_record("ikinci"))
+
+    record = handler.queue.get_nowait()
+    assert record.msg == "'boğazım ağrıyor' alındı" and record.args is None
+    assert (record.request_id, record.session_id) == ("istek-1", "oturum-1")
+    assert handler.dropped == 1
+
+
+def test_json_formatter_writes_ids_extras_and_exception():
+    try:
+        raise ValueError("bozuk")
+    except ValueError:
+        record = logging.LogRecord("src.main", logging.ERROR, __file__, 1, "hata", None, sys.exc_info())
+    record.request_id = "istek-1"
+    record.session_id = None
+    record.poliklinik = "KBB"
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["level"] == "ERROR" and entry["msg"] == "hata"
+    assert entry["request_id"] == "istek-1" and "session_id" not in entry
+    assert entry["poliklinik"] == "KBB"
+    assert "ValueError: bozuk" in entry["exc"]
+
+
+def test_sampling_filter_passes_every_nth_marked_record():
+    sampler = SamplingFilter({"partial": 3})
+    passed = [sampler.filter(make_record(sample="partial")) for _ in range(7)]
+    assert passed == [True, False, False, True, False, False, True]
+    assert sampler.sampled_out == {"partial": 4}
+    # İşaretsiz kayıtlar örneklenmez
+    assert all(sampler.filter(make_record()) for _ in range(5))
+
+
+def test_setup_logging_writes_json_off_thread_with_subsystem_levels(restore_logging, capsys):
+    setup_logging({"sampling": {"partial": 2}, "levels": {"test.gurultulu": "WARNING"}})
+    with log_context(session_id="oturum-9"):
+        for index in range(4):
+            logging.getLogger("test.stt").info("kısmi %d", index, extra={"sample": "partial"})
+        logging.getLogger("test.gurultulu").info("yazılmamalı")
+    stats = logging_stats()
+    log_module.shutdown_logging()
+
+    lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    assert [line["msg"] for line in lines] == ["kısmi 0", "kısmi 2"]
+    assert all(line["session_id"] == "oturum-9" and line["sample_rate"] == 2 for line in lines)
+    assert stats["sampled_out"] == {"partial": 2}
+
+
+def test_stderr_handler_follows_current_stderr():
+    handler = StderrHandler()
+    # Kurulum anındaki akış değişse (ve kapansa) bile o anki 'sys.stderr'a yazılır
+    for text in ("birinci", "ikinci"):
+        replaced = io.StringIO()
+        with redirect_stderr(replaced):
+            handler.emit(make_record(text))
+        assert replaced.getvalue() == f"{text}\n"
+        replaced.close()
+    assert handler.stream is sys.stderr
+
+
+def test_request_id_header_is_echoed_or_generated():
+    with TestClient(app) as client:
+        response = client.get("/api/server/logging", headers={"X-Request-ID": "istek-42"})
+        assert response.headers["x-request-id"] == "istek-42"
+        assert response.json()["enabled"] is True
+
+        generated = client.get("/").headers["x-request-id"]
+        assert len(generated) == 16
@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+
+from src import main
+from src.metrics import MetricsRegistry, STT_STAGE_SECONDS, UPSTREAM_REQUEST_SECONDS, ACTIVE_STREAMS
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Aşama süreleri.", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="decode")
+    histogram.observe(0.5, stage="decode")
+    histogram.observe(5.0, stage="decode")
+
+    text = registry.render()
+    assert '# TYPE stage_seconds histogram' in text
+    assert 'stage_seconds_bucket{stage="decode",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="decode",le="1.0"} 2' in text
+    assert 'stage_seconds_bucket{stage="decode",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="decode"} 3' in text
+    assert histogram.snapshot(stage="decode")["sum"] == 5.55
+
+
+def test_counter_gauge_and_callback():
+    registry = MetricsRegistry()
+    counter = registry.counter("results_total", "Sonuçlar.", ("type",))
+    counter.inc(type="partial")
+    counter.inc(2, type="partial")
+    gauge = registry.gauge("streams", "Akışlar.", ("endpoint",))
+    gauge.inc(endpoint="stt")
+    gauge.inc(endpoint="stt")
+    gauge.dec(endpoint="stt")
+    registry.gauge("queue_depth", "Kuyruk.", callback=lambda: 7)
+
+    text = registry.render()
+    assert 'results_total{type="partial"} 3' in text
+    assert 'streams{endpoint="stt"} 1' in text
+    assert "queue_depth 7" in text
+    assert registry.counter("results_total", "Sonuçlar.", ("type",)) is counter
+
+
+def test_metrics_endpoint_reports_stream_and_upstream_stages(fake_vosk, fake_gemini):
+    decodes_before = STT_STAGE_SECONDS.snapshot(stage="accept_waveform")["count"]
+    intents_before = UPSTREAM_REQUEST_SECONDS.snapshot(endpoint="intent", outcome="200")["count"]
+
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/ws/stream_stt?sample_rate=16000&vad=false") as ws:
+            ws.send_bytes(b"\x00" * 4000)
+            ws.receive_json()
+            assert ACTIVE_STREAMS.value(endpoint="stream_stt") == 1
+        assert client.post("/api/get_intent", json={"text": "boğazım ağrıyor"}).status_code == 200
+
+        response = client.get("/metrics")
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "decode_queue_depth" in response.text
+        assert 'request_seconds_count{endpoint="get_intent"}' in response.text
+
+    assert STT_STAGE_SECONDS.snapshot(stage="accept_waveform")["count"] == decodes_before + 1
+    assert UPSTREAM_REQUEST_SECONDS.snapshot(endpoint="intent", outcome="200")["count"] == intents_before + 1
+    assert ACTIVE_STREAMS.value(endpoint="stream_stt") == 0
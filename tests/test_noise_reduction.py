@@ -0,0 +1,98 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src import main
+from src.stt_module import stt_service as stt_service_module
+from src.stt_module.noise_reduction import AudioFrontEnd, PolyphaseResampler, SpectralSubtractor
+from conftest import FakeRecognizer
+
+
+def sine(freq, rate, seconds, amplitude=0.5):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def dominant_frequency(samples, rate):
+    spectrum = np.abs(np.fft.rfft(samples))
+    return np.argmax(spectrum) * rate / len(samples)
+
+
+def test_resampler_chunked_output_matches_one_shot():
+    signal = sine(440, 44100, 1.0)
+    one_shot = PolyphaseResampler(44100, 16000).process(signal)
+
+    resampler = PolyphaseResampler(44100, 16000)
+    chunked = np.concatenate([resampler.process(signal[i:i + 1234]) for i in range(0, len(signal), 1234)])
+
+    assert len(one_shot) == 16000
+    np.testing.assert_allclose(chunked, one_shot, atol=1e-6)
+    assert abs(dominant_frequency(one_shot[1000:], 16000) - 440) < 2
+
+
+def test_resampler_attenuates_content_above_target_nyquist():
+    resampler = PolyphaseResampler(48000, 16000)
+    passed = resampler.process(sine(1000, 48000, 0.5))
+    blocked = PolyphaseResampler(48000, 16000).process(sine(12000, 48000, 0.5))
+
+    assert np.abs(passed[100:]).max() > 0.45
+    assert np.abs(blocked[100:]).max() < 0.05
+
+
+def test_spectral_subtractor_is_transparent_without_subtraction():
+    noise = np.random.RandomState(0).randn(8000).astype(np.float32) * 0.01
+    suppressor = SpectralSubtractor(frame_size=512, over_subtraction=0.0)
+    out = np.concatenate([suppressor.process(noise[i:i + 2000]) for i in range(0, len(noise), 2000)])
+
+    # Gecikme bir sıçrama (256 örnek) kadardır
+    np.testing.assert_allclose(out[256:], noise[:len(out) - 256], atol=1e-5)
+
+
+def test_spectral_subtractor_reduces_stationary_noise_and_keeps_tone():
+    rng = np.random.RandomState(1)
+    noise = rng.randn(32000).astype(np.float32) * 0.01
+    signal = noise.copy()
+    signal[16000:] += sine(500, 16000, 1.0, amplitude=0.2)
+
+    suppressor = SpectralSubtractor()
+    out = np.concatenate([suppressor.process(signal[i:i + 2000]) for i in range(0, len(signal), 2000)])
+
+    noise_in = np.mean(noise[4000:15000] ** 2)
+    noise_out = np.mean(out[4256:15256] ** 2)
+    assert noise_out < noise_in / 5
+    tone_out = out[18000 + 256:30000 + 256]
+    assert abs(dominant_frequency(tone_out, 16000) - 500) < 5
+    assert np.sqrt(np.mean(tone_out ** 2)) > 0.1
+
+
+def test_front_end_removes_dc_and_converts_rate():
+    front_end = AudioFrontEnd(48000, 16000)
+    pcm = (sine(300, 48000, 1.0, amplitude=0.3) + 0.2)
+    data = (pcm * 32767).astype(np.int16).tobytes()
+
+    out = b"".join(front_end.process(data[i:i + 4001]) for i in range(0, len(data), 4001))
+    samples = np.frombuffer(out, dtype=np.int16).astype(np.float32) / 32768.0
+
+    assert len(samples) == 16000
+    assert abs(samples[8000:].mean()) < 0.01
+    assert front_end.stats()["input_seconds"] == 1.0
+
+
+def test_stream_stt_resamples_browser_rate_audio(fake_vosk, monkeypatch):
+    created = []
+
+    class RecordingRecognizer(FakeRecognizer):
+        def __init__(self, model, sample_rate):
+            super().__init__(model, sample_rate)
+            created.append(self)
+
+    monkeypatch.setattr(stt_service_module, "KaldiRecognizer", RecordingRecognizer)
+
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/ws/stream_stt?sample_rate=48000&vad=false") as ws:
+            # 48 kHz'te 6000 örnek -> 16 kHz'te 2000 örnek (4000 byte)
+            ws.send_bytes(b"\x00" * 12000)
+            assert ws.receive_json() == {"type": "partial", "text": "kelime"}
+            ws.send_bytes(b"\x00" * 12000)
+            assert ws.receive_json() == {"type": "final", "text": "kelime kelime"}
+
+    assert created[0].sample_rate == 16000
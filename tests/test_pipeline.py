@@ -0,0 +1,166 @@
+import json
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+from src import main
+from src.pipeline import SpeculativeIntent
+from src.stt_module import stt_service as stt_service_module
+from conftest import FakeRecognizer
+
+
+class PhraseRecognizer(FakeRecognizer):
+    """
+    Her parçada aynı kısmi metni veren, 'final_after' byte sonra nihai sonuç üreten tanıyıcı.
+    """
+    final_after = 5 * 4000
+    phrase = "boğazım ağrıyor"
+
+    def PartialResult(self):
+        return json.dumps({"partial": self.phrase})
+
+    def FinalResult(self):
+        self.Reset()
+        return json.dumps({"text": self.phrase})
+
+
+def test_speculation_hit_and_miss():
+    calls = []
+
+    async def analyze(text):
+        calls.append(text)
+        await asyncio.sleep(0)
+        return text.upper()
+
+    async def scenario():
+        speculation = SpeculativeIntent(analyze, stable_chunks=2, min_words=2)
+        assert not speculation.observe_partial("boğazım ağrıyor")
+        assert speculation.observe_partial("Boğazım ağrıyor")
+        hit = await speculation.resolve("boğazım ağrıyor.")
+
+        speculation.observe_partial("başım dönüyor")
+        speculation.observe_partial("başım dönüyor")
+        miss = await speculation.resolve("başım dönüyor ve midem bulanıyor")
+        return hit, miss, speculation.stats()
+
+    hit, miss, stats = asyncio.run(scenario())
+    assert hit == ("BOĞAZIM AĞRIYOR", True)
+    assert miss == ("BAŞIM DÖNÜYOR VE MIDEM BULANIYOR", False)
+    assert stats == {"started": 2, "hits": 1, "misses": 1}
+
+
+def test_pipeline_streams_transcript_intent_and_audio(fake_vosk, fake_gemini, monkeypatch):
+    monkeypatch.setattr(stt_service_module, "KaldiRecognizer", PhraseRecognizer)
+
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/ws/pipeline?sample_rate=16000&vad=false") as ws:
+            for _ in range(5):
+                ws.send_bytes(b"\x00" * 4000)
+
+            # Aynı kısmi metin bir kez gönderilir; spekülasyon yine de tüm kısmi sonuçları görür
+            partial = ws.receive_json()
+            assert partial["type"] == "partial"
+
+            final = ws.receive_json()
+            assert final == {"type": "final", "text": "boğazım ağrıyor", "t_ms": final["t_ms"]}
+
+            intent = ws.receive_json()
+            assert intent["type"] == "intent"
+            assert intent["poliklinik"] == "KBB"
+            assert intent["speculative"] is True
+
+            audio = ws.receive_json()
+            assert audio["type"] == "audio"
+            assert audio["text"] == "Anladım. Sizi KBB polikliniğine yönlendiriyorum."
+            assert set(audio["stages"]) >= {"intent_speculative_start", "stt_final", "intent", "tts"}
+            wav = ws.receive_bytes()
+            assert wav[:4] == b"RIFF"
+            assert len(wav) == audio["bytes"]
+
+    # Bir intent ve bir TTS çağrısı: spekülatif sonuç yeniden kullanıldı
+    paths = [path for path, _ in fake_gemini.requests]
+    assert sum("tts" in path for path in paths) == 1
+    assert len(paths) == 2
+
+
+def test_pipeline_keeps_receiving_while_reply_is_pending(fake_vosk, fake_gemini, monkeypatch):
+    monkeypatch.setattr(stt_service_module, "KaldiRecognizer", PhraseRecognizer)
+    release = threading.Event()
+    real_get_reply_audio = main.get_reply_audio
+
+    async def slow_reply_audio(text, voice):
+        await asyncio.to_thread(release.wait, 5)
+        return await real_get_reply_audio(text, voice)
+
+    monkeypatch.setattr(main, "get_reply_audio", slow_reply_audio)
+
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/ws/pipeline?sample_rate=16000&vad=false") as ws:
+            for _ in range(5):
+                ws.send_bytes(b"\x00" * 4000)
+            types = [ws.receive_json()["type"] for _ in range(3)]
+            assert types == ["partial", "final", "intent"]
+
+            # TTS beklerken yeni ses hâlâ çözümlenir
+            ws.send_bytes(b"\x00" * 4000)
+            assert ws.receive_json()["type"] == "partial"
+
+            release.set()
+            audio = ws.receive_json()
+            assert audio["type"] == "audio"
+            assert len(ws.receive_bytes()) == audio["bytes"]
+
+
+def test_pipeline_reports_malformed_control_messages(fake_vosk, fake_gemini, monkeypatch):
+    monkeypatch.setattr(stt_service_module, "KaldiRecognizer", PhraseRecognizer)
+
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/ws/pipeline?sample_rate=16000&vad=false") as ws:
+            for text in ("eof", "[1]", "null"):
+                ws.send_text(text)
+                error = ws.receive_json()
+                assert error["type"] == "error"
+                assert error["stage"] == "control"
+
+            # Bağlantı açık kalır; geçerli kontrol mesajı çalışmaya devam eder
+            ws.send_bytes(b"\x00" * 4000)
+            assert ws.receive_json()["type"] == "partial"
+            ws.send_text(json.dumps({"eof": 1}))
+            final = ws.receive_json()
+            assert final["type"] == "final"
+            assert final["text"] == "boğazım ağrıyor"
+
+
+class GrammarRecognizer(FakeRecognizer):
+    """
+    Dilbilgisiyle kurulduysa dilbilgisindeki ilk kelimeyi ve bir '[unk]' döndüren tanıyıcı.
+    """
+    def PartialResult(self):
+        if self.grammar is None:
+            return super().PartialResult()
+        return json.dumps({"partial": f"{self.grammar[0]} [unk]"})
+
+
+def test_pipeline_switches_grammar_per_step(fake_vosk, fake_gemini, monkeypatch):
+    monkeypatch.setattr(stt_service_module, "KaldiRecognizer", GrammarRecognizer)
+
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/ws/pipeline?sample_rate=16000&vad=false") as ws:
+            ws.send_bytes(b"\x00" * 2000)
+            assert ws.receive_json()["text"] == "kelime"
+
+            # Onay adımı: yalnızca evet/hayır beklenir; tanınmayan kelimeler istemciye gitmez
+            ws.send_text(json.dumps({"grammar": "yes_no"}))
+            assert ws.receive_json()["name"] == "yes_no"
+            ws.send_bytes(b"\x00" * 2000)
+            assert ws.receive_json()["text"] == "evet"
+
+            ws.send_text(json.dumps({"grammar": "yok_boyle"}))
+            assert ws.receive_json()["stage"] == "control"
+
+            ws.send_text(json.dumps({"grammar": "full"}))
+            assert ws.receive_json()["name"] == "full"
+            ws.send_bytes(b"\x00" * 2000)
+            # Önceki oturumun tanıyıcısı sıfırlanıp geri alındı
+            assert ws.receive_json()["text"] == "kelime"
@@ -6,6 +6,10 @@ import httpx
 import os
 import subprocess
 
+# Proje kökünden modül olarak çalıştırın ('src' paketi böylece bulunur): python -m tests.test_realtime_client
+from src.replies import build_reply_text, build_reason_text
+from src.tts_stream import join_wavs
+
 # --- AYARLAR ---
 SERVER_WS_URL = "ws://127.0.0.1:8000/ws/stream_stt"
 SERVER_API_URL = "http://127.0.0.1:8000/api"
@@ -114,28 +118,32 @@ async def run_realtime_flow():
     print("\n--- 3. Adım: Cevap Sentezleme (TTS) ---")
     try:
         poliklinik = intent_json.get('poliklinik')
-        sebep = intent_json.get('sebep_ozeti')
 
-        if not poliklinik or poliklinik.lower() == "belirsiz":
-            response_text = "Üzgünüm, şikayetinizi tam olarak anlayamadım. Lütfen daha detaylı anlatır mısınız?"
-        else:
-            response_text = f"Anladım. '{sebep}' şikayetiniz için sizi {poliklinik} polikliniğine yönlendiriyorum."
+        # Sunucuyla aynı sabit cümleler: TTS önbelleğinde önceden seslendirilmiş olarak bulunur.
+        # Şikayet özeti ayrı, önbelleksiz ikinci cümle olarak seslendirilir.
+        reply_texts = [build_reply_text(poliklinik)]
+        reason_text = build_reason_text(poliklinik, intent_json.get('sebep_ozeti'))
+        if reason_text:
+            reply_texts.append(reason_text)
         
-        print(f"Oluşturulan Cevap Cümlesi: '{response_text}'")
+        print(f"Oluşturulan Cevap Cümleleri: {reply_texts}")
 
         # TTS API'sini çağır
         async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{SERVER_API_URL}/synthesize",
-                json={"text": response_text},
-                timeout=30
-            )
-            response.raise_for_status() # Hata varsa fırlat
+            wavs = []
+            for text in reply_texts:
+                response = await client.post(
+                    f"{SERVER_API_URL}/synthesize",
+                    json={"text": text},
+                    timeout=30
+                )
+                response.raise_for_status() # Hata varsa fırlat
+                wavs.append(response.content)
             
             # Sesi dosyaya kaydet
             os.makedirs("tests", exist_ok=True)
             with open(OUTPUT_AUDIO_FILE, 'wb') as f:
-                f.write(response.content)
+                f.write(join_wavs(wavs))
             
             print(f"BAŞARILI: Cevap sesi '{OUTPUT_AUDIO_FILE}' olarak kaydedildi.")
 
@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import main
+from src.main import app
+from src.stt_module.model_registry import ModelRegistry
+from src.stt_module.recognizer_pool import RecognizerPool, RecognizerPoolExhausted
+
+# Sahte model yüklenirken yalnızca dizinin varlığı denetlenir
+MODEL = main.STT_MODEL_PATH
+
+
+def make_pool(**kwargs):
+    return RecognizerPool(registry=ModelRegistry(), **kwargs)
+
+
+def test_released_recognizer_is_reset_and_reused(fake_vosk):
+    pool = make_pool()
+    recognizer = pool.acquire(MODEL, 16000)
+    recognizer.AcceptWaveform(b"\x00" * 4000)
+    pool.release(recognizer, MODEL, 16000)
+
+    again = pool.acquire(MODEL, 16000)
+    assert again is recognizer
+    assert again.received == 0 and again.chunks == 0
+
+    stats = pool.stats()
+    assert stats["acquired"] == 2
+    assert stats["reused"] == 1
+    assert stats["pools"][f"{MODEL}@16000"]["created"] == 1
+
+
+def test_pools_are_keyed_by_sample_rate(fake_vosk):
+    pool = make_pool()
+    first = pool.acquire(MODEL, 16000)
+    pool.release(first, MODEL, 16000)
+    other = pool.acquire(MODEL, 8000)
+    assert other is not first
+    assert other.sample_rate == 8000
+
+
+def test_prewarm_creates_idle_recognizers(fake_vosk):
+    pool = make_pool(max_per_key=3)
+    assert pool.prewarm(MODEL, 16000, 5) == 3
+    assert pool.prewarm(MODEL, 16000, 3) == 0
+    pool.acquire(MODEL, 16000)
+    assert pool.stats()["reused"] == 1
+    assert pool.stats()["pools"][f"{MODEL}@16000"] == {"idle": 2, "in_use": 1, "created": 3, "utilization": 0.3333}
+
+
+def test_exhausted_pool_waits_then_times_out(fake_vosk):
+    pool = make_pool(max_per_key=1, acquire_timeout=0.05)
+    held = pool.acquire(MODEL, 16000)
+    with pytest.raises(RecognizerPoolExhausted):
+        pool.acquire(MODEL, 16000)
+    assert pool.stats()["timeouts"] == 1
+
+    # Bekleyen bir çağıran, tanıyıcı geri verildiğinde uyanır
+    pool.acquire_timeout = 2.0
+    result = {}
+    waiter = threading.Thread(target=lambda: result.setdefault("rec", pool.acquire(MODEL, 16000)))
+    waiter.start()
+    pool.release(held, MODEL, 16000)
+    waiter.join(2.0)
+    assert result["rec"] is held
+    assert pool.stats()["waits"] == 1
+
+
+def test_recognizer_of_reloaded_model_is_discarded(fake_vosk):
+    registry = ModelRegistry()
+    pool = RecognizerPool(registry=registry)
+    old = pool.acquire(MODEL, 16000)
+    pool.release(old, MODEL, 16000)
+    registry.clear()
+
+    new = pool.acquire(MODEL, 16000)
+    assert new is not old
+    assert pool.stats()["discarded"] == 1
+
+
+def test_release_without_reuse_frees_slot(fake_vosk):
+    pool = make_pool(max_per_key=1, acquire_timeout=0.05)
+    recognizer = pool.acquire(MODEL, 16000)
+    pool.release(recognizer, MODEL, 16000, reuse=False)
+    assert pool.acquire(MODEL, 16000) is not recognizer
+    assert pool.stats()["discarded"] == 1
+
+
+def test_pools_are_keyed_by_grammar(fake_vosk):
+    pool = make_pool(grammars={"yes_no": ("evet", "hayır", "[unk]")})
+    full = pool.acquire(MODEL, 16000)
+    pool.release(full, MODEL, 16000)
+
+    constrained = pool.acquire(MODEL, 16000, "yes_no")
+    assert constrained is not full
+    assert constrained.grammar == ["evet", "hayır", "[unk]"]
+    pool.release(constrained, MODEL, 16000, "yes_no")
+    assert pool.acquire(MODEL, 16000, "yes_no") is constrained
+    assert set(pool.stats()["pools"]) == {f"{MODEL}@16000", f"{MODEL}@16000#yes_no"}
+
+    with pytest.raises(KeyError):
+        pool.acquire(MODEL, 16000, "tanımsız")
+
+
+def test_websocket_sessions_share_pooled_recognizer(fake_vosk):
+    with TestClient(app) as client:
+        for _ in range(3):
+            with client.websocket_connect("/ws/stream_stt?sample_rate=16000&vad=false") as ws:
+                ws.send_bytes(b"\x00" * 4000)
+                # Önceki oturumun sesi sıfırlandığı için her oturum tek kelimeyle başlar
+                assert ws.receive_json() == {"type": "partial", "text": "kelime"}
+
+        stats = client.get("/api/stt/recognizer_pool").json()
+        pool = stats["pools"][f"{MODEL}@16000"]
+        assert stats["acquired"] == 3
+        assert stats["reused"] == 3
+        assert pool["in_use"] == 0
+        assert pool["created"] == main.STT_SETTINGS["recognizer_pool_prewarm"]
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+import subprocess
+
+import httpx
+import websockets
+
+from src import server
+from src.settings import write_isolated_settings
+from benchmarks.load_test import free_port
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_single_process_stream_counts():
+    before = server.workers_stats()["workers"][0]
+    server.stream_opened()
+    stats = server.workers_stats()
+    assert stats["prefork"] is False
+    assert stats["workers"][0]["pid"] == os.getpid()
+    assert stats["workers"][0]["active_streams"] == before["active_streams"] + 1
+    assert stats["workers"][0]["total_streams"] == before["total_streams"] + 1
+    server.stream_closed()
+    assert server.workers_stats()["workers"][0]["active_streams"] == before["active_streams"]
+
+
+def test_only_first_prefork_worker_is_primary(monkeypatch):
+    assert server.is_primary_worker()
+    monkeypatch.setattr(server, "_prefork", True)
+    monkeypatch.setattr(server, "_worker_index", 1)
+    assert not server.is_primary_worker()
+    monkeypatch.setattr(server, "_worker_index", 0)
+    assert server.is_primary_worker()
+
+
+def wait_for_workers(url: str, count: int, process, timeout: float = 60.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        assert process.poll() is None, "başlatıcı erken kapandı"
+        try:
+            stats = httpx.get(f"{url}/api/server/workers").json()
+            if sum(w["alive"] for w in stats["workers"]) == count:
+                return stats
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise AssertionError("işçiler zamanında hazır olmadı")
+
+
+def test_prefork_launcher_runs_workers_and_reports_streams(tmp_path):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    # API anahtarı verilmez: TTS ön-seslendirmesi kapalı kalır, ağa çıkılmaz.
+    # Önbellek dosyaları depodaki data/cache yerine geçici dizine yazılır.
+    env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+    env["APP_SETTINGS_PATH"] = write_isolated_settings(str(tmp_path))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.server", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        stats = wait_for_workers(url, 2, process)
+        assert stats["prefork"] is True
+        pids = {w["pid"] for w in stats["workers"]}
+        assert len(pids) == 2 and process.pid not in pids
+
+        async def open_streams(n):
+            for _ in range(n):
+                async with websockets.connect(f"ws://127.0.0.1:{port}/ws/stream_stt?vad=false") as ws:
+                    # Gerçek model paketlenmediği için sunucu akışı hata ile kapatabilir; sayılması yeterli
+                    try:
+                        await ws.send(b"\x00" * 3200)
+                        await asyncio.wait_for(ws.recv(), 2)
+                    except Exception:
+                        pass
+
+        asyncio.run(open_streams(4))
+        deadline = time.monotonic() + 5
+        while True:
+            stats = httpx.get(f"{url}/api/server/workers").json()
+            if stats["active_streams"] == 0 or time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+        # Sayaçlar paylaşılan bellekte: hangi işçi yanıt verirse versin tüm akışlar görünür
+        assert sum(w["total_streams"] for w in stats["workers"]) == 4
+        assert stats["active_streams"] == 0
+    finally:
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=20) == 0
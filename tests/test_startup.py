@@ -0,0 +1,93 @@
+import sys
+import time
+import wave
+import threading
+import subprocess
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import main
+from src.main import app
+from src.settings import PROJECT_ROOT
+from src.startup import load_warmup_audio
+from src.stt_module import stt_service as stt_service_module
+from conftest import FakeRecognizer
+
+
+def test_ready_after_recognizers_are_warmed(fake_vosk, monkeypatch):
+    warmed = []
+
+    class CountingRecognizer(FakeRecognizer):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.total = 0
+            warmed.append(self)
+
+        def AcceptWaveform(self, data):
+            self.total += len(data)
+            return super().AcceptWaveform(data)
+
+    monkeypatch.setattr(stt_service_module, "KaldiRecognizer", CountingRecognizer)
+    with TestClient(app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["ready"] is True and body["failed"] == []
+        assert body["cold_start_s"] > 0
+        assert body["steps"]["recognizer_warmup"]["recognizers"] == main.STT_SETTINGS["recognizer_pool_prewarm"]
+        assert {"model_load", "warmup_sample", "http_client", "intent_cache", "tts_cache"} <= set(body["steps"])
+
+        # Her tanıyıcı 1 s'lik örneği çözdü ve sıfırlandı
+        assert [recognizer.total for recognizer in warmed] == [32000] * len(warmed)
+        with client.websocket_connect("/ws/stream_stt?sample_rate=16000&vad=false") as ws:
+            ws.send_bytes(b"\x00" * 4000)
+            assert ws.receive_json() == {"type": "partial", "text": "kelime"}
+        assert len(warmed) == main.STT_SETTINGS["recognizer_pool_prewarm"]
+
+
+def test_not_ready_when_model_cannot_load(monkeypatch):
+    monkeypatch.setattr(main, "STT_MODEL_PATH", "/yok/vosk-model")
+    with TestClient(app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["failed"] == ["model_load"]
+        # Canlılık kontrolü etkilenmez
+        assert client.get("/").status_code == 200
+
+
+def test_background_warmup_gates_readiness(fake_vosk, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setitem(main.STARTUP_SETTINGS, "warmup_in_background", True)
+    monkeypatch.setattr(main, "warm_up_stt", lambda: release.wait(5))
+
+    with TestClient(app) as client:
+        assert client.get("/").status_code == 200
+        assert client.get("/ready").status_code == 503
+        release.set()
+        deadline = time.monotonic() + 5
+        while client.get("/ready").status_code != 200:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+
+def test_warmup_sample_must_match_recognizer_format(tmp_path):
+    path = tmp_path / "stereo.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\x00" * 64000)
+    with pytest.raises(ValueError):
+        load_warmup_audio(str(path))
+
+    sample = load_warmup_audio(f"{PROJECT_ROOT}/data/samples/test_fixed.wav", 16000, 0.5)
+    assert len(sample) == 16000
+
+
+def test_vosk_is_not_imported_with_the_app():
+    output = subprocess.run(
+        [sys.executable, "-c", "import sys, src.main; print('vosk' in sys.modules)"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from src import main
+from src.stt_module.stream_shaping import PartialThrottle, ChunkCoalescer
+from src.stt_module.stt_service import STTService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def partial(text):
+    return {"type": "partial", "text": text}
+
+
+def test_throttle_drops_unchanged_and_too_frequent_partials():
+    clock = FakeClock()
+    throttle = PartialThrottle(min_interval_ms=100, clock=clock)
+
+    assert throttle.should_send(partial("boğazım"))
+    assert not throttle.should_send(partial("boğazım"))
+    clock.now = 0.05
+    assert not throttle.due()
+    assert not throttle.should_send(partial("boğazım ağrı"))
+    clock.now = 0.1
+    assert throttle.should_send(partial("boğazım ağrıyor"))
+    assert not throttle.should_send(partial(""))
+    assert throttle.stats()["suppressed"] == {"unchanged": 1, "rate": 1}
+
+
+def test_throttle_never_delays_finals_and_resets_after_them():
+    clock = FakeClock()
+    throttle = PartialThrottle(min_interval_ms=1000, clock=clock)
+
+    assert throttle.should_send(partial("evet"))
+    assert throttle.should_send({"type": "final", "text": "evet"})
+    # Yeni konuşmanın ilk kısmi sonucu (aynı metin olsa bile) beklemeden gider
+    assert throttle.should_send(partial("evet"))
+    assert throttle.stats()["sent_finals"] == 1
+
+
+def test_coalescer_batches_backlog_and_keeps_end_of_stream_last():
+    async def scenario():
+        coalescer = ChunkCoalescer(max_chunks=8, max_bytes=300)
+        for _ in range(5):
+            await coalescer.put(b"\x00" * 100)
+        await coalescer.put(None)
+
+        sizes = []
+        while (batch := await coalescer.get_batch()) is not None:
+            sizes.append(len(batch))
+        return sizes, coalescer.stats()
+
+    sizes, stats = asyncio.run(scenario())
+    assert sizes == [3, 2]
+    assert stats["chunks"] == 5 and stats["max_chunks_per_batch"] == 3
+
+
+def test_coalescer_reraises_receiver_error_after_pending_chunks():
+    async def scenario():
+        coalescer = ChunkCoalescer()
+        await coalescer.put(b"\x00" * 10)
+        await coalescer.put(RuntimeError("alıcı hatası"))
+        first = await coalescer.get_batch()
+        with pytest.raises(RuntimeError):
+            await coalescer.get_batch()
+        return first
+
+    assert asyncio.run(scenario()) == [b"\x00" * 10]
+
+
+def test_transcribe_chunks_uses_one_accept_call_for_backlog(fake_vosk):
+    service = STTService(sample_rate=16000)
+    results = main.transcribe_chunks(service, None, [b"\x00" * 1000] * 4)
+
+    assert service.recognizer.chunks == 1
+    assert service.recognizer.received == 4000
+    assert results == [{"type": "partial", "text": "kelime"}]
+
+
+def test_transcribe_chunks_skips_partial_when_throttled(fake_vosk):
+    clock = FakeClock()
+    throttle = PartialThrottle(min_interval_ms=100, clock=clock)
+    throttle.should_send(partial("önceki"))
+    service = STTService(sample_rate=16000)
+
+    assert main.transcribe_chunks(service, None, [b"\x00" * 1000], throttle=throttle) == []
+    clock.now = 0.2
+    assert main.transcribe_chunks(service, None, [b"\x00" * 1000], throttle=throttle)[0]["type"] == "partial"
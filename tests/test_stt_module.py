@@ -0,0 +1,48 @@
+import pytest
+
+from src.stt_module.model_registry import ModelRegistry, model_registry, DEFAULT_MODEL_PATH
+from src.stt_module.stt_service import STTService, load_grammars
+
+
+def test_registry_loads_each_model_once(fake_vosk, tmp_path):
+    registry = ModelRegistry()
+    first = registry.get(str(tmp_path))
+    second = registry.get(str(tmp_path))
+
+    assert first is second
+    assert fake_vosk.instances == 1
+    info = registry.stats()["models"][str(tmp_path)]
+    assert info["hits"] == 1
+    assert info["load_time_s"] >= 0
+    assert registry.stats()["process_rss_bytes"] > 0
+
+
+def test_registry_missing_model_raises(fake_vosk, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ModelRegistry().get(str(tmp_path / "yok"))
+
+
+def test_stt_services_share_model(fake_vosk):
+    first = STTService(sample_rate=16000)
+    second = STTService(sample_rate=8000)
+
+    assert first.model is second.model
+    assert first.recognizer is not second.recognizer
+    assert fake_vosk.instances == 1
+    assert model_registry.is_loaded(DEFAULT_MODEL_PATH)
+
+
+def test_transcribe_chunk_partial_then_final(fake_vosk):
+    service = STTService()
+
+    assert service.transcribe_chunk(b"\x00" * 4000) == {"type": "partial", "text": "kelime"}
+    assert service.transcribe_chunk(b"\x00" * 4000) == {"type": "final", "text": "kelime kelime"}
+
+
+def test_grammar_mode_builds_constrained_recognizer(fake_vosk):
+    grammars = load_grammars({"yes_no": ["Evet", "HAYIR", "evet", " tamam  olur "]})
+    assert grammars["yes_no"] == ("evet", "hayır", "tamam olur", "[unk]")
+
+    service = STTService(sample_rate=16000, grammar=grammars["yes_no"])
+    assert service.recognizer.grammar == ["evet", "hayır", "tamam olur", "[unk]"]
+    assert STTService(sample_rate=16000).recognizer.grammar is None
@@ -0,0 +1,189 @@
+import io
+import wave
+import struct
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import main
+from src.main import app
+from src.upload_stream import WavStreamParser, WavFormatError, MultipartStreamParser, part_filename
+
+
+def make_wav(seconds=1.0, rate=16000, channels=1, extra_chunk=False) -> bytes:
+    frames = int(rate * seconds)
+    pcm = struct.pack(f"<{frames * channels}h", *([1000, -1000] * frames)[:frames * channels])
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm)
+    data = buffer.getvalue()
+    if extra_chunk:
+        # 'fmt ' ile 'data' arasına tek uzunluklu bir LIST yığını (dolgu baytıyla) eklenir
+        extra = b"LIST" + struct.pack("<I", 3) + b"abc\x00"
+        data = data[:36] + extra + data[36:]
+    return data
+
+
+def test_wav_parser_handles_byte_by_byte_feed():
+    data = make_wav(seconds=0.1, extra_chunk=True)
+    parser = WavStreamParser()
+    pcm = b"".join(parser.feed(data[i:i + 1]) for i in range(len(data)))
+    parser.close()
+    assert parser.sample_rate == 16000
+    assert len(pcm) == 1600 * 2
+    assert parser.audio_seconds == pytest.approx(0.1)
+
+
+def test_wav_parser_downmixes_stereo():
+    data = make_wav(seconds=0.1, channels=2)
+    parser = WavStreamParser()
+    pcm = parser.feed(data)
+    assert parser.channels == 2
+    # Sol/sağ +1000/-1000 olduğu için ortalaması sessizliktir
+    assert len(pcm) == 1600 * 2
+    assert set(struct.unpack(f"<{len(pcm) // 2}h", pcm)) == {0}
+
+
+def test_wav_parser_rejects_non_pcm():
+    data = bytearray(make_wav(seconds=0.1))
+    data[20:22] = struct.pack("<H", 3)  # IEEE float
+    with pytest.raises(WavFormatError):
+        WavStreamParser().feed(bytes(data))
+    with pytest.raises(WavFormatError):
+        WavStreamParser().feed(b"ID3\x00 not a wav file")
+
+
+def test_multipart_parser_handles_split_boundaries():
+    body = (
+        b"--xyz\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="a.wav"\r\n\r\n'
+        b"AAAA\r\n--xy\r\n"
+        b"\r\n--xyz\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="b.wav"\r\n\r\n'
+        b"BB\r\n--xyz--\r\n"
+    )
+    parser = MultipartStreamParser("xyz")
+    events = []
+    for i in range(len(body)):
+        events.extend(parser.feed(body[i:i + 1]))
+    assert parser.done
+
+    parts = []
+    for kind, value in events:
+        if kind == "begin":
+            parts.append([part_filename(value), b""])
+        elif kind == "data":
+            parts[-1][1] += value
+    assert parts == [["a.wav", b"AAAA\r\n--xy\r\n"], ["b.wav", b"BB"]]
+
+
+def test_transcribe_single_wav(fake_vosk):
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/transcribe?filename=kayit.wav", content=make_wav(seconds=1.0),
+            headers={"Content-Type": "audio/wav"}
+        )
+        assert response.status_code == 200
+        body = response.json()
+        item = body["files"][0]
+        assert item["file"] == "kayit.wav"
+        assert item["text"] == "kelime kelime"
+        assert item["audio_seconds"] == pytest.approx(1.0)
+        assert item["rtf"] is not None and item["error"] is None
+
+        # Tanıyıcı iade edildi
+        pools = client.get("/api/stt/recognizer_pool").json()["pools"]
+        assert all(pool["in_use"] == 0 for pool in pools.values())
+
+
+def test_transcribe_multipart_reports_each_file(fake_vosk):
+    files = [
+        ("file", ("a.wav", make_wav(seconds=1.0), "audio/wav")),
+        ("file", ("b.wav", make_wav(seconds=0.5, rate=8000), "audio/wav")),
+        ("file", ("bozuk.wav", b"bu bir wav degil", "audio/wav")),
+    ]
+    with TestClient(app) as client:
+        # python-multipart kurulu olmasa da gövde istemci tarafında elle kodlanır
+        boundary = "sinir123"
+        body = b""
+        for field, (name, data, content_type) in files:
+            body += (
+                f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{name}\"\r\n"
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode() + data + b"\r\n"
+        body += f"--{boundary}--\r\n".encode()
+        response = client.post(
+            "/api/transcribe", content=body, headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert [item["file"] for item in body["files"]] == ["a.wav", "b.wav", "bozuk.wav"]
+        assert body["files"][0]["text"] == "kelime kelime"
+        assert body["files"][1]["sample_rate"] == 8000
+        assert body["files"][1]["audio_seconds"] == pytest.approx(0.5)
+        assert body["files"][2]["error"]
+        assert body["errors"] == 1
+
+
+def test_transcribe_zip(fake_vosk):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for index in range(3):
+            zf.writestr(f"kayitlar/{index}.wav", make_wav(seconds=1.0))
+        zf.writestr("notlar.txt", "yok sayılır")
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/transcribe", content=archive.getvalue(), headers={"Content-Type": "application/zip"}
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["count"] == 3
+        assert all(item["text"] == "kelime kelime" for item in body["files"])
+        assert body["audio_seconds"] == pytest.approx(3.0)
+
+
+def test_transcribe_zip_reports_broken_members_per_file(fake_vosk):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("iyi.wav", make_wav(seconds=1.0))
+        zf.writestr("bozuk.wav", make_wav(seconds=1.0))
+    data = bytearray(archive.getvalue())
+    # İkinci üyenin sıkıştırılmış verisi bozulur (CRC veya zlib hatası)
+    info = zipfile.ZipFile(io.BytesIO(bytes(data))).getinfo("bozuk.wav")
+    start = info.header_offset + 30 + len(info.filename)
+    for offset in range(start + 10, start + 40):
+        data[offset] ^= 0xFF
+
+    with TestClient(app) as client:
+        response = client.post("/api/transcribe", content=bytes(data), headers={"Content-Type": "application/zip"})
+        assert response.status_code == 200
+        files = {item["file"]: item for item in response.json()["files"]}
+        assert files["iyi.wav"]["error"] is None and files["iyi.wav"]["text"] == "kelime kelime"
+        assert files["bozuk.wav"]["error"]
+
+
+def test_transcribe_zip_limits_unzipped_size_and_audio(fake_vosk, monkeypatch):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for index in range(3):
+            zf.writestr(f"{index}.wav", make_wav(seconds=1.0))
+
+    with TestClient(app) as client:
+        monkeypatch.setitem(main.TRANSCRIBE_SETTINGS, "max_unzipped_mb", 0.05)
+        response = client.post("/api/transcribe", content=archive.getvalue(), headers={"Content-Type": "application/zip"})
+        assert response.status_code == 413
+
+        monkeypatch.setitem(main.TRANSCRIBE_SETTINGS, "max_unzipped_mb", 10)
+        monkeypatch.setitem(main.TRANSCRIBE_SETTINGS, "max_zip_audio_seconds", 2.5)
+        response = client.post("/api/transcribe", content=archive.getvalue(), headers={"Content-Type": "application/zip"})
+        assert response.status_code == 413
+
+
+def test_transcribe_rejects_unsupported_type(fake_vosk):
+    with TestClient(app) as client:
+        response = client.post("/api/transcribe", content=b"{}", headers={"Content-Type": "application/json"})
+        assert response.status_code == 415
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+from src import main
+from src.replies import FALLBACK_REPLY, build_reply_text, build_reason_text, fixed_reply_phrases
+from src.tts_cache import TTSCache, tts_cache_key
+
+
+def test_cache_key_depends_on_text_voice_and_rate():
+    base = tts_cache_key("Merhaba", "Kore", 24000)
+    assert base == tts_cache_key("Merhaba", "Kore", 24000)
+    assert base != tts_cache_key("Merhaba", "Puck", 24000)
+    assert base != tts_cache_key("Merhaba", "Kore", 16000)
+
+
+def test_memory_lru_respects_byte_limit(tmp_path):
+    cache = TTSCache(max_memory_bytes=10)
+    cache.put_memory("a", b"12345")
+    cache.put_memory("b", b"12345")
+    cache.put_memory("c", b"12345")
+
+    assert cache.lookup("a") == (None, None)
+    assert cache.lookup("c") == ("memory", b"12345")
+    assert cache.stats()["memory_bytes"] == 10
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    TTSCache(cache_dir=str(tmp_path)).write_disk("k", b"RIFF....")
+    source, path = TTSCache(cache_dir=str(tmp_path)).lookup("k")
+    assert source == "disk"
+    with open(path, "rb") as f:
+        assert f.read() == b"RIFF...."
+
+
+def test_concurrent_disk_writes_use_separate_temp_files(tmp_path):
+    # Ön-çatallanmış işçiler aynı ifadeyi aynı anda yazabilir; sabit '.tmp' adı yarışta bozulurdu
+    caches = [TTSCache(cache_dir=str(tmp_path)) for _ in range(8)]
+    threads = [threading.Thread(target=cache.write_disk, args=("k", bytes([i]) * 4096)) for i, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["k.wav"]
+    data = (tmp_path / "k.wav").read_bytes()
+    assert len(data) == 4096 and len(set(data)) == 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path), max_disk_bytes=20)
+    cache.write_disk("a", b"x" * 8)
+    cache.write_disk("b", b"x" * 8)
+    # "a" kullanıldı; sınır aşılınca "b" silinmeli
+    assert cache.lookup("a")[0] == "disk"
+    cache.write_disk("c", b"x" * 8)
+
+    assert cache.lookup("b") == (None, None)
+    assert not (tmp_path / "b.wav").exists()
+    stats = cache.stats()
+    assert (stats["disk_entries"], stats["disk_bytes"], stats["disk_evictions"]) == (2, 16, 1)
+
+    # Yeni örnek mevcut dosyaları bir kez tarayıp sayaçları yeniden kurar
+    assert TTSCache(cache_dir=str(tmp_path)).stats()["disk_bytes"] == 16
+
+
+def test_reply_phrases():
+    assert build_reply_text("Belirsiz") == FALLBACK_REPLY
+    assert build_reply_text("KBB") == "Anladım. Sizi KBB polikliniğine yönlendiriyorum."
+    assert fixed_reply_phrases(["KBB", "Göz"])[0] == FALLBACK_REPLY
+    assert len(fixed_reply_phrases(["KBB", "Göz"])) == 3
+    # Şikayet özeti sabit cümlenin dışında, ayrı bir cümlede kalır
+    assert build_reason_text("KBB", "Boğaz ağrısı.") == "Şikayetinizi 'Boğaz ağrısı' olarak not aldım."
+    assert build_reason_text("Belirsiz", "Boğaz ağrısı") is None
+    assert build_reason_text("KBB", " ") is None
+
+
+def test_synthesize_served_from_cache(fake_gemini, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "tts_cache", TTSCache(cache_dir=str(tmp_path)))
+    with TestClient(main.app) as client:
+        first = client.post("/api/synthesize", json={"text": "Merhaba"})
+        second = client.post("/api/synthesize", json={"text": "Merhaba"})
+
+    assert first.headers["X-TTS-Cache"] == "miss"
+    assert second.headers["X-TTS-Cache"] == "memory"
+    assert first.content == second.content
+    assert len(fake_gemini.requests) == 1
+
+    # Yeni bir süreç gibi: bellek boş, disk dolu
+    monkeypatch.setattr(main, "tts_cache", TTSCache(cache_dir=str(tmp_path)))
+    with TestClient(main.app) as client:
+        third = client.post("/api/synthesize", json={"text": "Merhaba"})
+    assert third.headers["X-TTS-Cache"] == "disk"
+    assert third.content == first.content
+
+
+def test_warm_up_renders_fixed_phrases(fake_gemini, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "tts_cache", TTSCache(cache_dir=str(tmp_path)))
+    monkeypatch.setattr(main, "CLINICS", ["KBB", "Göz"])
+
+    async def scenario():
+        await main.warm_up_tts_cache()
+        # İkinci ısıtma diskteki dosyaları atlamalı
+        await main.warm_up_tts_cache()
+        await main.gemini_client.aclose()
+
+    asyncio.run(scenario())
+    assert len(fake_gemini.requests) == 3
+    assert main.tts_cache.stats()["disk_entries"] == 3
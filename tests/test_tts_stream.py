@@ -0,0 +1,79 @@
+import io
+import wave
+import base64
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from src import main
+from src.tts_stream import split_sentences, wav_header, iter_pcm_from_base64, iter_segments_in_order, join_wavs
+
+
+def test_split_sentences_merges_short_ones():
+    text = "Anladım. Sizi KBB polikliniğine yönlendiriyorum. Lütfen ikinci kata çıkın!"
+    assert split_sentences(text) == [
+        "Anladım. Sizi KBB polikliniğine yönlendiriyorum.",
+        "Lütfen ikinci kata çıkın!",
+    ]
+    assert split_sentences("Tamam.") == ["Tamam."]
+
+
+def test_wav_header_matches_wave_module():
+    pcm = b"\x01\x02" * 100
+    with wave.open(io.BytesIO(wav_header(24000, len(pcm)) + pcm), "rb") as wf:
+        assert (wf.getframerate(), wf.getnchannels(), wf.getsampwidth()) == (24000, 1, 2)
+        assert wf.readframes(1000) == pcm
+    assert len(wav_header(24000)) == 44
+
+
+def test_join_wavs_concatenates_pcm():
+    first = wav_header(24000, 4) + b"\x01\x00\x02\x00"
+    second = wav_header(24000, 2) + b"\x03\x00"
+    with wave.open(io.BytesIO(join_wavs([first, second])), "rb") as wav:
+        assert wav.getframerate() == 24000
+        assert wav.readframes(wav.getnframes()) == b"\x01\x00\x02\x00\x03\x00"
+
+
+def test_base64_decoded_in_blocks():
+    pcm = bytes(range(256)) * 100
+    encoded = base64.b64encode(pcm).decode("ascii")
+    blocks = list(iter_pcm_from_base64(encoded, block_chars=400))
+    assert len(blocks) > 1
+    assert b"".join(blocks) == pcm
+
+
+def test_segments_yield_in_order_while_running_concurrently():
+    async def scenario():
+        running = 0
+        peak = 0
+
+        async def synthesize(segment):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            # Önce gelen parçalar daha geç bitse bile sıra korunmalı
+            await asyncio.sleep(0.03 if segment == "a" else 0.01)
+            running -= 1
+            return segment
+
+        results = [r async for r in iter_segments_in_order(["a", "b", "c"], synthesize, concurrency=2)]
+        return results, peak
+
+    results, peak = asyncio.run(scenario())
+    assert results == ["a", "b", "c"]
+    assert peak == 2
+
+
+def test_stream_endpoint_returns_header_then_pcm(fake_gemini):
+    text = "Anladım, sizi polikliniğe yönlendiriyorum. Lütfen ikinci kata çıkınız efendim."
+    with TestClient(main.app) as client:
+        response = client.post("/api/synthesize/stream", json={"text": text})
+
+    assert response.status_code == 200
+    assert response.headers["X-TTS-Segments"] == "2"
+    body = response.content
+    assert body[:4] == b"RIFF"
+    # Sahte sunucu her cümle için metnin 10 katını PCM olarak döndürür
+    expected = b"".join(segment.encode("utf-8") * 10 for segment in split_sentences(text))
+    assert body[44:] == expected
+    assert len(fake_gemini.requests) == 2
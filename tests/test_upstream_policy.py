@@ -0,0 +1,133 @@
+import time
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from src import main
+from src.http_client import UpstreamHTTPClient
+from src.upstream_policy import UpstreamPolicy, UpstreamUnavailable, CircuitBreaker
+
+
+def use_policy(monkeypatch, fake_gemini, **options) -> UpstreamPolicy:
+    options.setdefault("backoff_base_ms", 1)
+    options.setdefault("rng", lambda: 0.0)
+    policy = UpstreamPolicy(**options)
+    monkeypatch.setattr(main, "gemini_client", UpstreamHTTPClient(base_url=fake_gemini.url, http2=False, policy=policy))
+    return policy
+
+
+def run(coro):
+    async def scenario():
+        try:
+            return await coro
+        finally:
+            await main.gemini_client.aclose()
+    return asyncio.run(scenario())
+
+
+def test_transient_errors_are_retried(fake_gemini, monkeypatch):
+    policy = use_policy(monkeypatch, fake_gemini, max_attempts=3)
+    fake_gemini.faults.extend([(0, 503), (0, 500)])
+
+    result = run(main.fetch_llm_intent("boğazım ağrıyor"))
+
+    assert result.poliklinik == "KBB"
+    assert len(fake_gemini.requests) == 3
+    assert policy.stats()["endpoints"]["intent"]["events"] == {"retry": 2}
+
+
+def test_client_errors_are_not_retried(fake_gemini, monkeypatch):
+    use_policy(monkeypatch, fake_gemini, max_attempts=3)
+    fake_gemini.faults.append((0, 400))
+
+    with pytest.raises(HTTPException) as exc_info:
+        run(main.fetch_llm_intent("boğazım ağrıyor"))
+    assert exc_info.value.status_code == 500
+    assert len(fake_gemini.requests) == 1
+
+
+def test_hedged_request_wins_over_slow_one(fake_gemini, monkeypatch):
+    policy = use_policy(monkeypatch, fake_gemini, hedge_endpoints=["intent"], hedge_delay_ms=50)
+    fake_gemini.faults.append((1.5, 200))
+
+    started = time.perf_counter()
+    result = run(main.fetch_llm_intent("boğazım ağrıyor"))
+
+    assert result.poliklinik == "KBB"
+    assert time.perf_counter() - started < 1.0
+    assert policy.stats()["endpoints"]["intent"]["events"] == {"hedge": 1, "hedge_won": 1}
+
+
+def test_deadline_bounds_slow_upstream(fake_gemini, monkeypatch):
+    use_policy(monkeypatch, fake_gemini, deadlines={"intent": 0.3}, max_attempts=3, min_attempt_ms=50)
+    fake_gemini.delay = 1.0
+
+    started = time.perf_counter()
+    with pytest.raises(HTTPException) as exc_info:
+        run(main.fetch_llm_intent("boğazım ağrıyor"))
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"]
+    assert time.perf_counter() - started < 0.9
+
+
+def test_circuit_opens_and_intent_falls_back(fake_gemini, monkeypatch):
+    policy = use_policy(monkeypatch, fake_gemini, max_attempts=1, failure_threshold=2, open_s=60.0)
+    monkeypatch.setattr(main, "intent_batcher", None)
+    fake_gemini.faults.extend([(0, 503), (0, 503)])
+
+    payload = {"contents": [{"parts": [{"text": "x"}]}], "generationConfig": {"responseSchema": {}}}
+
+    async def scenario():
+        for _ in range(2):
+            response = await main.gemini_client.post("intent", main.LLM_MODEL_PATH, json=payload)
+            assert response.status_code == 503
+        with pytest.raises(UpstreamUnavailable):
+            await main.gemini_client.post("intent", main.LLM_MODEL_PATH, json=payload)
+        # Yerel geri dönüş: istek üst servise gitmez, sonuç önbelleğe yazılmaz
+        return await main.get_intent("midem bulanıyor ve başım dönüyor")
+
+    result = run(scenario())
+
+    assert result.poliklinik == "Belirsiz"
+    assert len(fake_gemini.requests) == 2
+    assert main.intent_cache.get("midem bulanıyor ve başım dönüyor") is None
+    assert policy.breaker("intent").state == CircuitBreaker.OPEN
+
+
+def test_concurrency_limit_caps_outbound_requests():
+    policy = UpstreamPolicy(max_concurrency=2)
+    active = {"now": 0, "max": 0}
+
+    async def send(budget):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.02)
+        active["now"] -= 1
+        return httpx.Response(200)
+
+    async def scenario():
+        return await asyncio.gather(*(policy.call("intent", send) for _ in range(6)))
+
+    responses = asyncio.run(scenario())
+    assert [r.status_code for r in responses] == [200] * 6
+    assert active["max"] == 2
+
+
+def test_circuit_breaker_half_open_probe():
+    now = [0.0]
+    breaker = CircuitBreaker("intent", failure_threshold=1, open_s=5.0, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    now[0] = 6.0
+    assert breaker.allow()          # tek deneme isteği
+    assert not breaker.allow()      # deneme sürerken diğerleri reddedilir
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    now[0] = 12.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
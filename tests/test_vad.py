@@ -0,0 +1,118 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src import main
+from src.stt_module import stt_service as stt_service_module
+from src.stt_module.audio_recorder import VADEndpointer
+from conftest import FakeRecognizer
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds, level=0.3):
+    """Hece benzeri genlik modülasyonlu ton (konuşma yerine)."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 3 * t))
+    return level * 32767 * np.sin(2 * np.pi * 220 * t) * envelope
+
+
+def silence(seconds):
+    return np.zeros(int(SAMPLE_RATE * seconds))
+
+
+def noise(seconds, level_db, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(int(SAMPLE_RATE * seconds)) * 32768 * 10 ** (level_db / 20)
+
+
+def feed(vad, signal, chunk_bytes=3200):
+    """Sinyali parça parça VAD'e verir; (iletilen baytlar, endpoint zamanları [s]) döndürür."""
+    data = signal.astype(np.int16).tobytes()
+    forwarded, endpoints = b"", []
+    for start in range(0, len(data), chunk_bytes):
+        result = vad.process(data[start:start + chunk_bytes])
+        forwarded += result.speech
+        if result.end_of_speech:
+            endpoints.append((start + chunk_bytes) / (2 * SAMPLE_RATE))
+    return forwarded, endpoints
+
+
+def test_silence_is_dropped():
+    vad = VADEndpointer()
+    forwarded, endpoints = feed(vad, silence(2.0))
+    assert forwarded == b""
+    assert endpoints == []
+    assert vad.stats()["dropped_ratio"] == 1.0
+
+
+def test_speech_with_hangover_and_preroll_across_chunks():
+    vad = VADEndpointer(hangover_ms=300, preroll_ms=100)
+    signal = np.concatenate([silence(1.0), tone(1.0), silence(1.0)])
+    # 3000 byte'lık parçalar 20 ms'lik çerçevelere tam bölünmez; kalan baytlar taşınmalı
+    forwarded, _ = feed(vad, signal, chunk_bytes=3000)
+
+    samples = np.frombuffer(forwarded, dtype=np.int16)
+    # 100 ms pre-roll + 1 s konuşma + 300 ms hangover
+    assert len(samples) == int(SAMPLE_RATE * 1.4)
+    # Konuşmanın tamamı, pre-roll'dan hemen sonra ve sırası bozulmadan iletilmeli
+    expected = tone(1.0).astype(np.int16)
+    preroll = int(SAMPLE_RATE * 0.1)
+    assert np.array_equal(samples[preroll:preroll + len(expected)], expected)
+
+
+def test_end_of_speech_fires_after_timeout():
+    vad = VADEndpointer(end_of_speech_ms=800)
+    signal = np.concatenate([silence(0.5), tone(1.0), silence(2.0)])
+    _, endpoints = feed(vad, signal)
+
+    assert len(endpoints) == 1
+    # Konuşma 1.5 s'de biter; endpoint 800 ms sonra (bir parça toleransla) gelmeli
+    assert 2.3 <= endpoints[0] <= 2.4
+
+
+def test_steady_noise_bed_is_learned_and_dropped():
+    for bed in (noise(5.0, -55), np.sin(2 * np.pi * 50 * np.arange(SAMPLE_RATE * 5) / SAMPLE_RATE) * 32768 * 10 ** (-34 / 20)):
+        vad = VADEndpointer()
+        _, endpoints = feed(vad, bed)
+        stats = vad.stats()
+        assert endpoints == []
+        assert stats["noise_floor_db"] is not None
+        assert stats["dropped_ratio"] > 0.85
+
+
+def test_speech_over_noise_bed():
+    bed = noise(6.0, -50)
+    bed[SAMPLE_RATE * 2:SAMPLE_RATE * 3] += tone(1.0)
+    vad = VADEndpointer()
+    forwarded, endpoints = feed(vad, bed)
+
+    assert len(endpoints) == 1
+    # Açılıştaki kısa ısınma + konuşma (pre-roll/hangover dahil); gürültünün geri kalanı atılır
+    assert len(forwarded) / (2 * SAMPLE_RATE) < 2.0
+
+
+class ForcedFinalRecognizer(FakeRecognizer):
+    # Kendi endpoint'ini hiç üretmez; nihai sonuç yalnızca VAD ile zorlanır
+    final_after = 1 << 30
+
+
+def test_stream_stt_with_vad_drops_silence_and_forces_final(fake_vosk, monkeypatch):
+    monkeypatch.setattr(stt_service_module, "KaldiRecognizer", ForcedFinalRecognizer)
+    signal = np.concatenate([silence(1.0), tone(0.5), silence(1.5)]).astype(np.int16).tobytes()
+    chunks = [signal[i:i + 4000] for i in range(0, len(signal), 4000)]
+
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/ws/stream_stt?sample_rate=16000&vad=true") as ws:
+            for chunk in chunks:
+                ws.send_bytes(chunk)
+            messages = []
+            while not messages or messages[-1]["type"] != "final":
+                messages.append(ws.receive_json())
+
+    partials = [m for m in messages if m["type"] == "partial"]
+    assert partials
+    # Tanıyıcıya yalnızca konuşma (+ pre-roll/hangover) parçaları gitti; baştaki 1 s sessizlik gitmedi.
+    # Kısmi sonuçlar seyreltildiği ve biriken parçalar birleştirildiği için en fazla çağrı sayısı kadar kısmi sonuç gelir
+    decoded_chunks = len(messages[-1]["text"].split())
+    assert len(partials) <= decoded_chunks
+    assert decoded_chunks < len(chunks) // 2
@@ -0,0 +1,44 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from src.main import app
+
+
+def test_stream_stt_returns_partial_and_final(fake_vosk):
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/stream_stt?sample_rate=16000&vad=false") as ws:
+            ws.send_bytes(b"\x00" * 4000)
+            assert ws.receive_json() == {"type": "partial", "text": "kelime"}
+            ws.send_bytes(b"\x00" * 4000)
+            assert ws.receive_json() == {"type": "final", "text": "kelime kelime"}
+
+        stats = client.get("/api/stt/decode_pool").json()
+        assert stats["completed"] >= 2
+        assert fake_vosk.instances == 1
+
+
+def test_stream_stt_rejects_unknown_grammar(fake_vosk):
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/stream_stt?grammar=tanimsiz") as ws:
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+        assert exc_info.value.code == 1008
+
+
+def test_stream_stt_sends_unchanged_partial_once(fake_vosk, monkeypatch):
+    from src.stt_module import stt_service as stt_service_module
+    from conftest import FakeRecognizer
+
+    class SamePartialRecognizer(FakeRecognizer):
+        def PartialResult(self):
+            return '{"partial": "kelime"}'
+
+    monkeypatch.setattr(stt_service_module, "KaldiRecognizer", SamePartialRecognizer)
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/stream_stt?sample_rate=16000&vad=false") as ws:
+            for _ in range(4):
+                ws.send_bytes(b"\x00" * 2000)
+            assert ws.receive_json() == {"type": "partial", "text": "kelime"}
+            # Nihai sonuç, tekrarlanan kısmi sonuçların arkasında beklemez
+            assert ws.receive_json()["type"] == "final"
@@ -0,0 +1,82 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from src.main import app
+from src.stt_module.wire_encoding import WireDecoder, WireEncodingError, MULAW_TABLE
+
+
+def pcm(view) -> list:
+    data = bytes(view)
+    return list(struct.unpack(f"<{len(data) // 2}h", data))
+
+
+def test_mulaw_table_matches_g711():
+    assert MULAW_TABLE[0xFF] == 0 and MULAW_TABLE[0x7F] == 0
+    assert MULAW_TABLE[0x00] == -32124 and MULAW_TABLE[0x80] == 32124
+    # Pozitif yarıda kod küçüldükçe genlik büyür
+    assert np.all(np.diff(MULAW_TABLE[0x80:].astype(np.int32)) < 0)
+
+
+def test_float32_is_scaled_clipped_and_split_samples_carried_over():
+    decoder = WireDecoder("float32")
+    data = np.array([0.0, 0.5, -1.0, 2.0], dtype="<f4").tobytes()
+    # İkinci örnek iki parçaya bölünmüş
+    first, second = decoder.decode([data[:6], data[6:]])
+    assert pcm(first) == [0]
+    assert pcm(second) == [16384, -32767, 32767]
+
+
+def test_decoder_reuses_output_buffer():
+    decoder = WireDecoder("mulaw")
+    decoder.decode([b"\xff" * 800])
+    buffer = decoder._out
+    outputs = decoder.decode([b"\x80" * 400, b"\x00" * 400])
+    assert decoder._out is buffer
+    assert pcm(outputs[0]) == [32124] * 400 and pcm(outputs[1]) == [-32124] * 400
+
+
+def test_pcm16_passes_through_and_unknown_encoding_is_rejected():
+    chunks = [b"\x01\x00"]
+    assert WireDecoder().decode(chunks) is chunks
+    with pytest.raises(WireEncodingError):
+        WireDecoder("opus")
+
+
+def test_stream_stt_accepts_mulaw(fake_vosk):
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/stream_stt?sample_rate=16000&vad=false&encoding=mulaw") as ws:
+            # 4000 μ-law baytı = 8000 bayt PCM16: sahte tanıyıcı nihai sonuç üretir
+            ws.send_bytes(b"\xff" * 4000)
+            assert ws.receive_json() == {"type": "final", "text": "kelime"}
+
+
+def test_stream_stt_encoding_from_first_control_message(fake_vosk):
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/stream_stt?sample_rate=16000&vad=false") as ws:
+            ws.send_text(json.dumps({"encoding": "float32"}))
+            ws.send_bytes(np.zeros(4000, dtype="<f4").tobytes())
+            assert ws.receive_json() == {"type": "final", "text": "kelime"}
+
+        with client.websocket_connect("/ws/stream_stt?vad=false") as ws:
+            ws.send_bytes(b"\x00" * 100)
+            ws.send_text(json.dumps({"encoding": "mulaw"}))
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                while True:
+                    ws.receive_json()
+            assert exc_info.value.code == 1008
+
+
+def test_pipeline_switches_encoding(fake_vosk):
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/pipeline?sample_rate=16000&vad=false") as ws:
+            ws.send_text(json.dumps({"encoding": "ulaw"}))
+            assert ws.receive_json()["type"] == "error"
+            ws.send_text(json.dumps({"encoding": "mulaw"}))
+            assert ws.receive_json()["name"] == "mulaw"
+            ws.send_bytes(b"\xff" * 2000)
+            assert ws.receive_json()["type"] == "partial"
@@ -0,0 +1,279 @@
+"""
+Kuyruk tabanlı, yapılandırılmış (JSON) loglama.
+
+'logging.basicConfig' ile kurulan senkron 'StreamHandler' her kaydı çağıran thread'de
+biçimlendirip yazar; olay döngüsünde bu, her transkript ve LLM yanıtı logunda stdout/stderr
+yazımının (yavaş bir boru, dolu bir konteyner log sürücüsü) WebSocket döngüsünü bekletmesi
+demektir. Burada kök logger'a yalnızca kaydı bir kuyruğa bırakan bir 'QueueHandler' eklenir;
+JSON biçimlendirme ve G/Ç, ayrı bir thread'deki 'QueueListener'da yapılır.
+
+- Her kayda o anki bağlamın 'request_id' ve 'session_id' değerleri eklenir (contextvars;
+  'LogContextMiddleware' HTTP isteği ve WebSocket bağlantısı başına bağlar).
+- 'extra={"sample": "partial"}' ile işaretlenen yüksek hacimli kayıtların yalnızca N'de biri
+  yazılır ('sampling' ayarı); elenen kayıt kuyruğa hiç girmez.
+- Alt sistem bazında seviye: 'levels' ayarı ({"httpx": "WARNING", ...}).
+- Kuyruk sınırlıdır; dolduğunda kayıt beklenmeden düşürülür ve sayılır (loglama asla
+  olay döngüsünü bloklamaz).
+- 'os.fork()' sonrası çocuk süreçte dinleyici thread'i yeniden başlatılır (ön-çatallanmış
+  sunucu işçileri).
+"""
+import os
+import sys
+import copy
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import itertools
+import contextvars
+from contextlib import contextmanager
+from urllib.parse import unquote
+from logging.handlers import QueueHandler, QueueListener
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+session_id_var = contextvars.ContextVar("session_id", default=None)
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+DEFAULT_QUEUE_SIZE = 10000
+
+# Standart LogRecord alanları; geri kalanlar 'extra' ile verilmiştir ve JSON'a eklenir
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {"message", "asctime"}
+
+
+def new_log_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+@contextmanager
+def log_context(request_id=None, session_id=None):
+    """
+    Blok içindeki (ve bloktan başlatılan görevlerdeki) loglara istek/oturum kimliği bağlar.
+    """
+    tokens = []
+    if request_id is not None:
+        tokens.append((request_id_var, request_id_var.set(request_id)))
+    if session_id is not None:
+        tokens.append((session_id_var, session_id_var.set(session_id)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Kaydı tek satırlık JSON'a çevirir: zaman, seviye, logger, mesaj, kimlikler ve 'extra' alanları.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_") and value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    'sample' anahtarı taşıyan kayıtlardan anahtar başına her N'inciyi geçirir (ilk kayıt her zaman geçer).
+    """
+    def __init__(self, rates: dict = None):
+        super().__init__()
+        self.rates = {key: max(1, int(rate)) for key, rate in (rates or {}).items()}
+        self._counters = {key: itertools.count() for key in self.rates}
+        self.sampled_out = dict.fromkeys(self.rates, 0)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample", None)
+        rate = self.rates.get(key, 1)
+        if rate == 1:
+            return True
+        # 'next' GIL altında atomiktir; thread'ler arası kilit gerekmez
+        if next(self._counters[key]) % rate == 0:
+            record.sample_rate = rate
+            return True
+        self.sampled_out[key] += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Kaydı yalnızca hazırlayıp sınırlı kuyruğa bırakır; kuyruk doluysa beklemeden düşürür.
+
+    Standart 'QueueHandler.prepare' mesajı çağıranın thread'inde tam biçimlendirir; burada
+    yalnızca mesaj argümanları birleştirilir ve bağlam kimlikleri (dinleyici thread'inde
+    görünmedikleri için) kayda kopyalanır. JSON'a çevirme dinleyicide yapılır.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Traceback çerçeveleri kuyrukta tutulmasın
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        if getattr(record, "session_id", None) is None:
+            record.session_id = session_id_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StderrHandler(logging.StreamHandler):
+    """
+    Her kayıtta o anki 'sys.stderr'a yazar ('logging.lastResort' gibi). Kurulum anındaki akışa
+    bağlanmaz; böylece 'sys.stderr' sonradan değiştirilip kapatılsa da (test yakalaması,
+    yeniden yönlendirme) dinleyici thread'i kapalı bir akışa yazmaya çalışmaz.
+    """
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+class LogContextMiddleware:
+    """
+    ASGI ara katmanı: her HTTP isteğine 'request_id' (istemcinin 'X-Request-ID' başlığı veya
+    yeni kimlik; yanıta da eklenir), her WebSocket bağlantısına ayrıca 'session_id'
+    ('?session_id=' veya yeni kimlik) bağlar.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope.get("headers") or ():
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or new_log_id()
+
+        session_id = None
+        if scope["type"] == "websocket":
+            for part in (scope.get("query_string") or b"").decode("latin-1").split("&"):
+                if part.startswith("session_id="):
+                    session_id = unquote(part[len("session_id="):])[:64]
+                    break
+            session_id = session_id or new_log_id()
+        else:
+            send = self._with_request_id(send, (b"x-request-id", request_id.encode("latin-1")))
+
+        with log_context(request_id=request_id, session_id=session_id):
+            await self.app(scope, receive, send)
+
+    @staticmethod
+    def _with_request_id(send, header):
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers") or []) + [header]
+            await send(message)
+        return send_with_id
+
+
+_handler = None
+_listener = None
+_sampler = None
+
+
+def setup_logging(config: dict = None) -> NonBlockingQueueHandler:
+    """
+    Kök logger'ı kuyruk tabanlı loglamaya geçirir ve dinleyici thread'ini başlatır.
+
+    Ayarlar (config/settings.yaml 'logging' bölümü): level, format ('json' | 'text'),
+    queue_size, sampling ({anahtar: N}), levels ({logger adı: seviye}). Tekrar çağrılırsa
+    önceki kurulum kapatılıp yenisi kurulur.
+    """
+    global _handler, _listener, _sampler
+    config = config or {}
+    shutdown_logging()
+
+    output = StderrHandler()
+    if str(config.get("format", "json")).lower() == "text":
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    _sampler = SamplingFilter(config.get("sampling"))
+    _handler = NonBlockingQueueHandler(queue.Queue(maxsize=int(config.get("queue_size", DEFAULT_QUEUE_SIZE))))
+    _handler.addFilter(_sampler)
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(str(config.get("level", "INFO")).upper())
+    for name, level in (config.get("levels") or {}).items():
+        logging.getLogger(name).setLevel(str(level).upper())
+
+    _listener = QueueListener(_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    return _handler
+
+
+def shutdown_logging():
+    """
+    Kuyrukta bekleyen kayıtları yazar, dinleyiciyi durdurur ve kuyruk işleyicisini kaldırır.
+    """
+    global _handler, _listener
+    if _listener is not None:
+        _listener.stop()
+        for output in _listener.handlers:
+            output.close()
+        _listener = None
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+
+
+def _restart_after_fork():
+    # Dinleyici thread'i çocuk sürece geçmez; kuyruk da (kilidi tutulmuş olabilir) yenilenir
+    global _listener
+    if _listener is None:
+        return
+    _handler.queue = queue.Queue(maxsize=_handler.queue.maxsize)
+    _listener = QueueListener(_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def logging_stats() -> dict:
+    if _handler is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "queued": _handler.queue.qsize(),
+        "queue_size": _handler.queue.maxsize,
+        "dropped": _handler.dropped,
+        "sampling": dict(_sampler.rates),
+        "sampled_out": dict(_sampler.sampled_out),
+    }
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)